@@ -6,9 +6,250 @@ Description:
 
 """
 
-from django.contrib import admin
+from collections import defaultdict
+from collections.abc import Callable, Iterator
+from typing import Any
 
+from django import forms
+from django.conf import settings
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.paginator import Page, Paginator
+from django.db.models import Model, QuerySet
+from django.forms import ModelForm
+from django.forms.models import BaseInlineFormSet
+from django.http import HttpRequest
+from django.template.response import TemplateResponse
+from django.utils import timezone
+
+from . import bulk
 from .models import Choice, Question
+from .sharding import get_shards, is_sharded, shard_for
+
+SHARD_PARAMETER: str = "shard"
+
+
+class PaginatedChoiceFormSet(BaseInlineFormSet):
+    """
+    Paginated Choice Formset Class
+
+    Description:
+        - This class renders one page of choices instead of all of them.
+        - Changed rows are saved with one `bulk_update` per set of changed
+        fields and deleted rows with a single `DELETE`.
+        - Choices are read and written on the database of their question,
+        so on its shard.
+
+    Attributes:
+        - `page_number (str | int)`: The page to render.
+        - `per_page (int)`: The number of choices per page.
+        - `page (Page | None)`: The rendered page.
+
+    Methods:
+        - `get_queryset(self) -> QuerySet[Choice]`
+        - `save_existing_objects(self, commit: bool = True) -> list[Choice]`
+
+    """
+
+    page_number: str | int = 1
+    per_page: int = 50
+    page: Page | None = None
+
+    def get_queryset(self) -> QuerySet[Choice]:
+        """
+        Get Queryset Method
+
+        Description:
+            - This method returns the choices of the current page.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `queryset (QuerySet[Choice])`: The choices of the page.
+
+        """
+
+        if self.page is None:
+            self.page = Paginator(
+                object_list=super()
+                .get_queryset()
+                .using(self.instance._state.db),  # type: ignore
+                per_page=self.per_page,
+            ).get_page(number=self.page_number)
+            self._queryset = self.page.object_list
+
+        return self._queryset
+
+    def save_existing_objects(self, commit: bool = True) -> list[Choice]:
+        """
+        Save Existing Objects Method
+
+        Description:
+            - This method saves only the changed rows of the page, in bulk.
+
+        Args:
+            - `commit (bool)`: Whether to write the changes.  **(Optional)**
+
+        Returns:
+            - `instances (list[Choice])`: The changed choices.
+
+        """
+
+        self.saved_forms = []
+        instances: list[Choice] = super().save_existing_objects(commit=False)
+
+        if not commit:
+            return instances
+
+        manager = self.model._default_manager.db_manager(  # type: ignore
+            self.instance._state.db  # type: ignore
+        )
+        if self.deleted_objects:
+            manager.filter(
+                pk__in=[obj.pk for obj in self.deleted_objects]
+            ).delete()
+
+        concrete: set[str] = {
+            field.name
+            for field in self.model._meta.concrete_fields
+            if not field.primary_key
+        }
+        groups: defaultdict[tuple[str, ...], list[Model]] = defaultdict(list)
+        for obj, changed_data in self.changed_objects:
+            fields: tuple[str, ...] = tuple(
+                sorted(concrete.intersection(changed_data))
+            )
+            if fields:
+                groups[fields].append(obj)
+
+        for fields, objs in groups.items():
+            manager.bulk_update(objs=objs, fields=fields)
+
+        return instances
+
+
+class RescheduleForm(forms.Form):
+    """
+    Reschedule Form Class
+
+    Description:
+        - This class represents the form of the reschedule admin action.
+
+    Attributes:
+        - `pub_date (DateTimeField)`: The new publication date.
+
+    Methods:
+        - `None`
+
+    """
+
+    pub_date = forms.DateTimeField(
+        initial=timezone.now, label="Publication date"
+    )
+
+
+class DeleteForm(forms.Form):
+    """
+    Delete Form Class
+
+    Description:
+        - This class represents the form of the delete admin action.
+
+    Attributes:
+        - `send_signals (BooleanField)`: Send per-object delete signals.
+
+    Methods:
+        - `None`
+
+    """
+
+    send_signals = forms.BooleanField(
+        required=False,
+        label="Send delete signals",
+        help_text="Slower: loads and signals every question and choice.",
+    )
+
+
+class ShardListFilter(admin.SimpleListFilter):
+    """
+    Shard List Filter Class
+
+    Description:
+        - This class lists the shards in the change list filters. A change
+        list shows one shard at a time, the first one unless another one is
+        picked, as querysets can't span databases.
+
+    Attributes:
+        - `title (str)`: The title of the filter.
+        - `parameter_name (str)`: The query parameter of the shard.
+
+    Methods:
+        - `lookups(self, request: HttpRequest, model_admin: admin.ModelAdmin)
+        -> list[tuple[str, str]]`
+        - `queryset(self, request: HttpRequest, queryset: QuerySet[Question])
+        -> QuerySet[Question]`
+        - `choices(self, changelist: Any) -> Iterator[dict[str, Any]]`
+
+    """
+
+    title = "shard"
+    parameter_name = SHARD_PARAMETER
+
+    def lookups(
+        self, request: HttpRequest, model_admin: admin.ModelAdmin
+    ) -> list[tuple[str, str]]:
+        """
+        Returns the shards.
+        """
+
+        return [(alias, alias) for alias in get_shards()]
+
+    def queryset(
+        self, request: HttpRequest, queryset: QuerySet[Question]
+    ) -> QuerySet[Question]:
+        """
+        Returns the queryset, which `QuestionAdmin` already read from the
+        picked shard.
+        """
+
+        return queryset
+
+    def get_facet_counts(
+        self, pk_attname: str, filtered_qs: QuerySet[Question]
+    ) -> dict[str, Any]:
+        """
+        Returns no counts, as other shards can't be counted in the query of
+        one.
+        """
+
+        return {}
+
+    def choices(self, changelist: Any) -> Iterator[dict[str, Any]]:
+        """
+        Yields the shards, without the "All" choice of other filters.
+        """
+
+        current: str = get_shard(request=self.request)
+        for alias, title in self.lookup_choices:
+            yield {
+                "selected": alias == current,
+                "query_string": changelist.get_query_string(
+                    {self.parameter_name: alias}
+                ),
+                "display": title,
+            }
+
+
+def get_shard(request: HttpRequest) -> str:
+    """
+    Returns the shard a change list request picked, or the first shard.
+    """
+
+    shards: list[str] = get_shards()
+    shard: str | None = request.GET.get(SHARD_PARAMETER)
+
+    return shard if shard in shards else shards[0]
 
 
 class ChoiceInline(admin.TabularInline):
@@ -17,18 +258,54 @@ class ChoiceInline(admin.TabularInline):
 
     Description:
         - This class represents the inline configuration for the Choice model.
+        - Choices are paginated with the `choice_page` query parameter, so
+        questions with many choices render and save one page at a time.
 
     Attributes:
         - `model (Choice)`: The Choice model.
         - `extra (int)`: The number of extra fields to display.
+        - `formset (PaginatedChoiceFormSet)`: The formset class.
+        - `template (str)`: The template of the inline.
 
     Methods:
-        - `None`
+        - `get_formset(self, request: HttpRequest, obj: Question | None =
+        None, **kwargs: Any) -> type[PaginatedChoiceFormSet]`
 
     """
 
     model = Choice
     extra = 3
+    formset = PaginatedChoiceFormSet
+    template = "polls/admin/paginated_tabular.html"
+
+    def get_formset(
+        self, request: HttpRequest, obj: Question | None = None, **kwargs: Any
+    ) -> type[PaginatedChoiceFormSet]:
+        """
+        Get Formset Method
+
+        Description:
+            - This method returns the formset class for the requested page.
+
+        Args:
+            - `request (HttpRequest)`: The request object.  **(Required)**
+            - `obj (Question)`: The edited question.  **(Optional)**
+            - `**kwargs (Any)`: Additional keyword arguments.  **(Optional)**
+
+        Returns:
+            - `formset (type[PaginatedChoiceFormSet])`: The formset class.
+
+        """
+
+        formset: type[PaginatedChoiceFormSet] = super().get_formset(
+            request, obj, **kwargs
+        )
+        formset.page_number = request.GET.get("choice_page", 1)
+        formset.per_page = getattr(
+            settings, "POLLS_ADMIN_CHOICES_PER_PAGE", 50
+        )
+
+        return formset
 
 
 class QuestionAdmin(admin.ModelAdmin):
@@ -37,6 +314,13 @@ class QuestionAdmin(admin.ModelAdmin):
 
     Description:
         - This class represents the admin configuration for the Question model.
+        - Its bulk actions run as chunked set-based `UPDATE` and `DELETE`
+        statements after a confirmation page that counts the selection with
+        one aggregate query. They don't send per-object model signals,
+        except for a delete that asks for them.
+        - While sharding is on, the change list and its actions work on the
+        shard picked with the shard filter, and questions are edited on
+        their own shard.
 
     Attributes:
         - `fieldsets (list)`: The fieldsets to display.
@@ -44,9 +328,26 @@ class QuestionAdmin(admin.ModelAdmin):
         - `list_display (list)`: The fields to display in the list view.
         - `list_filter (list)`: The fields to filter by.
         - `search_fields (list)`: The fields to search by.
+        - `actions (list)`: The bulk actions.
 
     Methods:
-        - `None`
+        - `get_queryset(self, request: HttpRequest) -> QuerySet[Question]`
+        - `get_object(self, request: HttpRequest, object_id: str,
+        from_field: str | None = None) -> Question | None`
+        - `get_list_filter(self, request: HttpRequest) -> list[Any]`
+        - `save_model(self, request: HttpRequest, obj: Question, form:
+        ModelForm, change: bool) -> None`
+        - `get_actions(self, request: HttpRequest) -> dict[str, Any]`
+        - `confirm_bulk_action(self, request: HttpRequest, queryset:
+        QuerySet[Question], action: str, title: str, form_class:
+        type[forms.Form], perform: Callable[..., int]) -> TemplateResponse |
+        None`
+        - `reset_votes(self, request: HttpRequest, queryset:
+        QuerySet[Question]) -> TemplateResponse | None`
+        - `reschedule(self, request: HttpRequest, queryset:
+        QuerySet[Question]) -> TemplateResponse | None`
+        - `delete_questions(self, request: HttpRequest, queryset:
+        QuerySet[Question]) -> TemplateResponse | None`
 
     """
 
@@ -54,7 +355,7 @@ class QuestionAdmin(admin.ModelAdmin):
         (None, {"fields": ["question_text"]}),
         (
             "Date information",
-            {"fields": ["pub_date"], "classes": ["collapse"]},
+            {"fields": ["pub_date", "closes_at"], "classes": ["collapse"]},
         ),
     ]
     inlines = [ChoiceInline]
@@ -63,9 +364,213 @@ class QuestionAdmin(admin.ModelAdmin):
         "question_text",
         "pub_date",
         "was_published_recently",
+        "closes_at",
     ]
-    list_filter = ["pub_date"]
+    list_filter = ["pub_date", "closes_at"]
     search_fields = ["question_text"]
+    actions = ["reset_votes", "reschedule", "delete_questions"]
+
+    def get_queryset(self, request: HttpRequest) -> QuerySet[Question]:
+        """
+        Returns the questions of the picked shard.
+        """
+
+        return super().get_queryset(request).using(get_shard(request=request))
+
+    def get_object(
+        self,
+        request: HttpRequest,
+        object_id: str,
+        from_field: str | None = None,
+    ) -> Question | None:
+        """
+        Returns the edited question, read from its own shard.
+        """
+
+        if not is_sharded() or from_field is not None:
+            return super().get_object(request, object_id, from_field)
+
+        try:
+            return (
+                super()
+                .get_queryset(request)
+                .using(shard_for(question_id=object_id))
+                .get(pk=object_id)
+            )
+
+        except (Question.DoesNotExist, ValueError):  # type: ignore
+            return None
+
+    def get_list_filter(self, request: HttpRequest) -> list[Any]:
+        """
+        Adds the shard filter while sharding is on.
+        """
+
+        if is_sharded():
+            return [ShardListFilter, *self.list_filter]
+
+        return list(self.list_filter)
+
+    def save_model(
+        self,
+        request: HttpRequest,
+        obj: Question,
+        form: ModelForm,
+        change: bool,
+    ) -> None:
+        """
+        Saves the edited fields only, so that an edit never overwrites the
+        trending score that votes updated while the form was open.
+
+        """
+
+        if change:
+            obj.save(update_fields=form.changed_data or ["question_text"])
+        else:
+            obj.save()
+
+    def get_actions(self, request: HttpRequest) -> dict[str, Any]:
+        """
+        Get Actions Method
+
+        Description:
+            - This method replaces the default delete action, which loads and
+            signals every selected object, with `delete_questions`.
+
+        Args:
+            - `request (HttpRequest)`: The request object.  **(Required)**
+
+        Returns:
+            - `actions (dict[str, Any])`: The available actions.
+
+        """
+
+        actions: dict[str, Any] = super().get_actions(request)
+        actions.pop("delete_selected", None)
+
+        return actions
+
+    def confirm_bulk_action(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet[Question],
+        action: str,
+        title: str,
+        form_class: type[forms.Form],
+        perform: Callable[..., int],
+    ) -> TemplateResponse | None:
+        """
+        Confirm Bulk Action Method
+
+        Description:
+            - This method renders the confirmation page of a bulk action, and
+            runs the action once the page is posted back with a valid form.
+            - The page re-posts the selection as it came, so "select all"
+            across pages stays a filter instead of a list of ids.
+
+        Args:
+            - `request (HttpRequest)`: The request object.  **(Required)**
+            - `queryset (QuerySet[Question])`: The selected questions.
+            **(Required)**
+            - `action (str)`: The name of the action.  **(Required)**
+            - `title (str)`: The title of the page.  **(Required)**
+            - `form_class (type[forms.Form])`: The form of the action.
+            **(Required)**
+            - `perform (Callable[..., int])`: The bulk operation, called with
+            the queryset and the cleaned form data.  **(Required)**
+
+        Returns:
+            - `response (TemplateResponse | None)`: The confirmation page, or
+            None to return to the change list.
+
+        """
+
+        form: forms.Form = form_class(
+            data=request.POST if request.POST.get("post") else None
+        )
+
+        if form.is_bound and form.is_valid():
+            count: int = perform(queryset=queryset, **form.cleaned_data)
+            self.message_user(
+                request=request,
+                message=f"{title}: {count} question{'s' * (count != 1)}.",
+                level=messages.SUCCESS,
+            )
+            return None
+
+        context: dict[str, Any] = {
+            **self.admin_site.each_context(request),
+            "title": title,
+            "opts": self.model._meta,  # pylint: disable=protected-access
+            "media": self.media + form.media,
+            "form": form,
+            "summary": bulk.summarize(queryset=queryset),
+            "action": action,
+            "action_checkbox_name": ACTION_CHECKBOX_NAME,
+            "selected": request.POST.getlist(ACTION_CHECKBOX_NAME),
+            "select_across": request.POST.get("select_across") == "1",
+        }
+
+        return TemplateResponse(
+            request=request,
+            template="polls/admin/bulk_confirmation.html",
+            context=context,
+        )
+
+    @admin.action(description="Reset votes", permissions=["change"])
+    def reset_votes(
+        self, request: HttpRequest, queryset: QuerySet[Question]
+    ) -> TemplateResponse | None:
+        """
+        Sets the votes and trending score of the selection to zero.
+        """
+
+        return self.confirm_bulk_action(
+            request=request,
+            queryset=queryset,
+            action="reset_votes",
+            title="Reset votes",
+            form_class=forms.Form,
+            perform=bulk.reset_votes,
+        )
+
+    @admin.action(
+        description="Change publication date", permissions=["change"]
+    )
+    def reschedule(
+        self, request: HttpRequest, queryset: QuerySet[Question]
+    ) -> TemplateResponse | None:
+        """
+        Publishes the selection at a new date.
+        """
+
+        return self.confirm_bulk_action(
+            request=request,
+            queryset=queryset,
+            action="reschedule",
+            title="Change publication date",
+            form_class=RescheduleForm,
+            perform=bulk.reschedule,
+        )
+
+    @admin.action(
+        description="Delete selected questions", permissions=["delete"]
+    )
+    def delete_questions(
+        self, request: HttpRequest, queryset: QuerySet[Question]
+    ) -> TemplateResponse | None:
+        """
+        Deletes the selection and its choices.
+        """
+
+        return self.confirm_bulk_action(
+            request=request,
+            queryset=queryset,
+            action="delete_questions",
+            title="Delete questions",
+            form_class=DeleteForm,
+            perform=bulk.delete_questions,
+        )
 
 
 admin.site.register(model_or_iterable=Question, admin_class=QuestionAdmin)
@@ -21,10 +21,30 @@ class PollsConfig(AppConfig):
         - `name (str)`: The name of the app.
 
     Methods:
-        - `None`
+        - `ready(self) -> None`
 
     """
 
     default_auto_field: str = "django.db.models.BigAutoField"
     name: str = "django_polls"
     label: str = "polls"
+
+    def ready(self) -> None:
+        """
+        Ready Method
+
+        Description:
+            - This method connects the signal receivers of the polls app.
+            - The cache warm-up isn't started here, since every management
+            command runs this too; the server entry points start it with
+            `django_polls.warmup.warm_up_on_start`.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `None`
+
+        """
+
+        from . import signals  # noqa: F401  pylint: disable=unused-import
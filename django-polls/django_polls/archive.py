@@ -0,0 +1,211 @@
+"""
+Polls Archive Module
+
+Description:
+    - This module contains the archive of cold questions.
+    - Questions published before a threshold are moved, with their choices
+    and final tallies, from the question and choice tables to one compact
+    `ArchivedQuestion` row each, and optionally appended to a gzip
+    compressed JSON lines file. Their voter bitmaps are dropped, so
+    archived results have no segments.
+    - Archived results stay readable through the usual results URL, which
+    falls back to the archive when the question is gone.
+    - Every shard is archived in turn. The archive table stays on the default
+    database, and a batch is written there before it leaves its shard, so a
+    failure in between leaves the batch to be archived again by the next run.
+    A batch is appended to the export only once it left its shard.
+
+"""
+
+import gzip
+import json
+from datetime import datetime
+from typing import Any
+
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from .models import ArchivedQuestion, Choice, ChoiceBitmap, Question
+from .results import (
+    FrozenChoice,
+    FrozenResults,
+    get_frozen_results,
+    store_frozen_results,
+)
+from .sharding import get_shards
+
+
+def archive_questions(
+    before: datetime, batch_size: int = 500, export: str | None = None
+) -> int:
+    """
+    Archive Questions Function
+
+    Description:
+        - This function archives every question published before `before`,
+        on every shard, one batch of primary keys per transaction.
+        - Open questions are archived as closed at the archiving time.
+
+    Args:
+        - `before (datetime)`: The publication threshold.  **(Required)**
+        - `batch_size (int)`: The questions per transaction.  **(Optional)**
+        - `export (str | None)`: The path of a gzip JSON lines file the
+        archived questions are appended to.  **(Optional)**
+
+    Returns:
+        - `archived (int)`: The number of archived questions.
+
+    """
+
+    archived: int = 0
+
+    for using in get_shards():
+        while True:
+            count: int = _archive_batch(
+                before=before,
+                batch_size=batch_size,
+                export=export,
+                using=using,
+            )
+            if not count:
+                break
+
+            archived += count
+
+    return archived
+
+
+def _archive_batch(
+    before: datetime, batch_size: int, export: str | None, using: str
+) -> int:
+    """
+    Archives one batch of the questions of a shard and returns its size.
+    """
+
+    now: datetime = timezone.now()
+
+    with transaction.atomic(using=using):
+        questions: dict[int, dict[str, Any]] = {
+            row["id"]: row
+            for row in Question.objects.using(using)  # type: ignore
+            .filter(pub_date__lt=before)
+            .order_by("pk")
+            .values("id", "question_text", "pub_date", "closes_at")[
+                :batch_size
+            ]
+        }
+        if not questions:
+            return 0
+
+        tallies: dict[int, list[list[Any]]] = {pk: [] for pk in questions}
+        for pk, question_id, choice_text, votes in (
+            Choice.objects.using(using)  # pylint: disable=no-member
+            .filter(question_id__in=questions)
+            .order_by("pk")
+            .values_list("id", "question_id", "choice_text", "votes")
+        ):
+            tallies[question_id].append([pk, choice_text, votes])
+
+        rows: list[ArchivedQuestion] = [
+            ArchivedQuestion(
+                id=pk,
+                question_text=question["question_text"],
+                pub_date=question["pub_date"],
+                closes_at=(
+                    question["closes_at"]
+                    if question["closes_at"] and question["closes_at"] < now
+                    else now
+                ),
+                archived_at=now,
+                results=tallies[pk],
+            )
+            for pk, question in questions.items()
+        ]
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            ArchivedQuestion.objects.bulk_create(  # pylint: disable=no-member
+                objs=rows, ignore_conflicts=True
+            )
+
+        # The choices go in one statement, skipping their delete signals:
+        # those of the questions already drop the cached pages, the search
+        # documents and the publishing snapshot.
+        Choice.objects.filter(  # pylint: disable=no-member
+            question_id__in=questions
+        )._raw_delete(using=using)
+        ChoiceBitmap.objects.using(using).filter(  # pylint: disable=no-member
+            question_id__in=questions
+        ).delete()
+        Question.objects.using(using).filter(  # pylint: disable=no-member
+            pk__in=questions
+        ).delete()
+
+    # Exported once the batch left its shard, so a batch that rolls back is
+    # not exported twice.
+    if export:
+        _export(rows=rows, export=export)
+
+    return len(questions)
+
+
+def _export(rows: list[ArchivedQuestion], export: str) -> None:
+    """
+    Appends archived questions to a gzip JSON lines file.
+    """
+
+    with gzip.open(filename=export, mode="at") as file:
+        file.writelines(
+            json.dumps(
+                obj={
+                    "id": row.id,
+                    "question_text": row.question_text,
+                    "pub_date": row.pub_date.isoformat(),
+                    "closes_at": row.closes_at.isoformat(),
+                    "results": row.results,
+                }
+            )
+            + "\n"
+            for row in rows
+        )
+
+
+def get_archived_results(question_id: int | str) -> FrozenResults | None:
+    """
+    Get Archived Results Function
+
+    Description:
+        - This function returns the final results of an archived question.
+        - They are stored with the frozen results of closed questions, so the
+        archive table is read once per question.
+
+    Args:
+        - `question_id (int | str)`: The question id.  **(Required)**
+
+    Returns:
+        - `results (FrozenResults | None)`: The final results, or None if the
+        question isn't archived.
+
+    """
+
+    results: FrozenResults | None = get_frozen_results(question_id=question_id)
+    if results is not None:
+        return results
+
+    archived: ArchivedQuestion | None = (
+        ArchivedQuestion.objects.filter(  # pylint: disable=no-member
+            pk=int(question_id)
+        ).first()
+    )
+    if archived is None:
+        return None
+
+    results = FrozenResults(
+        id=archived.id,
+        question_text=archived.question_text,
+        choices=tuple(
+            FrozenChoice(id=pk, choice_text=choice_text, votes=votes)
+            for pk, choice_text, votes in archived.results
+        ),
+    )
+    store_frozen_results(results=results)
+
+    return results
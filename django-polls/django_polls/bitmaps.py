@@ -0,0 +1,405 @@
+"""
+Polls Bitmaps Module
+
+Description:
+    - This module contains the voter bitmaps of the polls app, which break
+    results down by segment, e.g. the votes for each choice among the voters
+    who picked a given choice of another question.
+    - Each voter gets a dense ordinal, kept in a signed cookie rather than in
+    its session, so voting neither reads nor writes sessions and visitors
+    without a session keep the fast path. Each choice keeps
+    the set of ordinals of its voters as a roaring-style bitmap: ordinals
+    are split into containers of 65,536 by their high bits, and each
+    container is stored as a sorted array of 16-bit values while it is
+    sparse, as an 8 KiB bitset once it is dense.
+    - In memory, containers are Python integers, so intersecting segments
+    and counting voters are integer `&` and `bit_count` per container,
+    without scanning any ballots.
+    - Votes cast before the bitmaps existed are in the tallies but not in
+    the bitmaps.
+
+"""
+
+import struct
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.http import HttpRequest, HttpResponse
+
+from .models import ChoiceBitmap, Question, Voter
+from .sharding import get_shards, shard_for
+
+CONTAINER_BITS: int = 16
+CONTAINER_SIZE: int = 1 << CONTAINER_BITS
+BITSET_BYTES: int = CONTAINER_SIZE // 8
+# Containers holding more values than this are stored as bitsets, which are
+# smaller from there on.
+ARRAY_LIMIT: int = 4_096
+VOTER_COOKIE: str = "polls_voter"
+VOTER_COOKIE_SALT: str = "django_polls.bitmaps"
+VOTER_COOKIE_AGE: int = 10 * 365 * 24 * 60 * 60
+NEW_VOTER_ATTRIBUTE: str = "polls_new_voter"
+
+
+def decode_container(data: bytes | memoryview) -> int:
+    """
+    Decode Container Function
+
+    Description:
+        - This function reads a stored container into an integer whose set
+        bits are its values.
+
+    Args:
+        - `data (bytes | memoryview)`: The stored container.  **(Required)**
+
+    Returns:
+        - `bits (int)`: The values of the container.
+
+    """
+
+    data = bytes(data)
+    if len(data) == BITSET_BYTES:
+        return int.from_bytes(data, byteorder="little")
+
+    bitset: bytearray = bytearray(BITSET_BYTES)
+    for value in struct.unpack(f"<{len(data) // 2}H", data):
+        bitset[value >> 3] |= 1 << (value & 7)
+
+    return int.from_bytes(bitset, byteorder="little")
+
+
+def encode_container(bits: int) -> bytes:
+    """
+    Encode Container Function
+
+    Description:
+        - This function stores a container as a sorted array of values, or
+        as a bitset once it holds more than `ARRAY_LIMIT` values.
+
+    Args:
+        - `bits (int)`: The values of the container.  **(Required)**
+
+    Returns:
+        - `data (bytes)`: The stored container.
+
+    """
+
+    bitset: bytes = bits.to_bytes(length=BITSET_BYTES, byteorder="little")
+    if bits.bit_count() > ARRAY_LIMIT:
+        return bitset
+
+    values: list[int] = [
+        index << 3 | bit
+        for index, byte in enumerate(bitset)
+        if byte
+        for bit in range(8)
+        if byte >> bit & 1
+    ]
+
+    return struct.pack(f"<{len(values)}H", *values)
+
+
+class Bitmap:
+    """
+    Bitmap Class
+
+    Description:
+        - This class is a set of voter ordinals, as integer containers keyed
+        by the high bits of the ordinals. Empty containers are dropped.
+
+    Attributes:
+        - `containers (dict[int, int])`: The containers by key.
+
+    Methods:
+        - `from_ordinals(cls, ordinals: Iterable[int]) -> Bitmap`
+        - `add(self, ordinal: int) -> None`
+        - `__contains__(self, ordinal: int) -> bool`
+        - `__len__(self) -> int`
+        - `__iter__(self) -> Iterator[int]`
+        - `__and__(self, other: Bitmap) -> Bitmap`
+        - `__or__(self, other: Bitmap) -> Bitmap`
+        - `__eq__(self, other: object) -> bool`
+
+    """
+
+    __slots__ = ("containers",)
+
+    def __init__(self, containers: dict[int, int] | None = None) -> None:
+        self.containers: dict[int, int] = {
+            key: bits for key, bits in (containers or {}).items() if bits
+        }
+
+    @classmethod
+    def from_ordinals(cls, ordinals: Iterable[int]) -> "Bitmap":
+        """
+        Returns the bitmap of some ordinals.
+        """
+
+        bitmap: Bitmap = cls()
+        for ordinal in ordinals:
+            bitmap.add(ordinal=ordinal)
+
+        return bitmap
+
+    def add(self, ordinal: int) -> None:
+        """
+        Adds an ordinal to the bitmap.
+        """
+
+        key, value = divmod(ordinal, CONTAINER_SIZE)
+        self.containers[key] = self.containers.get(key, 0) | 1 << value
+
+    def __contains__(self, ordinal: int) -> bool:
+        key, value = divmod(ordinal, CONTAINER_SIZE)
+        return bool(self.containers.get(key, 0) >> value & 1)
+
+    def __len__(self) -> int:
+        return sum(bits.bit_count() for bits in self.containers.values())
+
+    def __iter__(self) -> Iterator[int]:
+        for key in sorted(self.containers):
+            bits: int = self.containers[key]
+            while bits:
+                low: int = bits & -bits
+                yield key * CONTAINER_SIZE + low.bit_length() - 1
+                bits ^= low
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        return Bitmap(
+            containers={
+                key: bits & other.containers[key]
+                for key, bits in self.containers.items()
+                if key in other.containers
+            }
+        )
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        containers: dict[int, int] = dict(self.containers)
+        for key, bits in other.containers.items():
+            containers[key] = containers.get(key, 0) | bits
+
+        return Bitmap(containers=containers)
+
+    def __eq__(self, other: object) -> bool:
+        return (
+            isinstance(other, Bitmap) and self.containers == other.containers
+        )
+
+    def __repr__(self) -> str:
+        return f"<Bitmap of {len(self)} voters>"
+
+
+def get_voter(request: HttpRequest) -> int:
+    """
+    Get Voter Function
+
+    Description:
+        - This function returns the ordinal of the voter of a request, read
+        from its signed cookie, and gives a new voter the next ordinal with
+        one query. The view sets the cookie of a new voter on its response
+        with `remember_voter`.
+        - A cookie whose signature doesn't match is ignored.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+
+    Returns:
+        - `ordinal (int)`: The ordinal of the voter.
+
+    """
+
+    ordinal: str | None = request.get_signed_cookie(
+        key=VOTER_COOKIE, default=None, salt=VOTER_COOKIE_SALT
+    )
+    if ordinal is not None and ordinal.isdigit():
+        return int(ordinal)
+
+    voter: int = Voter.objects.create().pk  # type: ignore
+    setattr(request, NEW_VOTER_ATTRIBUTE, voter)
+
+    return voter
+
+
+def remember_voter(request: HttpRequest, response: HttpResponse) -> None:
+    """
+    Remember Voter Function
+
+    Description:
+        - This function sets the signed cookie of a voter that `get_voter`
+        gave an ordinal during the request.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+        - `response (HttpResponse)`: The response object.  **(Required)**
+
+    Returns:
+        - `None`
+
+    """
+
+    voter: int | None = getattr(request, NEW_VOTER_ATTRIBUTE, None)
+    if voter is None:
+        return
+
+    response.set_signed_cookie(
+        key=VOTER_COOKIE,
+        value=str(voter),
+        salt=VOTER_COOKIE_SALT,
+        max_age=VOTER_COOKIE_AGE,
+        secure=settings.SESSION_COOKIE_SECURE,
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def add_voter(ordinal: int, votes: dict[int, int], using: str) -> None:
+    """
+    Add Voter Function
+
+    Description:
+        - This function adds a voter to the bitmaps of the choices it voted
+        for, in the transaction of the votes. It takes one query to read and
+        lock the containers of the voter and one to write those that
+        changed, plus two to create and lock the containers it is the first
+        voter of.
+
+    Args:
+        - `ordinal (int)`: The ordinal of the voter.  **(Required)**
+        - `votes (dict[int, int])`: The chosen choice id by question id.
+        **(Required)**
+        - `using (str)`: The shard of the questions.  **(Required)**
+
+    Returns:
+        - `None`
+
+    """
+
+    key, value = divmod(ordinal, CONTAINER_SIZE)
+    questions: dict[int, int] = {
+        choice_id: question_id for question_id, choice_id in votes.items()
+    }
+    containers: QuerySet[ChoiceBitmap] = (
+        ChoiceBitmap.objects.using(  # pylint: disable=no-member
+            using
+        ).select_for_update()
+    )
+    rows: list[ChoiceBitmap] = list(
+        containers.filter(choice_id__in=questions, key=key)
+    )
+    missing: set[int] = set(questions) - {row.choice_id for row in rows}
+
+    if missing:
+        ChoiceBitmap.objects.using(using).bulk_create(
+            objs=[
+                ChoiceBitmap(
+                    question_id=questions[choice_id],
+                    choice_id=choice_id,
+                    key=key,
+                )
+                for choice_id in missing
+            ],
+            ignore_conflicts=True,
+        )
+        rows += containers.filter(choice_id__in=missing, key=key)
+
+    changed: list[ChoiceBitmap] = []
+    for row in rows:
+        bits: int = decode_container(data=row.container)
+        if not bits >> value & 1:
+            row.container = encode_container(bits=bits | 1 << value)
+            changed.append(row)
+
+    ChoiceBitmap.objects.using(using).bulk_update(
+        objs=changed, fields=["container"]
+    )
+
+
+def load_bitmaps(query: Q, using: str) -> dict[int, Bitmap]:
+    """
+    Load Bitmaps Function
+
+    Description:
+        - This function reads the voter bitmaps of some choices from a
+        shard, in one query.
+
+    Args:
+        - `query (Q)`: The filter of the bitmap containers.  **(Required)**
+        - `using (str)`: The shard.  **(Required)**
+
+    Returns:
+        - `bitmaps (dict[int, Bitmap])`: The bitmaps by choice id.
+
+    """
+
+    bitmaps: dict[int, Bitmap] = {}
+    for choice_id, key, container in (
+        ChoiceBitmap.objects.using(using)  # pylint: disable=no-member
+        .filter(query)
+        .values_list("choice_id", "key", "container")
+    ):
+        bitmaps.setdefault(choice_id, Bitmap()).containers[key] = (
+            decode_container(data=container)
+        )
+
+    return bitmaps
+
+
+def crosstab(question: Question, filters: list[int]) -> dict[str, Any]:
+    """
+    Crosstab Function
+
+    Description:
+        - This function breaks the voters of a question down by choice,
+        among the voters who picked every choice in `filters`, of any
+        question.
+        - It reads the bitmaps of the question and of the filters, one query
+        per shard holding them, and intersects them in memory.
+
+    Args:
+        - `question (Question)`: The question.  **(Required)**
+        - `filters (list[int])`: The ids of the choices the voters picked.
+        **(Required)**
+
+    Returns:
+        - `crosstab (dict[str, Any])`: The number of voters in the segment,
+        and of those who picked each choice of the question.
+
+    """
+
+    query: Q = Q(question_id=question.pk)
+    shards: list[str] = [shard_for(question_id=question.pk)]
+    if filters:
+        query |= Q(choice_id__in=filters)
+        shards = get_shards()
+
+    bitmaps: dict[int, Bitmap] = {}
+    for using in shards:
+        bitmaps.update(load_bitmaps(query=query, using=using))
+
+    choices: list[tuple[int, str]] = list(
+        question.choice_set.order_by("pk").values_list(  # type: ignore
+            "id", "choice_text"
+        )
+    )
+    voters: Bitmap = Bitmap()
+    for choice_id, _ in choices:
+        voters |= bitmaps.get(choice_id, Bitmap())
+
+    for choice_id in filters:
+        voters &= bitmaps.get(choice_id, Bitmap())
+
+    return {
+        "question": question.pk,
+        "filters": filters,
+        "voters": len(voters),
+        "choices": [
+            {
+                "id": choice_id,
+                "choice_text": choice_text,
+                "voters": len(bitmaps.get(choice_id, Bitmap()) & voters),
+            }
+            for choice_id, choice_text in choices
+        ],
+    }
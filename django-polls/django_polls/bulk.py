@@ -0,0 +1,243 @@
+"""
+Polls Bulk Module
+
+Description:
+    - This module contains the set-based bulk operations behind the question
+    admin actions.
+    - Every operation walks the selected questions in chunks of primary keys
+    and runs one `UPDATE` or `DELETE` per table and chunk, each chunk in its
+    own transaction, so thousands of questions never hold one long lock.
+    - Model signals are not sent. Instead, the caches the signal receivers
+    would clear are cleared once per chunk.
+    - Operations run on the database of the queryset, so on one shard at a
+    time; the admin selects questions on the shard it lists.
+
+"""
+
+from collections.abc import Iterator
+from datetime import datetime
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, QuerySet, Sum
+
+from .models import Choice, ChoiceBitmap, Question
+from .pages import delete_detail_pages
+from .publishing import schedule
+from .results import thaw_many_results
+from .search import reindex
+
+
+def get_chunk_size() -> int:
+    return getattr(settings, "POLLS_ADMIN_CHUNK_SIZE", 1_000)
+
+
+def iter_chunks(queryset: QuerySet[Question]) -> Iterator[list[int]]:
+    """
+    Iter Chunks Function
+
+    Description:
+        - This function yields the primary keys of a queryset in ascending
+        chunks, reading each chunk with a keyset query, so the selection is
+        never loaded at once.
+
+    Args:
+        - `queryset (QuerySet[Question])`: The selected questions.
+        **(Required)**
+
+    Returns:
+        - `chunks (Iterator[list[int]])`: The primary keys, chunk by chunk.
+
+    """
+
+    last_pk: int = 0
+    size: int = get_chunk_size()
+
+    while True:
+        pks: list[int] = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:size]
+        )
+        if not pks:
+            return
+
+        yield pks
+        last_pk = pks[-1]
+
+
+def _invalidate(question_ids: list[int], using: str) -> None:
+    """
+    Clears the caches built from the given questions once the change is
+    committed.
+    """
+
+    def invalidate() -> None:
+        delete_detail_pages(question_ids=question_ids)
+        thaw_many_results(question_ids=question_ids)
+        schedule.invalidate()
+
+    transaction.on_commit(func=invalidate, using=using)
+
+
+def summarize(queryset: QuerySet[Question]) -> dict[str, Any]:
+    """
+    Summarize Function
+
+    Description:
+        - This function counts the selected questions, their choices and
+        their votes with a single aggregate query.
+
+    Args:
+        - `queryset (QuerySet[Question])`: The selected questions.
+        **(Required)**
+
+    Returns:
+        - `summary (dict[str, Any])`: The `questions`, `choices` and `votes`
+        counts.
+
+    """
+
+    summary: dict[str, Any] = queryset.order_by().aggregate(
+        questions=Count("pk", distinct=True),
+        choices=Count("choice"),
+        votes=Sum("choice__votes"),
+    )
+    summary["votes"] = summary["votes"] or 0
+
+    return summary
+
+
+def reset_votes(queryset: QuerySet[Question]) -> int:
+    """
+    Reset Votes Function
+
+    Description:
+        - This function sets the votes of every choice and the trending score
+        of the selected questions to zero, and empties their voter bitmaps.
+
+    Args:
+        - `queryset (QuerySet[Question])`: The selected questions.
+        **(Required)**
+
+    Returns:
+        - `reset (int)`: The number of updated questions.
+
+    """
+
+    using: str = queryset.db
+    reset: int = 0
+
+    for pks in iter_chunks(queryset=queryset):
+        with transaction.atomic(using=using):
+            Choice.objects.using(using).filter(  # pylint: disable=no-member
+                question_id__in=pks
+            ).update(votes=0)
+            ChoiceBitmap.objects.using(  # pylint: disable=no-member
+                using
+            ).filter(question_id__in=pks).delete()
+            reset += (
+                Question.objects.using(using)  # pylint: disable=no-member
+                .filter(pk__in=pks)
+                .update(trending_score=0.0)
+            )
+            _invalidate(question_ids=pks, using=using)
+
+    return reset
+
+
+def reschedule(queryset: QuerySet[Question], pub_date: datetime) -> int:
+    """
+    Reschedule Function
+
+    Description:
+        - This function sets the publication date of the selected questions.
+        A date in the future unpublishes them until then.
+
+    Args:
+        - `queryset (QuerySet[Question])`: The selected questions.
+        **(Required)**
+        - `pub_date (datetime)`: The new publication date.  **(Required)**
+
+    Returns:
+        - `updated (int)`: The number of updated questions.
+
+    """
+
+    using: str = queryset.db
+    updated: int = 0
+
+    for pks in iter_chunks(queryset=queryset):
+        with transaction.atomic(using=using):
+            updated += (
+                Question.objects.using(using)  # pylint: disable=no-member
+                .filter(pk__in=pks)
+                .update(pub_date=pub_date)
+            )
+            _invalidate(question_ids=pks, using=using)
+
+    return updated
+
+
+def delete_questions(
+    queryset: QuerySet[Question], send_signals: bool = False
+) -> int:
+    """
+    Delete Questions Function
+
+    Description:
+        - This function deletes the selected questions, their choices and
+        their voter bitmaps.
+        - By default each chunk takes one `DELETE` per table and the search
+        index is updated once per chunk. With `send_signals`, the chunks are
+        deleted through the ORM collector instead, which sends the delete
+        signals of every question and choice.
+
+    Args:
+        - `queryset (QuerySet[Question])`: The selected questions.
+        **(Required)**
+        - `send_signals (bool)`: Send per-object delete signals.
+        **(Optional)**
+
+    Returns:
+        - `deleted (int)`: The number of deleted questions.
+
+    """
+
+    using: str = queryset.db
+    deleted: int = 0
+
+    for pks in iter_chunks(queryset=queryset):
+        with transaction.atomic(using=using):
+            questions: QuerySet[Question] = Question.objects.using(
+                using
+            ).filter(  # pylint: disable=no-member
+                pk__in=pks
+            )
+
+            ChoiceBitmap.objects.using(  # pylint: disable=no-member
+                using
+            ).filter(question_id__in=pks).delete()
+
+            if send_signals:
+                deleted += questions.delete()[1].get(
+                    Question._meta.label, 0  # pylint: disable=protected-access
+                )
+                continue
+
+            Choice.objects.filter(  # pylint: disable=no-member
+                question_id__in=pks
+            )._raw_delete(using=using)
+            deleted += (
+                questions._raw_delete(  # pylint: disable=protected-access
+                    using=using
+                )
+            )
+            _invalidate(question_ids=pks, using=using)
+            transaction.on_commit(
+                func=lambda pks=pks: reindex(question_ids=pks, using=using),
+                using=using,
+            )
+
+    return deleted
@@ -0,0 +1,50 @@
+"""
+Polls Management Base Module
+
+Description:
+    - This module contains the base class of the management commands of the
+    polls app.
+
+"""
+
+from collections.abc import Callable
+from contextlib import AbstractContextManager
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import import_string
+
+
+class PollsCommand(BaseCommand):
+    """
+    Polls Command Class
+
+    Description:
+        - This class is the base of the polls commands. It runs each command
+        inside the context manager named by the `POLLS_COMMAND_WRAPPER`
+        setting, if any, called with the label "command <name>", so a
+        project can e.g. measure the batch commands of the app.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `execute(self, *args: Any, **options: Any) -> Any`
+
+    """
+
+    def execute(self, *args: Any, **options: Any) -> Any:
+        """
+        Runs the command inside the configured wrapper.
+        """
+
+        path: str | None = getattr(settings, "POLLS_COMMAND_WRAPPER", None)
+        if not path:
+            return super().execute(*args, **options)
+
+        wrapper: Callable[..., AbstractContextManager[Any]] = import_string(
+            dotted_path=path
+        )
+        with wrapper(label=f"command {self.__module__.rsplit('.', 1)[-1]}"):
+            return super().execute(*args, **options)
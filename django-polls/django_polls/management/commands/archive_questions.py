@@ -0,0 +1,65 @@
+"""
+Archive Questions Command Module
+
+Description:
+    - This module contains the command that archives cold questions.
+
+"""
+
+from datetime import timedelta
+from typing import Any
+
+from django.core.management.base import CommandParser
+from django.utils import timezone
+
+from django_polls.archive import archive_questions
+from django_polls.management.base import PollsCommand
+
+
+class Command(PollsCommand):
+    """
+    Archive Questions Command
+
+    Description:
+        - This command moves the questions published more than `--days` ago
+        out of the question and choice tables of every shard, see
+        `django_polls.archive`.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Move questions older than a threshold to the archive."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Archive questions published more than this many days ago.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of questions archived per transaction.",
+        )
+        parser.add_argument(
+            "--export",
+            default=None,
+            help="Also append the archived questions to this .jsonl.gz file.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        archived: int = archive_questions(
+            before=timezone.now() - timedelta(days=options["days"]),
+            batch_size=options["batch_size"],
+            export=options["export"],
+        )
+
+        self.stdout.write(f"Archived {archived} questions.")
@@ -0,0 +1,177 @@
+"""
+Rebalance Shards Command Module
+
+Description:
+    - This module contains the command that moves questions to the shard
+    the hash ring assigns them.
+
+"""
+
+from collections import Counter
+from typing import Any
+
+from django.core.management.base import CommandParser
+from django.db import transaction
+
+from django_polls.management.base import PollsCommand
+from django_polls.models import Choice, ChoiceBitmap, Question
+from django_polls.publishing import schedule
+from django_polls.search import reindex
+from django_polls.sharding import get_shards, group_by_shard
+
+
+def _delete(question_ids: list[int], using: str) -> None:
+    ChoiceBitmap.objects.using(using).filter(  # pylint: disable=no-member
+        question_id__in=question_ids
+    ).delete()
+    Choice.objects.using(using).filter(  # pylint: disable=no-member
+        question_id__in=question_ids
+    )._raw_delete(using=using)
+    Question.objects.using(using).filter(  # pylint: disable=no-member
+        pk__in=question_ids
+    )._raw_delete(using=using)
+
+
+class Command(PollsCommand):
+    """
+    Rebalance Shards Command
+
+    Description:
+        - This command moves every question whose shard changed, together
+        with its choices and voter bitmaps, after shards were added to or
+        removed from the `POLLS_SHARDS` setting. Removed shards are drained
+        by naming them with `--drain`.
+        - Each batch is copied in a transaction on the new shard and deleted
+        in a transaction on the old one, the copy committing first. A batch
+        interrupted in between is copied again on the next run.
+        - Until a question is moved, lookups by id look for it on its new
+        shard, so run the command right after changing the setting.
+        - Vote events stay in the outbox of the shard they were written to.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `move(self, question_ids: list[int], source: str, target: str) ->
+        None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Move questions to the shards the hash ring assigns them."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="The number of questions checked per batch.",
+        )
+        parser.add_argument(
+            "--drain",
+            nargs="*",
+            default=[],
+            help="Databases that are no longer shards to move questions off.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only count the questions that would move.",
+        )
+
+    def move(self, question_ids: list[int], source: str, target: str) -> None:
+        """
+        Move Method
+
+        Description:
+            - This method copies questions, their choices and their voter
+            bitmaps from one shard to another, then deletes them from the
+            first one and updates the search index of both.
+
+        Args:
+            - `question_ids (list[int])`: The question ids.  **(Required)**
+            - `source (str)`: The current shard.  **(Required)**
+            - `target (str)`: The new shard.  **(Required)**
+
+        Returns:
+            - `None`
+
+        """
+
+        with transaction.atomic(using=source), transaction.atomic(
+            using=target
+        ):
+            questions: list[Question] = list(
+                Question.objects.using(source)  # pylint: disable=no-member
+                .select_for_update()
+                .filter(pk__in=question_ids)
+            )
+            choices: list[Choice] = list(
+                Choice.objects.using(
+                    source
+                ).filter(  # pylint: disable=no-member
+                    question_id__in=question_ids
+                )
+            )
+            bitmaps: list[ChoiceBitmap] = list(
+                ChoiceBitmap.objects.using(  # pylint: disable=no-member
+                    source
+                ).filter(question_id__in=question_ids)
+            )
+            # Unlike questions and choices, bitmaps get their ids from the
+            # shard they are written to.
+            for bitmap in bitmaps:
+                bitmap.pk = None
+
+            # Drop a copy left by an interrupted run before copying again.
+            _delete(question_ids=question_ids, using=target)
+            Question.objects.using(target).bulk_create(objs=questions)
+            Choice.objects.using(target).bulk_create(objs=choices)
+            ChoiceBitmap.objects.using(target).bulk_create(objs=bitmaps)
+            _delete(question_ids=question_ids, using=source)
+
+        reindex(question_ids=question_ids, using=target)
+        reindex(question_ids=question_ids, using=source)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        moved: Counter[tuple[str, str]] = Counter()
+
+        for source in dict.fromkeys([*get_shards(), *options["drain"]]):
+            last_pk: int = 0
+
+            while True:
+                pks: list[int] = list(
+                    Question.objects.using(source)  # pylint: disable=no-member
+                    .filter(pk__gt=last_pk)
+                    .order_by("pk")
+                    .values_list("pk", flat=True)[: options["batch_size"]]
+                )
+                if not pks:
+                    break
+
+                targets: dict[str, list[int]] = group_by_shard(
+                    question_ids=pks
+                )
+                targets.pop(source, None)
+
+                for target, question_ids in targets.items():
+                    if not options["dry_run"]:
+                        self.move(
+                            question_ids=question_ids,
+                            source=source,
+                            target=target,
+                        )
+                    moved[source, target] += len(question_ids)
+
+                last_pk = pks[-1]
+
+        if moved and not options["dry_run"]:
+            schedule.invalidate()
+
+        verb: str = "Would move" if options["dry_run"] else "Moved"
+        for (source, target), count in sorted(moved.items()):
+            self.stdout.write(
+                f"{verb} {count} questions from {source} to {target}."
+            )
+        self.stdout.write(f"{verb} {sum(moved.values())} questions in total.")
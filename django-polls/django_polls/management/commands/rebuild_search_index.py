@@ -0,0 +1,73 @@
+"""
+Rebuild Search Index Command Module
+
+Description:
+    - This module contains the command that rebuilds the question search
+    index.
+
+"""
+
+from typing import Any
+
+from django.core.management.base import CommandParser
+
+from django_polls.management.base import PollsCommand
+from django_polls.models import Question
+from django_polls.search import reindex
+
+
+class Command(PollsCommand):
+    """
+    Rebuild Search Index Command
+
+    Description:
+        - This command rebuilds the search documents of every question in
+        batches of primary keys, for example after the index was created on
+        a database restored from a dump or after a bulk import that bypassed
+        the model signals.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Rebuild the question search index."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1_000,
+            help="The number of questions indexed per batch.",
+        )
+        parser.add_argument(
+            "--database",
+            default="default",
+            help="The database to index.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        last_pk: int = 0
+        indexed: int = 0
+
+        while True:
+            pks: list[int] = list(
+                Question.objects.using(  # pylint: disable=no-member
+                    options["database"]
+                )
+                .filter(pk__gt=last_pk)
+                .order_by("pk")
+                .values_list("pk", flat=True)[: options["batch_size"]]
+            )
+            if not pks:
+                break
+
+            reindex(question_ids=pks, using=options["database"])
+            indexed += len(pks)
+            last_pk = pks[-1]
+
+        self.stdout.write(f"Indexed {indexed} questions.")
@@ -0,0 +1,109 @@
+"""
+Relay Vote Events Command Module
+
+Description:
+    - This module contains the command that drains the vote outbox.
+
+"""
+
+from time import sleep
+from typing import Any
+
+from django.core.management.base import CommandParser
+
+from django_polls.management.base import PollsCommand
+from django_polls.outbox import OutboxSink, get_sink, prune, relay
+from django_polls.sharding import get_shards
+
+
+class Command(PollsCommand):
+    """
+    Relay Vote Events Command
+
+    Description:
+        - This command delivers the pending vote events of every shard to a
+        sink in ordered batches, checkpointing after each batch, either once
+        or in a loop.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Deliver the vote outbox to a sink."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "sink",
+            help="The sink, e.g. file:votes.jsonl or socket:localhost:5170.",
+        )
+        parser.add_argument(
+            "--name",
+            default="default",
+            help="The checkpoint name; use one per sink.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5_000,
+            help="The number of events per batch.",
+        )
+        parser.add_argument(
+            "--lag",
+            type=float,
+            default=1.0,
+            help="The seconds an event waits before it is relayed.",
+        )
+        parser.add_argument(
+            "--gap-timeout",
+            type=float,
+            default=5 * 60,
+            help="The seconds a missing event id is looked up again for.",
+        )
+        parser.add_argument(
+            "--prune",
+            action="store_true",
+            help="Delete the events every checkpoint has passed.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Keep relaying, waiting this many seconds between runs.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        sink: OutboxSink = get_sink(spec=options["sink"])
+
+        try:
+            while True:
+                relayed: int = 0
+                pruned: int = 0
+                for using in get_shards():
+                    relayed += relay(
+                        sink=sink,
+                        name=options["name"],
+                        batch_size=options["batch_size"],
+                        lag=options["lag"],
+                        gap_timeout=options["gap_timeout"],
+                        using=using,
+                    )
+                    if options["prune"]:
+                        pruned += prune(using=using)
+
+                self.stdout.write(f"Relayed {relayed} vote events.")
+
+                if options["prune"]:
+                    self.stdout.write(f"Pruned {pruned} vote events.")
+
+                if options["interval"] is None:
+                    break
+
+                sleep(options["interval"])
+
+        finally:
+            sink.close()
@@ -0,0 +1,57 @@
+"""
+Warm Polls Cache Command Module
+
+Description:
+    - This module contains the command that warms the polls caches.
+
+"""
+
+from typing import Any
+
+from django.core.management.base import CommandParser
+
+from django_polls.management.base import PollsCommand
+from django_polls.warmup import WarmupReport, warm_up
+
+
+class Command(PollsCommand):
+    """
+    Warm Polls Cache Command
+
+    Description:
+        - This command warms the template loader, the index page and the
+        pages of the most active questions, for example right after a
+        deploy, and reports the time taken and the cache hit ratio of the
+        warmed questions before and after.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Warm the polls caches after a deploy or a cold start."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=None,
+            help="The number of most active questions to warm.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="The number of questions rendered concurrently.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        report: WarmupReport = warm_up(
+            top=options["top"], workers=options["workers"]
+        )
+
+        self.stdout.write(report.format())
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-18 23:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("polls", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="question",
+            name="pub_date",
+            field=models.DateTimeField(
+                db_index=True, verbose_name="date published"
+            ),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-18 23:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("polls", "0002_question_pub_date_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="closes_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="date closed"
+            ),
+        ),
+    ]
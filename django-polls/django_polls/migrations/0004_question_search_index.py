@@ -0,0 +1,74 @@
+# Generated by Django 5.1 on 2026-10-19 00:12
+
+from django.conf import settings
+from django.db import migrations
+
+# The index storage as of this migration, frozen here so later changes to
+# django_polls.search don't rewrite it. Other databases have no index.
+INSTALL = {
+    "sqlite": [
+        (
+            "CREATE VIRTUAL TABLE IF NOT EXISTS polls_question_fts USING fts5("
+            "document, tokenize = 'unicode61 remove_diacritics 2', "
+            "prefix = '2 3')"
+        ),
+        (
+            "INSERT INTO polls_question_fts (rowid, document) "
+            "SELECT q.id, q.question_text || char(10) || "
+            "coalesce(group_concat(c.choice_text, char(10)), '') "
+            "FROM polls_question q "
+            "LEFT JOIN polls_choice c ON c.question_id = q.id "
+            "GROUP BY q.id"
+        ),
+    ],
+    "postgresql": [
+        (
+            "CREATE TABLE IF NOT EXISTS polls_question_search ("
+            "question_id bigint PRIMARY KEY REFERENCES polls_question (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        ),
+        (
+            "CREATE INDEX IF NOT EXISTS polls_question_search_document "
+            "ON polls_question_search USING GIN (document)"
+        ),
+        (
+            "INSERT INTO polls_question_search (question_id, document) "
+            "SELECT q.id, to_tsvector(%s::regconfig, q.question_text || "
+            "E'\\n' || coalesce(string_agg(c.choice_text, E'\\n'), '')) "
+            "FROM polls_question q "
+            "LEFT JOIN polls_choice c ON c.question_id = q.id "
+            "GROUP BY q.id "
+            "ON CONFLICT (question_id) DO NOTHING"
+        ),
+    ],
+}
+
+UNINSTALL = {
+    "sqlite": ["DROP TABLE IF EXISTS polls_question_fts"],
+    "postgresql": ["DROP TABLE IF EXISTS polls_question_search"],
+}
+
+
+def install_search_index(apps, schema_editor):
+    config = getattr(settings, "POLLS_SEARCH_CONFIG", "simple")
+
+    for sql in INSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql, params=[config] if "%s" in sql else None)
+
+
+def uninstall_search_index(apps, schema_editor):
+    for sql in UNINSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("polls", "0003_question_closes_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            code=install_search_index, reverse_code=uninstall_search_index
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.1 on 2026-10-19 00:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("polls", "0004_question_search_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="question",
+            name="trending_score",
+            field=models.FloatField(
+                db_index=True, default=0.0, editable=False
+            ),
+        ),
+    ]
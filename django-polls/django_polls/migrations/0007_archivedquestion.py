@@ -0,0 +1,38 @@
+# Generated by Django 5.1 on 2026-10-19 01:20
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("polls", "0006_vote_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedQuestion",
+            fields=[
+                (
+                    "id",
+                    models.BigIntegerField(primary_key=True, serialize=False),
+                ),
+                ("question_text", models.CharField(max_length=200)),
+                (
+                    "pub_date",
+                    models.DateTimeField(verbose_name="date published"),
+                ),
+                (
+                    "closes_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="date closed"
+                    ),
+                ),
+                (
+                    "archived_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+                ("results", models.JSONField(default=list)),
+            ],
+        ),
+    ]
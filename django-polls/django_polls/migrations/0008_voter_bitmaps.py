@@ -0,0 +1,57 @@
+# Generated by Django 5.1 on 2026-10-19 09:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("polls", "0007_archivedquestion"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Voter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ChoiceBitmap",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("question_id", models.BigIntegerField(db_index=True)),
+                ("choice_id", models.BigIntegerField()),
+                ("key", models.IntegerField()),
+                ("container", models.BinaryField(default=b"")),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("choice_id", "key"),
+                        name="polls_choicebitmap_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-19 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("polls", "0008_voter_bitmaps"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="outboxcheckpoint",
+            name="gaps",
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
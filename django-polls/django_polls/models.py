@@ -6,33 +6,47 @@ Description:
 
 """
 
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 from django.contrib import admin
 from django.db import models
 from django.utils import timezone
 
+from .sharding import ShardedModel
 
-class Question(models.Model):
+
+class Question(ShardedModel):
     """
     Question Model
 
     Description:
         - This class represents a question object in the database.
+        - A question and its choices live on one shard, see
+        `django_polls.sharding`.
 
     Attributes:
         - `question_text (CharField)`: The text of the question.
         - `pub_date (DateTimeField)`: The date the question was published.
+        - `closes_at (DateTimeField)`: The date voting closes, if any.
+        - `trending_score (FloatField)`: The logarithm of the time decayed
+        vote count, see `django_polls.trending`.
 
     Methods:
         - `__str__(self) -> str`
         - `was_published_recently(self) -> bool`
+        - `is_closed(self) -> bool`
 
     """
 
     question_text: models.CharField = models.CharField(max_length=2_00)
     pub_date: models.DateTimeField = models.DateTimeField(
-        verbose_name="date published"
+        verbose_name="date published", db_index=True
+    )
+    closes_at: models.DateTimeField = models.DateTimeField(
+        verbose_name="date closed", null=True, blank=True
+    )
+    trending_score: models.FloatField = models.FloatField(
+        default=0.0, db_index=True, editable=False
     )
 
     @admin.display(
@@ -58,14 +72,29 @@ class Question(models.Model):
 
         """
 
-        return (
-            timezone.now() - timedelta(days=1)
-            <= self.pub_date
-            <= timezone.now()
-        )
+        now: datetime = timezone.now()
+
+        return now - timedelta(days=1) <= self.pub_date <= now
+
+    def is_closed(self) -> bool:
+        """
+        Is Closed Method
+
+        Description:
+            - This method checks if voting on the question has closed.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `bool`: True if the question has a closing date in the past.
+
+        """
+
+        return self.closes_at is not None and self.closes_at <= timezone.now()
 
 
-class Choice(models.Model):
+class Choice(ShardedModel):
     """
     Choice Model
 
@@ -90,3 +119,158 @@ class Choice(models.Model):
 
     def __str__(self) -> str:  # pylint: disable=invalid-str-returned
         return self.choice_text
+
+
+class VoteEvent(models.Model):
+    """
+    Vote Event Model
+
+    Description:
+        - This class represents one vote in the outbox of the polls app.
+        - Events are written in the same transaction as the vote they record
+        and drained in id order by the `relay_vote_events` command. They
+        keep plain ids, so deleting a question doesn't touch the outbox.
+
+    Attributes:
+        - `question_id (BigIntegerField)`: The id of the voted question.
+        - `choice_id (BigIntegerField)`: The id of the chosen choice.
+        - `created_at (DateTimeField)`: The time of the vote.
+
+    Methods:
+        - `None`
+
+    """
+
+    question_id: models.BigIntegerField = models.BigIntegerField()
+    choice_id: models.BigIntegerField = models.BigIntegerField()
+    created_at: models.DateTimeField = models.DateTimeField(
+        default=timezone.now
+    )
+
+
+class Voter(models.Model):
+    """
+    Voter Model
+
+    Description:
+        - This class gives each voter a dense ordinal, its id, kept in a
+        signed cookie of the voter. Ordinals index the voter bitmaps of the
+        choices, see `django_polls.bitmaps`.
+
+    Attributes:
+        - `created_at (DateTimeField)`: The time of the first vote.
+
+    Methods:
+        - `None`
+
+    """
+
+    created_at: models.DateTimeField = models.DateTimeField(
+        default=timezone.now
+    )
+
+
+class ChoiceBitmap(models.Model):
+    """
+    Choice Bitmap Model
+
+    Description:
+        - This class represents one container of the voter bitmap of a
+        choice: the voters of the choice among 65,536 consecutive ordinals,
+        stored on the shard of the question.
+        - Like the vote events, it keeps plain ids, so choices can be deleted
+        in one statement; the code deleting them deletes their bitmaps.
+
+    Attributes:
+        - `question_id (BigIntegerField)`: The id of the question.
+        - `choice_id (BigIntegerField)`: The id of the choice.
+        - `key (IntegerField)`: The high bits of the ordinals.
+        - `container (BinaryField)`: The low bits of the ordinals, encoded.
+
+    Methods:
+        - `None`
+
+    """
+
+    question_id: models.BigIntegerField = models.BigIntegerField(db_index=True)
+    choice_id: models.BigIntegerField = models.BigIntegerField()
+    key: models.IntegerField = models.IntegerField()
+    container: models.BinaryField = models.BinaryField(default=b"")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["choice_id", "key"], name="polls_choicebitmap_unique"
+            ),
+        ]
+
+
+class OutboxCheckpoint(models.Model):
+    """
+    Outbox Checkpoint Model
+
+    Description:
+        - This class represents how far a relay has delivered the outbox.
+
+    Attributes:
+        - `name (CharField)`: The name of the relay.
+        - `last_event_id (BigIntegerField)`: The id of the last delivered
+        event.
+        - `gaps (JSONField)`: The ids below `last_event_id` that weren't
+        visible yet, with the time they were first missed.
+        - `updated_at (DateTimeField)`: The time of the last delivery.
+
+    Methods:
+        - `__str__(self) -> str`
+
+    """
+
+    name: models.CharField = models.CharField(
+        max_length=1_00, primary_key=True
+    )
+    last_event_id: models.BigIntegerField = models.BigIntegerField(default=0)
+    gaps: models.JSONField = models.JSONField(default=dict, blank=True)
+    updated_at: models.DateTimeField = models.DateTimeField(auto_now=True)
+
+    def __str__(self) -> str:  # pylint: disable=invalid-str-returned
+        return self.name
+
+
+class ArchivedQuestion(models.Model):
+    """
+    Archived Question Model
+
+    Description:
+        - This class represents a cold question moved out of the question
+        and choice tables by the `archive_questions` command.
+        - It keeps the id of the question, so its URLs keep working, and its
+        final tally as one JSON list of `[choice id, choice text, votes]`.
+
+    Attributes:
+        - `id (BigIntegerField)`: The id of the question.
+        - `question_text (CharField)`: The text of the question.
+        - `pub_date (DateTimeField)`: The date the question was published.
+        - `closes_at (DateTimeField)`: The date voting closed, if any.
+        - `archived_at (DateTimeField)`: The date the question was archived.
+        - `results (JSONField)`: The final tally.
+
+    Methods:
+        - `__str__(self) -> str`
+
+    """
+
+    id: models.BigIntegerField = models.BigIntegerField(primary_key=True)
+    question_text: models.CharField = models.CharField(max_length=2_00)
+    pub_date: models.DateTimeField = models.DateTimeField(
+        verbose_name="date published"
+    )
+    closes_at: models.DateTimeField = models.DateTimeField(
+        verbose_name="date closed", null=True, blank=True
+    )
+    archived_at: models.DateTimeField = models.DateTimeField(
+        default=timezone.now
+    )
+    results: models.JSONField = models.JSONField(default=list)
+
+    def __str__(self) -> str:  # pylint: disable=invalid-str-returned
+        return self.question_text
@@ -0,0 +1,338 @@
+"""
+Polls Outbox Module
+
+Description:
+    - This module contains the relay of the vote outbox.
+    - Votes write a `VoteEvent` in their own transaction, so no vote is lost
+    and none is published before it commits. The relay reads the outbox in
+    id order, hands large batches to a sink and only then moves its
+    checkpoint, so delivery is at least once: a batch may be delivered
+    again after a crash, but never skipped.
+    - Ids are handed out before commit, so an event may become visible
+    after events with higher ids were delivered. The ids the checkpoint
+    passed without seeing are kept as gaps and looked up again on every
+    run, until they show up or the gap timeout tells they were rolled back.
+    Such late events are delivered out of id order.
+    - Every shard has its own outbox, so event ids are unique per shard and
+    each event carries the alias of its shard.
+
+"""
+
+import abc
+import json
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import OutboxCheckpoint, VoteEvent
+
+# The most gaps a checkpoint keeps, far more than the vote transactions in
+# flight at once; the oldest ids are given up first.
+MAX_GAPS: int = 1_000
+# The gaps looked up per query, below the parameter limit of SQLite.
+GAP_CHUNK: int = 500
+
+
+class OutboxSink(abc.ABC):
+    """
+    Outbox Sink Class
+
+    Description:
+        - This class is the interface of the outbox sinks.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `send(self, events: list[dict[str, Any]]) -> None`
+        - `close(self) -> None`
+
+    """
+
+    @abc.abstractmethod
+    def send(self, events: list[dict[str, Any]]) -> None:
+        """
+        Delivers a batch of events, raising if any of them wasn't delivered.
+        """
+
+    def close(self) -> None:
+        """
+        Releases the resources of the sink.
+        """
+
+
+def _encode(events: list[dict[str, Any]]) -> bytes:
+    return "".join(
+        json.dumps(obj=event, separators=(",", ":")) + "\n" for event in events
+    ).encode()
+
+
+class FileSink(OutboxSink):
+    """
+    File Sink Class
+
+    Description:
+        - This class appends events to a file as JSON lines and syncs the
+        file before a batch counts as delivered.
+
+    Attributes:
+        - `path (str)`: The path of the file.
+
+    Methods:
+        - `None`
+
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._file = open(  # pylint: disable=consider-using-with
+            file=path, mode="ab"
+        )
+
+    def send(self, events: list[dict[str, Any]]) -> None:
+        self._file.write(_encode(events=events))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class SocketSink(OutboxSink):
+    """
+    Socket Sink Class
+
+    Description:
+        - This class streams events as JSON lines to a TCP address given as
+        `host:port`, or to a Unix socket given as a path.
+
+    Attributes:
+        - `address (str)`: The address of the socket.
+
+    Methods:
+        - `None`
+
+    """
+
+    def __init__(self, address: str) -> None:
+        self.address: str = address
+        self._socket: socket.socket | None = None
+
+    def _connect(self) -> socket.socket:
+        if self._socket is None:
+            if "/" in self.address:
+                self._socket = socket.socket(family=socket.AF_UNIX)
+                self._socket.connect(self.address)
+            else:
+                host, _, port = self.address.rpartition(":")
+                self._socket = socket.create_connection(
+                    address=(host, int(port))
+                )
+
+        return self._socket
+
+    def send(self, events: list[dict[str, Any]]) -> None:
+        try:
+            self._connect().sendall(_encode(events=events))
+
+        except OSError:
+            # Reconnect on the next batch; this one is sent again.
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+
+SINKS: dict[str, type[OutboxSink]] = {
+    "file": FileSink,
+    "socket": SocketSink,
+}
+
+
+def get_sink(spec: str) -> OutboxSink:
+    """
+    Get Sink Function
+
+    Description:
+        - This function builds a sink from a `kind:target` spec, such as
+        `file:/var/log/votes.jsonl` or `socket:localhost:5170`. Other kinds
+        are imported as a dotted path to an `OutboxSink` subclass that takes
+        the target as its only argument.
+
+    Args:
+        - `spec (str)`: The sink spec.  **(Required)**
+
+    Returns:
+        - `sink (OutboxSink)`: The sink.
+
+    """
+
+    kind, _, target = spec.partition(":")
+    sink_class: type[OutboxSink] = SINKS.get(kind) or import_string(kind)
+
+    return sink_class(target)
+
+
+def _events(
+    rows: list[tuple[int, int, int, datetime]], using: str
+) -> list[dict[str, Any]]:
+    return [
+        {
+            "id": pk,
+            "shard": using,
+            "question": question_id,
+            "choice": choice_id,
+            "created_at": created_at.isoformat(),
+        }
+        for pk, question_id, choice_id, created_at in rows
+    ]
+
+
+def relay(
+    sink: OutboxSink,
+    name: str = "default",
+    batch_size: int = 5_000,
+    lag: float = 1.0,
+    gap_timeout: float = 5 * 60,
+    using: str = "default",
+) -> int:
+    """
+    Relay Function
+
+    Description:
+        - This function delivers every pending outbox event to a sink, one
+        ordered batch at a time, and checkpoints after each batch.
+        - It first delivers the events that showed up in the gaps of the
+        checkpoint, and drops the gaps older than `gap_timeout` seconds.
+        - Events younger than `lag` seconds are left for the next run, which
+        leaves fewer gaps behind.
+
+    Args:
+        - `sink (OutboxSink)`: The sink.  **(Required)**
+        - `name (str)`: The name of the checkpoint.  **(Optional)**
+        - `batch_size (int)`: The number of events per batch.  **(Optional)**
+        - `lag (float)`: The minimum age of relayed events in seconds.
+        **(Optional)**
+        - `gap_timeout (float)`: The seconds a missing id is looked up for,
+        longer than any vote transaction.  **(Optional)**
+        - `using (str)`: The database alias of the outbox; every shard has
+        its own outbox and checkpoints.  **(Optional)**
+
+    Returns:
+        - `relayed (int)`: The number of delivered events.
+
+    """
+
+    checkpoint: OutboxCheckpoint = (
+        OutboxCheckpoint.objects.using(  # pylint: disable=no-member
+            using
+        ).get_or_create(name=name)[0]
+    )
+    now: datetime = timezone.now()
+    cutoff: datetime = now - timedelta(seconds=lag)
+    events: QuerySet[VoteEvent] = (
+        VoteEvent.objects.using(using)  # pylint: disable=no-member
+        .order_by("pk")
+        .values_list("pk", "question_id", "choice_id", "created_at")
+    )
+    gaps: dict[int, float] = {
+        int(pk): missed for pk, missed in checkpoint.gaps.items()
+    }
+    relayed: int = 0
+
+    if gaps:
+        missing: list[int] = sorted(gaps)
+        rows: list[tuple[int, int, int, datetime]] = []
+        for start in range(0, len(missing), GAP_CHUNK):
+            rows += events.filter(pk__in=missing[start : start + GAP_CHUNK])
+        if rows:
+            sink.send(events=_events(rows=rows, using=using))
+            relayed += len(rows)
+
+        found: set[int] = {row[0] for row in rows}
+        gaps = {
+            pk: missed
+            for pk, missed in gaps.items()
+            if pk not in found and now.timestamp() - missed < gap_timeout
+        }
+        checkpoint.gaps = gaps
+        checkpoint.save(update_fields=["gaps", "updated_at"])
+
+    while True:
+        rows = list(
+            events.filter(
+                pk__gt=checkpoint.last_event_id, created_at__lte=cutoff
+            )[:batch_size]
+        )
+        if not rows:
+            return relayed
+
+        sink.send(events=_events(rows=rows, using=using))
+
+        # A new checkpoint starts at the first event, not at id 1.
+        expected: int = (
+            checkpoint.last_event_id + 1
+            if checkpoint.last_event_id
+            else rows[0][0]
+        )
+        for pk, *_ in rows:
+            gaps.update(
+                dict.fromkeys(
+                    range(max(expected, pk - MAX_GAPS), pk), now.timestamp()
+                )
+            )
+            expected = pk + 1
+
+        checkpoint.last_event_id = rows[-1][0]
+        checkpoint.gaps = dict(sorted(gaps.items())[-MAX_GAPS:])
+        checkpoint.save(update_fields=["last_event_id", "gaps", "updated_at"])
+        relayed += len(rows)
+
+
+def prune(using: str = "default") -> int:
+    """
+    Prune Function
+
+    Description:
+        - This function deletes the events every relay has delivered,
+        keeping the ids in the gaps of a checkpoint for their late delivery.
+
+    Args:
+        - `using (str)`: The database alias of the outbox.  **(Optional)**
+
+    Returns:
+        - `deleted (int)`: The number of deleted events.
+
+    """
+
+    with transaction.atomic(using=using):
+        checkpoints: list[tuple[int, dict[str, float]]] = list(
+            OutboxCheckpoint.objects.using(  # pylint: disable=no-member
+                using
+            ).values_list("last_event_id", "gaps")
+        )
+        if not checkpoints:
+            return 0
+
+        delivered: int = min(last_event_id for last_event_id, _ in checkpoints)
+        gaps: set[int] = {
+            int(pk)
+            for _, checkpoint_gaps in checkpoints
+            for pk in checkpoint_gaps
+        }
+
+        return (
+            VoteEvent.objects.using(using)  # pylint: disable=no-member
+            .filter(pk__lte=delivered)
+            .exclude(pk__in=gaps)
+            .delete()[0]
+        )
@@ -0,0 +1,108 @@
+"""
+Polls Pages Module
+
+Description:
+    - This module contains the server side cache of rendered polls pages.
+    - Pages are cached in the `POLLS_PAGE_CACHE` cache. Pages rendered while
+    a transaction is open are not cached, because the rows they were built
+    from could still be rolled back.
+
+"""
+
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import connection
+
+DETAIL_KEY: str = "polls:page:detail:{question_id}"
+
+
+def _cache() -> BaseCache:
+    return caches[getattr(settings, "POLLS_PAGE_CACHE", "default")]
+
+
+def get_detail_page(question_id: int | str) -> bytes | None:
+    """
+    Get Detail Page Function
+
+    Description:
+        - This function returns the cached detail page of a question.
+
+    Args:
+        - `question_id (int | str)`: The question id.  **(Required)**
+
+    Returns:
+        - `content (bytes | None)`: The rendered page, or None on a miss.
+
+    """
+
+    return _cache().get(key=DETAIL_KEY.format(question_id=int(question_id)))
+
+
+def set_detail_page(
+    question_id: int | str, content: bytes, timeout: float
+) -> None:
+    """
+    Set Detail Page Function
+
+    Description:
+        - This function caches the detail page of a question.
+
+    Args:
+        - `question_id (int | str)`: The question id.  **(Required)**
+        - `content (bytes)`: The rendered page.  **(Required)**
+        - `timeout (float)`: The seconds to keep the page.  **(Required)**
+
+    Returns:
+        - `None`
+
+    """
+
+    if connection.in_atomic_block or timeout <= 0:
+        return
+
+    _cache().set(
+        key=DETAIL_KEY.format(question_id=int(question_id)),
+        value=content,
+        timeout=timeout,
+    )
+
+
+def delete_detail_page(question_id: int | str) -> None:
+    """
+    Delete Detail Page Function
+
+    Description:
+        - This function drops the cached detail page of a question.
+
+    Args:
+        - `question_id (int | str)`: The question id.  **(Required)**
+
+    Returns:
+        - `None`
+
+    """
+
+    _cache().delete(key=DETAIL_KEY.format(question_id=int(question_id)))
+
+
+def delete_detail_pages(question_ids: Iterable[int]) -> None:
+    """
+    Delete Detail Pages Function
+
+    Description:
+        - This function drops the cached detail pages of many questions in
+        one cache call.
+
+    Args:
+        - `question_ids (Iterable[int])`: The question ids.  **(Required)**
+
+    Returns:
+        - `None`
+
+    """
+
+    _cache().delete_many(
+        keys=[DETAIL_KEY.format(question_id=pk) for pk in question_ids]
+    )
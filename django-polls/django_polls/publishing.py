@@ -0,0 +1,260 @@
+"""
+Polls Publishing Module
+
+Description:
+    - This module contains the publishing schedule of the polls app.
+    - The schedule keeps a snapshot of the questions that are not published
+    yet and of the questions shown on the index page, together with the next
+    upcoming `pub_date`.
+    - Once that boundary passes, the snapshot is rebuilt and swapped in, so
+    scheduled questions appear on time without any polling.
+    - The snapshot is gathered from every shard, so it also serves the index
+    page and publishing checks of a sharded setup.
+
+"""
+
+import heapq
+from datetime import datetime, timedelta
+from operator import attrgetter
+from threading import Lock
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.utils import timezone
+
+from .models import Question
+from .sharding import get_shards
+
+GENERATION_KEY: str = "polls:publishing:generation"
+
+
+class PublishingSnapshot:
+    """
+    Publishing Snapshot Class
+
+    Description:
+        - This class holds one immutable view of the publishing schedule.
+
+    Attributes:
+        - `generation (int)`: The shared generation it was built for.
+        - `scheduled (frozenset[int])`: Ids of questions not published yet.
+        - `latest (tuple[Question, ...])`: The questions of the index page.
+        - `next_publish (datetime | None)`: The earliest upcoming `pub_date`.
+        - `expires (datetime)`: When the snapshot must be rebuilt anyway.
+
+    Methods:
+        - `is_stale(self, now: datetime, generation: int) -> bool`
+
+    """
+
+    __slots__ = (
+        "expires",
+        "generation",
+        "latest",
+        "next_publish",
+        "scheduled",
+    )
+
+    def __init__(
+        self,
+        generation: int,
+        scheduled: frozenset[int],
+        latest: tuple[Question, ...],
+        next_publish: datetime | None,
+        expires: datetime,
+    ) -> None:
+        self.generation: int = generation
+        self.scheduled: frozenset[int] = scheduled
+        self.latest: tuple[Question, ...] = latest
+        self.next_publish: datetime | None = next_publish
+        self.expires: datetime = expires
+
+    def is_stale(self, now: datetime, generation: int) -> bool:
+        """
+        Is Stale Method
+
+        Description:
+            - This method checks if the snapshot has to be rebuilt.
+
+        Args:
+            - `now (datetime)`: The current time.  **(Required)**
+            - `generation (int)`: The current shared generation.
+            **(Required)**
+
+        Returns:
+            - `bool`: True if a question was published or changed since the
+            snapshot was built.
+
+        """
+
+        return (
+            generation != self.generation
+            or now >= self.expires
+            or (self.next_publish is not None and now >= self.next_publish)
+        )
+
+
+class PublishingSchedule:
+    """
+    Publishing Schedule Class
+
+    Description:
+        - This class serves publishing lookups from a cached snapshot.
+        - Changes made by other processes are picked up through a generation
+        counter kept in the `POLLS_PUBLISHING_CACHE` cache.
+        - Snapshots are never cached while a transaction is open, because the
+        rows they were built from could still be rolled back.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `get_snapshot(self) -> PublishingSnapshot`
+        - `is_published(self, pk: int | str) -> bool`
+        - `latest(self) -> list[Question]`
+        - `invalidate(self) -> None`
+
+    """
+
+    def __init__(self) -> None:
+        self._snapshot: PublishingSnapshot | None = None
+        self._lock: Lock = Lock()
+
+    @property
+    def _cache(self):
+        return caches[getattr(settings, "POLLS_PUBLISHING_CACHE", "default")]
+
+    def _generation(self) -> int:
+        return self._cache.get_or_set(
+            key=GENERATION_KEY, default=0, timeout=None
+        )
+
+    def _build(self, now: datetime, generation: int) -> PublishingSnapshot:
+        index_size: int = getattr(settings, "POLLS_INDEX_SIZE", 5)
+        scheduled: list[tuple[int, datetime]] = []
+        latest: list[Question] = []
+
+        for alias in get_shards():
+            questions = Question.objects.using(alias)
+            scheduled.extend(
+                questions.filter(pub_date__gt=now).values_list(
+                    "id", "pub_date"
+                )
+            )
+            latest.extend(
+                questions.filter(pub_date__lte=now).order_by("-pub_date")[
+                    :index_size
+                ]
+            )
+
+        return PublishingSnapshot(
+            generation=generation,
+            scheduled=frozenset(pk for pk, _ in scheduled),
+            latest=tuple(
+                heapq.nlargest(index_size, latest, key=attrgetter("pub_date"))
+            ),
+            next_publish=min(
+                (pub_date for _, pub_date in scheduled), default=None
+            ),
+            expires=now
+            + timedelta(
+                seconds=getattr(settings, "POLLS_PUBLISHING_TTL", 300)
+            ),
+        )
+
+    def get_snapshot(self) -> PublishingSnapshot:
+        """
+        Get Snapshot Method
+
+        Description:
+            - This method returns the current publishing snapshot.
+            - The snapshot is rebuilt when its boundary has passed or when
+            its generation is outdated.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `snapshot (PublishingSnapshot)`: The publishing snapshot.
+
+        """
+
+        now: datetime = timezone.now()
+        generation: int = self._generation()
+
+        if any(connections[alias].in_atomic_block for alias in get_shards()):
+            return self._build(now=now, generation=generation)
+
+        snapshot: PublishingSnapshot | None = self._snapshot
+        if snapshot is None or snapshot.is_stale(now, generation):
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.is_stale(now, generation):
+                    snapshot = self._build(now=now, generation=generation)
+                    self._snapshot = snapshot
+
+        return snapshot
+
+    def is_published(self, pk: int | str) -> bool:
+        """
+        Is Published Method
+
+        Description:
+            - This method checks if a question is visible now.
+            - Unknown ids are reported as published, so the caller's own
+            lookup decides whether they exist.
+
+        Args:
+            - `pk (int | str)`: The question id.  **(Required)**
+
+        Returns:
+            - `bool`: False if the question is scheduled for the future.
+
+        """
+
+        return int(pk) not in self.get_snapshot().scheduled
+
+    def latest(self) -> list[Question]:
+        """
+        Latest Method
+
+        Description:
+            - This method returns the latest published questions.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `questions (list[Question])`: The questions of the index page.
+
+        """
+
+        return list(self.get_snapshot().latest)
+
+    def invalidate(self) -> None:
+        """
+        Invalidate Method
+
+        Description:
+            - This method drops the local snapshot and bumps the shared
+            generation so that every process rebuilds its snapshot.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `None`
+
+        """
+
+        self._snapshot = None
+
+        try:
+            self._cache.incr(key=GENERATION_KEY)
+
+        except ValueError:
+            self._cache.set(key=GENERATION_KEY, value=1, timeout=None)
+
+
+schedule: PublishingSchedule = PublishingSchedule()
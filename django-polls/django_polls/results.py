@@ -0,0 +1,194 @@
+"""
+Polls Results Module
+
+Description:
+    - This module contains the frozen results of closed questions.
+    - Once a question closes its tally can no longer change, so it is stored
+    as an immutable snapshot in the `POLLS_RESULTS_CACHE` cache and served
+    without touching the database.
+    - Snapshots expire after `POLLS_RESULTS_TIMEOUT` seconds, 5 minutes by
+    default. Thawing, e.g. when an admin reopens a question by moving its
+    `closes_at`, only reaches the processes sharing the cache of the process
+    that made the change. With a per-process cache such as `LocMemCache`,
+    the other processes keep the snapshot, and keep rejecting votes, until
+    it expires.
+
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import Question
+
+FROZEN_KEY: str = "polls:results:frozen:{question_id}"
+TIMEOUT: int = 5 * 60
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenChoice:
+    """
+    Frozen Choice Class
+
+    Description:
+        - This class holds the final tally of one choice.
+
+    Attributes:
+        - `id (int)`: The choice id.
+        - `choice_text (str)`: The text of the choice.
+        - `votes (int)`: The final number of votes.
+
+    Methods:
+        - `None`
+
+    """
+
+    id: int
+    choice_text: str
+    votes: int
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenResults:
+    """
+    Frozen Results Class
+
+    Description:
+        - This class holds the final results of a closed question.
+        - It exposes the attributes the results template reads from a
+        question, so both can be rendered the same way.
+
+    Attributes:
+        - `id (int)`: The question id.
+        - `question_text (str)`: The text of the question.
+        - `choices (tuple[FrozenChoice, ...])`: The final tally.
+
+    Methods:
+        - `None`
+
+    """
+
+    id: int
+    question_text: str
+    choices: tuple[FrozenChoice, ...]
+
+
+def _cache():
+    return caches[getattr(settings, "POLLS_RESULTS_CACHE", "default")]
+
+
+def get_frozen_results(question_id: int | str) -> FrozenResults | None:
+    """
+    Get Frozen Results Function
+
+    Description:
+        - This function returns the frozen results of a question.
+
+    Args:
+        - `question_id (int | str)`: The question id.  **(Required)**
+
+    Returns:
+        - `results (FrozenResults | None)`: The frozen results, or None if
+        the question has not been frozen.
+
+    """
+
+    return _cache().get(key=FROZEN_KEY.format(question_id=int(question_id)))
+
+
+def freeze_results(question: Question) -> FrozenResults:
+    """
+    Freeze Results Function
+
+    Description:
+        - This function stores the final tally of a closed question.
+
+    Args:
+        - `question (Question)`: The closed question.  **(Required)**
+
+    Returns:
+        - `results (FrozenResults)`: The frozen results.
+
+    """
+
+    rows: list[tuple[int, str, int]] = list(
+        question.choice_set.order_by("id").values_list(  # type: ignore
+            "id", "choice_text", "votes"
+        )
+    )
+    results: FrozenResults = FrozenResults(
+        id=question.id,  # type: ignore
+        question_text=question.question_text,
+        choices=tuple(
+            FrozenChoice(id=pk, choice_text=choice_text, votes=votes)
+            for pk, choice_text, votes in rows
+        ),
+    )
+    store_frozen_results(results=results)
+
+    return results
+
+
+def store_frozen_results(results: FrozenResults) -> None:
+    """
+    Store Frozen Results Function
+
+    Description:
+        - This function stores final results built elsewhere, such as those
+        of an archived question.
+
+    Args:
+        - `results (FrozenResults)`: The final results.  **(Required)**
+
+    Returns:
+        - `None`
+
+    """
+
+    _cache().set(
+        key=FROZEN_KEY.format(question_id=results.id),
+        value=results,
+        timeout=getattr(settings, "POLLS_RESULTS_TIMEOUT", TIMEOUT),
+    )
+
+
+def thaw_results(question_id: int | str) -> None:
+    """
+    Thaw Results Function
+
+    Description:
+        - This function drops the frozen results of a question, for example
+        after an admin reopened it or corrected its choices.
+
+    Args:
+        - `question_id (int | str)`: The question id.  **(Required)**
+
+    Returns:
+        - `None`
+
+    """
+
+    _cache().delete(key=FROZEN_KEY.format(question_id=int(question_id)))
+
+
+def thaw_many_results(question_ids: Iterable[int]) -> None:
+    """
+    Thaw Many Results Function
+
+    Description:
+        - This function drops the frozen results of many questions in one
+        cache call.
+
+    Args:
+        - `question_ids (Iterable[int])`: The question ids.  **(Required)**
+
+    Returns:
+        - `None`
+
+    """
+
+    _cache().delete_many(
+        keys=[FROZEN_KEY.format(question_id=pk) for pk in question_ids]
+    )
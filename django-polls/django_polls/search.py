@@ -0,0 +1,351 @@
+"""
+Polls Search Module
+
+Description:
+    - This module contains the full text search index of the polls app.
+    - Each question is indexed as one document made of its text and the text
+    of its choices.
+    - SQLite uses an FTS5 virtual table ranked with bm25 and PostgreSQL a
+    `tsvector` table with a GIN index ranked with `ts_rank`. Other databases
+    fall back to unindexed `icontains` lookups.
+
+"""
+
+import re
+from collections.abc import Iterable
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.backends.base.schema import BaseDatabaseSchemaEditor
+from django.db.models import Q
+
+from .models import Choice, Question
+
+TOKEN_RE: re.Pattern[str] = re.compile(r"\w+")
+
+
+def tokenize(query: str) -> list[str]:
+    """
+    Tokenize Function
+
+    Description:
+        - This function splits a search query into lower case words.
+
+    Args:
+        - `query (str)`: The search query.  **(Required)**
+
+    Returns:
+        - `tokens (list[str])`: The words of the query.
+
+    """
+
+    return TOKEN_RE.findall(query.lower())[:16]
+
+
+class SearchBackend:
+    """
+    Search Backend Class
+
+    Description:
+        - This class is the fallback search backend. It keeps no index and
+        searches with `icontains`.
+
+    Attributes:
+        - `connection (BaseDatabaseWrapper)`: The database connection.
+
+    Methods:
+        - `install(self, schema_editor: BaseDatabaseSchemaEditor) -> None`
+        - `uninstall(self, schema_editor: BaseDatabaseSchemaEditor) -> None`
+        - `index(self, documents: list[tuple[int, str]]) -> None`
+        - `remove(self, question_ids: list[int]) -> None`
+        - `search(self, tokens: list[str], limit: int) -> list[int]`
+
+    """
+
+    def __init__(self, connection: BaseDatabaseWrapper) -> None:
+        self.connection: BaseDatabaseWrapper = connection
+
+    def install(self, schema_editor: BaseDatabaseSchemaEditor) -> None:
+        """
+        Creates the index storage.
+        """
+
+    def uninstall(self, schema_editor: BaseDatabaseSchemaEditor) -> None:
+        """
+        Drops the index storage.
+        """
+
+    def index(self, documents: list[tuple[int, str]]) -> None:
+        """
+        Stores or replaces the documents of the given questions.
+        """
+
+    def remove(self, question_ids: list[int]) -> None:
+        """
+        Removes the given questions from the index.
+        """
+
+    def search(self, tokens: list[str], limit: int) -> list[int]:
+        """
+        Returns the ids of the questions matching every token, best first.
+        """
+
+        condition: Q = Q()
+        for token in tokens:
+            condition &= Q(question_text__icontains=token) | Q(
+                choice__choice_text__icontains=token
+            )
+
+        return list(
+            Question.objects.using(self.connection.alias)
+            .filter(condition)
+            .order_by("-pub_date")
+            .values_list("id", flat=True)
+            .distinct()[:limit]
+        )
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    SQLite Search Backend Class
+
+    Description:
+        - This class keeps the index in an FTS5 virtual table whose rowid is
+        the question id. Prefix indexes on two and three characters keep
+        prefix queries fast.
+
+    Attributes:
+        - `table (str)`: The virtual table name.
+
+    Methods:
+        - `None`
+
+    """
+
+    table: str = "polls_question_fts"
+
+    def install(self, schema_editor: BaseDatabaseSchemaEditor) -> None:
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5("
+            "document, tokenize = 'unicode61 remove_diacritics 2', "
+            "prefix = '2 3')"
+        )
+
+    def uninstall(self, schema_editor: BaseDatabaseSchemaEditor) -> None:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index(self, documents: list[tuple[int, str]]) -> None:
+        self.remove(question_ids=[pk for pk, _ in documents])
+
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (rowid, document) VALUES (%s, %s)",
+                documents,
+            )
+
+    def remove(self, question_ids: list[int]) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE rowid = %s",
+                [(pk,) for pk in question_ids],
+            )
+
+    def search(self, tokens: list[str], limit: int) -> list[int]:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s "
+                "ORDER BY rank LIMIT %s",
+                [" ".join(f'"{token}"*' for token in tokens), limit],
+            )
+            return [pk for (pk,) in cursor.fetchall()]
+
+
+class PostgreSQLSearchBackend(SearchBackend):
+    """
+    PostgreSQL Search Backend Class
+
+    Description:
+        - This class keeps the index in a table of `tsvector` documents with
+        a GIN index, using the `POLLS_SEARCH_CONFIG` text search
+        configuration.
+
+    Attributes:
+        - `table (str)`: The index table name.
+
+    Methods:
+        - `None`
+
+    """
+
+    table: str = "polls_question_search"
+
+    @property
+    def config(self) -> str:
+        return getattr(settings, "POLLS_SEARCH_CONFIG", "simple")
+
+    def install(self, schema_editor: BaseDatabaseSchemaEditor) -> None:
+        schema_editor.execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            "question_id bigint PRIMARY KEY REFERENCES polls_question (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {self.table}_document "
+            f"ON {self.table} USING GIN (document)"
+        )
+
+    def uninstall(self, schema_editor: BaseDatabaseSchemaEditor) -> None:
+        schema_editor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def index(self, documents: list[tuple[int, str]]) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.executemany(
+                f"INSERT INTO {self.table} (question_id, document) "
+                "VALUES (%s, to_tsvector(%s::regconfig, %s)) "
+                "ON CONFLICT (question_id) "
+                "DO UPDATE SET document = EXCLUDED.document",
+                [(pk, self.config, document) for pk, document in documents],
+            )
+
+    def remove(self, question_ids: list[int]) -> None:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE question_id = ANY(%s)",
+                [list(question_ids)],
+            )
+
+    def search(self, tokens: list[str], limit: int) -> list[int]:
+        with self.connection.cursor() as cursor:
+            cursor.execute(
+                f"SELECT question_id FROM {self.table}, "
+                "to_tsquery(%s::regconfig, %s) query "
+                "WHERE document @@ query "
+                "ORDER BY ts_rank(document, query) DESC LIMIT %s",
+                [
+                    self.config,
+                    " & ".join(f"{token}:*" for token in tokens),
+                    limit,
+                ],
+            )
+            return [pk for (pk,) in cursor.fetchall()]
+
+
+BACKENDS: dict[str, type[SearchBackend]] = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgreSQLSearchBackend,
+}
+
+
+def get_backend(connection: BaseDatabaseWrapper) -> SearchBackend:
+    """
+    Get Backend Function
+
+    Description:
+        - This function returns the search backend of a database connection.
+
+    Args:
+        - `connection (BaseDatabaseWrapper)`: The database connection.
+        **(Required)**
+
+    Returns:
+        - `backend (SearchBackend)`: The search backend.
+
+    """
+
+    return BACKENDS.get(connection.vendor, SearchBackend)(connection)
+
+
+def build_documents(
+    question_ids: Iterable[int], using: str = "default"
+) -> list[tuple[int, str]]:
+    """
+    Build Documents Function
+
+    Description:
+        - This function builds the search documents of the given questions
+        with two queries.
+
+    Args:
+        - `question_ids (Iterable[int])`: The question ids.  **(Required)**
+        - `using (str)`: The database alias.  **(Optional)**
+
+    Returns:
+        - `documents (list[tuple[int, str]])`: The question ids and their
+        documents. Questions that don't exist are left out.
+
+    """
+
+    texts: dict[int, list[str]] = {
+        pk: [question_text]
+        for pk, question_text in Question.objects.using(using)
+        .filter(pk__in=question_ids)
+        .values_list("id", "question_text")
+    }
+    for question_id, choice_text in (
+        Choice.objects.using(using)
+        .filter(question_id__in=texts)
+        .values_list("question_id", "choice_text")
+    ):
+        texts[question_id].append(choice_text)
+
+    return [(pk, "\n".join(parts)) for pk, parts in texts.items()]
+
+
+def reindex(question_ids: Iterable[int], using: str = "default") -> None:
+    """
+    Reindex Function
+
+    Description:
+        - This function refreshes the documents of the given questions and
+        removes the ones that no longer exist.
+
+    Args:
+        - `question_ids (Iterable[int])`: The question ids.  **(Required)**
+        - `using (str)`: The database alias.  **(Optional)**
+
+    Returns:
+        - `None`
+
+    """
+
+    question_ids = set(question_ids)
+    backend: SearchBackend = get_backend(connection=connections[using])
+    documents: list[tuple[int, str]] = build_documents(
+        question_ids=question_ids, using=using
+    )
+
+    with transaction.atomic(using=using):
+        backend.remove(
+            question_ids=list(question_ids - {pk for pk, _ in documents})
+        )
+        backend.index(documents=documents)
+
+
+def search(query: str, limit: int = 20, using: str = "default") -> list[int]:
+    """
+    Search Function
+
+    Description:
+        - This function returns the ids of the questions whose text or
+        choices contain a word starting with each word of `query`, best
+        match first.
+
+    Args:
+        - `query (str)`: The search query.  **(Required)**
+        - `limit (int)`: The maximum number of results.  **(Optional)**
+        - `using (str)`: The database alias.  **(Optional)**
+
+    Returns:
+        - `question_ids (list[int])`: The ids of the matching questions.
+
+    """
+
+    tokens: list[str] = tokenize(query=query)
+    if not tokens:
+        return []
+
+    return get_backend(connection=connections[using]).search(
+        tokens=tokens, limit=limit
+    )
@@ -0,0 +1,404 @@
+"""
+Polls Sharding Module
+
+Description:
+    - This module contains the horizontal sharding of the polls app.
+    - Each question lives with its choices, its vote events and its voter
+    bitmaps on one of the databases listed in the `POLLS_SHARDS` setting,
+    picked by a consistent hash ring over the question id. Adding a shard
+    moves only the questions the new shard takes over, see the
+    `rebalance_shards` command.
+    - While more than one shard is configured, questions and choices get
+    time ordered, globally unique snowflake ids instead of per-database
+    auto increments.
+    - Lookups by question id are routed here; views that list questions
+    query every shard and merge the results.
+
+"""
+
+import bisect
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Iterable
+from functools import lru_cache
+from hashlib import blake2b
+from typing import Any
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, models
+
+# Milliseconds since the Unix epoch of 2024-01-01 00:00 UTC.
+ID_EPOCH: int = 1_704_067_200_000
+WORKER_BITS: int = 10
+SEQUENCE_BITS: int = 12
+
+SHARDED_MODELS: frozenset[str] = frozenset(
+    {
+        "polls.question",
+        "polls.choice",
+        "polls.voteevent",
+        "polls.choicebitmap",
+    }
+)
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(
+        bytes=blake2b(key.encode(), digest_size=8).digest(), byteorder="big"
+    )
+
+
+class HashRing:
+    """
+    Hash Ring Class
+
+    Description:
+        - This class maps keys to nodes by consistent hashing.
+        - Every node is placed on the ring at `replicas` points, and a key
+        belongs to the node of the first point at or after its own hash.
+        Adding a node only takes keys from the other nodes, never moves keys
+        between them.
+
+    Attributes:
+        - `nodes (tuple[str, ...])`: The nodes of the ring.
+
+    Methods:
+        - `get_node(self, key: int | str) -> str`
+
+    """
+
+    def __init__(self, nodes: Iterable[str], replicas: int = 128) -> None:
+        self.nodes: tuple[str, ...] = tuple(nodes)
+        points: list[tuple[int, str]] = sorted(
+            (_hash(key=f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(replicas)
+        )
+        self._hashes: list[int] = [point for point, _ in points]
+        self._nodes: list[str] = [node for _, node in points]
+
+    def get_node(self, key: int | str) -> str:
+        """
+        Get Node Method
+
+        Description:
+            - This method returns the node a key belongs to.
+
+        Args:
+            - `key (int | str)`: The key.  **(Required)**
+
+        Returns:
+            - `node (str)`: The node of the key.
+
+        """
+
+        index: int = bisect.bisect_left(self._hashes, _hash(key=str(key)))
+
+        return self._nodes[index % len(self._nodes)]
+
+
+@lru_cache(maxsize=8)
+def _ring(shards: tuple[str, ...]) -> HashRing:
+    return HashRing(nodes=shards)
+
+
+def get_shards() -> list[str]:
+    """
+    Get Shards Function
+
+    Description:
+        - This function returns the database aliases of the shards.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `shards (list[str])`: The `POLLS_SHARDS` setting, or only the
+        default database.
+
+    """
+
+    return list(getattr(settings, "POLLS_SHARDS", None) or [DEFAULT_DB_ALIAS])
+
+
+def is_sharded() -> bool:
+    """
+    Checks if questions are spread over more than one database.
+    """
+
+    return len(get_shards()) > 1
+
+
+def shard_for(question_id: int | str) -> str:
+    """
+    Shard For Function
+
+    Description:
+        - This function returns the shard of a question.
+
+    Args:
+        - `question_id (int | str)`: The question id.  **(Required)**
+
+    Returns:
+        - `alias (str)`: The database alias of the shard.
+
+    """
+
+    shards: list[str] = get_shards()
+    if len(shards) == 1:
+        return shards[0]
+
+    return _ring(shards=tuple(shards)).get_node(key=int(question_id))
+
+
+def group_by_shard(question_ids: Iterable[int]) -> dict[str, list[int]]:
+    """
+    Group By Shard Function
+
+    Description:
+        - This function splits question ids by their shard.
+
+    Args:
+        - `question_ids (Iterable[int])`: The question ids.  **(Required)**
+
+    Returns:
+        - `groups (dict[str, list[int]])`: The question ids of each shard.
+
+    """
+
+    groups: defaultdict[str, list[int]] = defaultdict(list)
+    for question_id in question_ids:
+        groups[shard_for(question_id=question_id)].append(question_id)
+
+    return dict(groups)
+
+
+class SnowflakeGenerator:
+    """
+    Snowflake Generator Class
+
+    Description:
+        - This class generates 63 bit ids that are unique across processes
+        and time ordered: 41 bits of milliseconds since `ID_EPOCH`, 10 bits
+        of worker id and 12 bits of sequence within the millisecond.
+        - Every process that creates questions needs its own worker id.
+
+    Attributes:
+        - `worker_id (int)`: The worker id, from 0 to 1023.
+
+    Methods:
+        - `next_id(self) -> int`
+
+    """
+
+    def __init__(self, worker_id: int) -> None:
+        if not 0 <= worker_id < 1 << WORKER_BITS:
+            raise ValueError(f"Worker id out of range: {worker_id}")
+
+        self.worker_id: int = worker_id
+        self._lock: threading.Lock = threading.Lock()
+        self._last: int = 0
+        self._sequence: int = 0
+
+    def next_id(self) -> int:
+        """
+        Next Id Method
+
+        Description:
+            - This method returns a new id. When the sequence of the current
+            millisecond runs out, or the clock steps back, it waits for the
+            clock to pass the last millisecond used.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `id (int)`: The id.
+
+        """
+
+        with self._lock:
+            now: int = time.time_ns() // 1_000_000 - ID_EPOCH
+
+            if now == self._last:
+                self._sequence = (self._sequence + 1) % (1 << SEQUENCE_BITS)
+                if not self._sequence:
+                    now = self._wait(after=self._last)
+
+            elif now < self._last:
+                now = self._wait(after=self._last)
+                self._sequence = 0
+
+            else:
+                self._sequence = 0
+
+            self._last = now
+
+            return (
+                now << (WORKER_BITS + SEQUENCE_BITS)
+                | self.worker_id << SEQUENCE_BITS
+                | self._sequence
+            )
+
+    def _wait(self, after: int) -> int:
+        now: int = time.time_ns() // 1_000_000 - ID_EPOCH
+        while now <= after:
+            time.sleep(0.0001)
+            now = time.time_ns() // 1_000_000 - ID_EPOCH
+
+        return now
+
+
+@lru_cache(maxsize=1)
+def _generator(worker_id: int) -> SnowflakeGenerator:
+    return SnowflakeGenerator(worker_id=worker_id)
+
+
+def next_id() -> int:
+    """
+    Next Id Function
+
+    Description:
+        - This function returns a new snowflake id for the `POLLS_WORKER_ID`
+        setting. Every process that shares the shards must set a distinct
+        worker id, or two processes could hand out the same id, so it raises
+        `ImproperlyConfigured` when the setting is missing.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `id (int)`: The id.
+
+    """
+
+    worker_id: int | None = getattr(settings, "POLLS_WORKER_ID", None)
+    if worker_id is None:
+        raise ImproperlyConfigured(
+            "POLLS_WORKER_ID must be set to a distinct id from 0 to 1023 in "
+            "every process while sharding is on."
+        )
+
+    return _generator(worker_id=worker_id).next_id()
+
+
+class ShardedQuerySet(models.QuerySet):
+    """
+    Sharded QuerySet Class
+
+    Description:
+        - This class creates objects on the shard the router picks for them,
+        instead of on the database of the queryset.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `create(self, **kwargs: Any) -> models.Model`
+
+    """
+
+    def create(self, **kwargs: Any) -> models.Model:
+        """
+        Creates an object on its own shard, unless `using()` picked one.
+        """
+
+        if self._db is not None or not is_sharded():
+            return super().create(**kwargs)
+
+        obj: models.Model = self.model(**kwargs)
+        obj.save(force_insert=True)
+
+        return obj
+
+
+class ShardedModel(models.Model):
+    """
+    Sharded Model Class
+
+    Description:
+        - This class is the base of the sharded models. It gives new objects
+        a snowflake id before they are routed, while sharding is on.
+
+    Attributes:
+        - `objects (ShardedQuerySet)`: The default manager.
+
+    Methods:
+        - `save(self, *args: Any, **kwargs: Any) -> None`
+
+    """
+
+    objects = ShardedQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        """
+        Saves the object, with a new snowflake id if it has none yet.
+        """
+
+        if self.pk is None and is_sharded():
+            self.pk = next_id()
+            kwargs["force_insert"] = True
+
+        super().save(*args, **kwargs)
+
+
+class ShardRouter:
+    """
+    Shard Router Class
+
+    Description:
+        - This class routes the questions, choices, vote events and voter
+        bitmaps of a question to its shard. Objects already loaded stay on
+        the database they came from, and related objects must share it.
+        - Queries without an object to route by go to the default database,
+        so code that reads by id selects the shard with `shard_for`.
+        Every other model stays on the default database.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `db_for_read(self, model: type[models.Model], **hints: Any) -> str
+        | None`
+        - `db_for_write(self, model: type[models.Model], **hints: Any) -> str
+        | None`
+        - `allow_relation(self, obj1: models.Model, obj2: models.Model) ->
+        bool | None`
+
+    """
+
+    def _route(self, model: type[models.Model], **hints: Any) -> str | None:
+        instance: models.Model | None = hints.get("instance")
+        if model._meta.label_lower not in SHARDED_MODELS or instance is None:
+            return None
+
+        if instance._state.db:
+            return instance._state.db
+
+        question_id: int | None = (
+            instance.pk
+            if instance._meta.model_name == "question"
+            else getattr(instance, "question_id", None)
+        )
+
+        return None if question_id is None else shard_for(question_id)
+
+    db_for_read = _route
+    db_for_write = _route
+
+    def allow_relation(
+        self, obj1: models.Model, obj2: models.Model
+    ) -> bool | None:
+        """
+        Allows relations between sharded objects of the same shard only.
+        """
+
+        if {obj1._meta.label_lower, obj2._meta.label_lower} <= SHARDED_MODELS:
+            return obj1._state.db == obj2._state.db
+
+        return None
@@ -0,0 +1,152 @@
+"""
+Polls Signals Module
+
+Description:
+    - This module contains the signal receivers for the polls app.
+    - Receivers are connected when the app registry is ready.
+
+"""
+
+from typing import Any
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Choice, Question
+from .pages import delete_detail_page
+from .publishing import schedule
+from .results import thaw_results
+from .search import reindex
+
+# Fields written by votes, which neither the search documents nor the
+# detail pages show.
+VOTE_FIELDS: frozenset[str] = frozenset({"votes", "trending_score"})
+# Fields shown by the detail page, of questions and of their choices.
+PAGE_FIELDS: frozenset[str] = frozenset(
+    {"question_text", "pub_date", "closes_at", "choice_text", "question"}
+)
+
+
+def is_vote_write(**kwargs: Any) -> bool:
+    """
+    Tells if a save only wrote fields that votes write.
+    """
+
+    update_fields: frozenset[str] | None = kwargs.get("update_fields")
+    return bool(update_fields) and update_fields <= VOTE_FIELDS
+
+
+def changes_detail_page(**kwargs: Any) -> bool:
+    """
+    Tells if a save may have changed what the detail page shows.
+    """
+
+    update_fields: frozenset[str] | None = kwargs.get("update_fields")
+    return update_fields is None or bool(update_fields & PAGE_FIELDS)
+
+
+@receiver(signal=post_save, sender=Question)
+@receiver(signal=post_delete, sender=Question)
+def invalidate_publishing_schedule(**kwargs: Any) -> None:
+    """
+    Invalidate Publishing Schedule Receiver
+
+    Description:
+        - This receiver invalidates the publishing schedule once the change
+        of a question is committed.
+
+    Args:
+        - `**kwargs (Any)`: The signal arguments.
+
+    Returns:
+        - `None`
+
+    """
+
+    transaction.on_commit(func=schedule.invalidate, using=kwargs.get("using"))
+
+
+@receiver(signal=post_save, sender=Question)
+@receiver(signal=post_delete, sender=Question)
+@receiver(signal=post_save, sender=Choice)
+@receiver(signal=post_delete, sender=Choice)
+def invalidate_question_caches(
+    instance: Question | Choice, **kwargs: Any
+) -> None:
+    """
+    Invalidate Question Caches Receiver
+
+    Description:
+        - This receiver drops the cached detail page and the frozen results
+        of a question when it or one of its choices is changed, so that
+        they are built again from the current rows.
+        - The detail page, which shows no votes, is only dropped by changes
+        to the fields it shows, so votes leave it cached. Deletions and
+        saves without `update_fields` always drop it.
+
+    Args:
+        - `instance (Question | Choice)`: The changed object.
+        - `**kwargs (Any)`: The signal arguments.
+
+    Returns:
+        - `None`
+
+    """
+
+    question_id: int = (
+        instance.question_id  # type: ignore
+        if isinstance(instance, Choice)
+        else instance.id  # type: ignore
+    )
+
+    page: bool = changes_detail_page(**kwargs)
+
+    def invalidate() -> None:
+        if page:
+            delete_detail_page(question_id=question_id)
+        thaw_results(question_id=question_id)
+
+    transaction.on_commit(func=invalidate, using=kwargs.get("using"))
+
+
+@receiver(signal=post_save, sender=Question)
+@receiver(signal=post_delete, sender=Question)
+@receiver(signal=post_save, sender=Choice)
+@receiver(signal=post_delete, sender=Choice)
+def update_search_index(instance: Question | Choice, **kwargs: Any) -> None:
+    """
+    Update Search Index Receiver
+
+    Description:
+        - This receiver rebuilds the search document of a question once the
+        change of the question or one of its choices is committed. Deleted
+        questions are removed from the index.
+        - Running after the commit also picks up the inline choices the
+        admin saves after the question itself.
+        - Saves of vote counts only are skipped, as the documents hold text
+        only.
+
+    Args:
+        - `instance (Question | Choice)`: The changed object.
+        - `**kwargs (Any)`: The signal arguments.
+
+    Returns:
+        - `None`
+
+    """
+
+    if is_vote_write(**kwargs):
+        return
+
+    question_id: int = (
+        instance.question_id  # type: ignore
+        if isinstance(instance, Choice)
+        else instance.id  # type: ignore
+    )
+    using: str = kwargs.get("using") or "default"
+
+    transaction.on_commit(
+        func=lambda: reindex(question_ids=[question_id], using=using),
+        using=using,
+    )
@@ -6,14 +6,66 @@ Description:
 
 """
 
+import gzip
+import json
+from collections.abc import Iterator
+from contextlib import ExitStack, contextmanager
 from datetime import datetime, timedelta
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import time
+from typing import Any
+from unittest import mock, skipUnless
 
-from django.http import HttpResponse
-from django.test import TestCase
+from django.apps import apps
+from django.conf import settings
+from django.contrib.admin import site
+from django.contrib.auth.models import User
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpRequest, HttpResponse
+from django.test import (
+    Client,
+    RequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
 from django.urls import reverse
 from django.utils import timezone
 
-from .models import Question
+from .admin import ChoiceInline
+from .archive import archive_questions
+from .bitmaps import (
+    VOTER_COOKIE,
+    VOTER_COOKIE_SALT,
+    Bitmap,
+    decode_container,
+    encode_container,
+)
+from .bulk import reset_votes, summarize
+from .models import (
+    ArchivedQuestion,
+    Choice,
+    OutboxCheckpoint,
+    Question,
+    VoteEvent,
+    Voter,
+)
+from .outbox import FileSink, OutboxSink, prune, relay
+from .pages import get_detail_page
+from .publishing import schedule
+from .results import freeze_results, get_frozen_results, thaw_results
+from .search import search
+from .sharding import HashRing, SnowflakeGenerator, get_shards, shard_for
+from .throttling import MemoryBucketStore, get_client_ip, memory_store
+from .trending import record_votes, vote_weight
+from .warmup import warm_up_in_background, warm_up_on_start
 
 
 class QuestionModelTests(TestCase):
@@ -95,6 +147,27 @@ def create_question(question_text, days) -> Question:
     )
 
 
+@contextmanager
+def run_on_commit(test_case: TestCase) -> Iterator[None]:
+    """
+    Runs the on-commit callbacks of every shard when the block ends, as
+    `captureOnCommitCallbacks(execute=True)` does for one database.
+    """
+
+    with ExitStack() as stack:
+        for alias in get_shards():
+            stack.enter_context(
+                test_case.captureOnCommitCallbacks(using=alias, execute=True)
+            )
+        yield
+
+
+# Pins a test case to the default database, for tests that count the
+# queries of one database or go through the admin, which lists one shard at
+# a time; `ShardingTests` covers those paths across shards.
+one_database = override_settings(POLLS_SHARDS=[DEFAULT_DB_ALIAS])
+
+
 class QuestionIndexViewTests(TestCase):
     """
     Question Index View Test Cases
@@ -103,7 +176,8 @@ class QuestionIndexViewTests(TestCase):
         - This class contains the test cases for the Question Index View.
 
     Attributes:
-        - `None`
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
 
     Methods:
         - `test_no_questions(self) -> None`
@@ -114,6 +188,8 @@ class QuestionIndexViewTests(TestCase):
 
     """
 
+    databases = "__all__"
+
     def test_no_questions(self) -> None:
         """
         If no questions exist, an appropriate message is displayed.
@@ -217,7 +293,8 @@ class QuestionDetailViewTests(TestCase):
         - This class contains the test cases for the Question Detail View.
 
     Attributes:
-        - `None`
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
 
     Methods:
         - `test_future_question(self) -> None`
@@ -225,6 +302,8 @@ class QuestionDetailViewTests(TestCase):
 
     """
 
+    databases = "__all__"
+
     def test_future_question(self) -> None:
         """
         The detail view of a question with a pub_date in the future
@@ -265,3 +344,2134 @@ class QuestionDetailViewTests(TestCase):
         self.assertContains(
             response=response, text=past_question.question_text
         )
+
+
+@override_settings(POLLS_VOTE_THROTTLE={"IP_RATE": 0.01, "IP_BURST": 2})
+class VoteThrottleTests(TestCase):
+    """
+    Vote Throttle Test Cases
+
+    Description:
+        - This class contains the test cases for the vote rate limiter.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_excess_votes_are_rejected_without_queries(self) -> None`
+        - `test_question_limits_use_own_bucket(self) -> None`
+        - `test_forged_forwarding_addresses_share_a_bucket(self) -> None`
+        - `test_memory_store_evicts_oldest_bucket(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        memory_store.clear()
+
+    def test_excess_votes_are_rejected_without_queries(self) -> None:
+        """
+        Once the IP bucket is empty, the vote view answers 429 without
+        touching the database.
+        """
+
+        question: Question = create_question(
+            question_text="Throttled.", days=-1
+        )
+        url: str = reverse(
+            viewname="polls:vote", args=(question.id,)  # type: ignore
+        )
+
+        for _ in range(2):
+            self.assertEqual(
+                first=self.client.post(path=url).status_code,
+                second=2_00,
+                msg="Votes within the burst should be processed.",
+            )
+
+        with self.assertNumQueries(num=0):
+            response: HttpResponse = self.client.post(path=url)  # type: ignore
+
+        self.assertEqual(
+            first=response.status_code,
+            second=429,
+            msg="Votes over the burst should be rejected.",
+        )
+        self.assertIn(member="Retry-After", container=response.headers)
+
+    @override_settings(
+        POLLS_VOTE_THROTTLE={"QUESTION_LIMITS": {1: {"BURST": 1}}}
+    )
+    def test_question_limits_use_own_bucket(self) -> None:
+        """
+        Questions with their own limits are throttled per session
+        independently of the other questions.
+        """
+
+        self.client.cookies["sessionid"] = "throttled-voter-session"
+
+        self.assertEqual(
+            first=self.client.post(path="/polls/1/vote/").status_code,
+            second=404,
+            msg="The first vote should reach the view.",
+        )
+        self.assertEqual(
+            first=self.client.post(path="/polls/1/vote/").status_code,
+            second=429,
+            msg="The second vote should exceed the question limit.",
+        )
+        self.assertEqual(
+            first=self.client.post(path="/polls/2/vote/").status_code,
+            second=404,
+            msg="Other questions should use the session bucket.",
+        )
+
+    @override_settings(
+        POLLS_VOTE_THROTTLE={
+            "IP_META_KEY": "HTTP_X_FORWARDED_FOR",
+            "IP_BURST": 1,
+        }
+    )
+    def test_forged_forwarding_addresses_share_a_bucket(self) -> None:
+        """
+        The address added by the trusted proxy is throttled, whatever the
+        client puts before it in X-Forwarded-For.
+        """
+
+        statuses: list[int] = [
+            self.client.post(
+                path="/polls/1/vote/",
+                headers={"X-Forwarded-For": f"10.0.0.{index}, 203.0.113.7"},
+            ).status_code
+            for index in range(2)
+        ]
+
+        self.assertEqual(first=statuses, second=[404, 429])
+        self.assertEqual(
+            first=get_client_ip(
+                request=RequestFactory().get(
+                    path="/",
+                    headers={"X-Forwarded-For": "10.0.0.1, 203.0.113.7, 10.1"},
+                ),
+                meta_key="HTTP_X_FORWARDED_FOR",
+                trusted_proxies=2,
+            ),
+            second="203.0.113.7",
+        )
+        self.assertEqual(
+            first=get_client_ip(
+                request=RequestFactory().get(
+                    path="/", headers={"X-Forwarded-For": "10.0.0.1"}
+                ),
+                meta_key="HTTP_X_FORWARDED_FOR",
+                trusted_proxies=2,
+            ),
+            second="127.0.0.1",
+        )
+
+    def test_memory_store_evicts_oldest_bucket(self) -> None:
+        """
+        The memory store keeps at most `max_entries` buckets and drops the
+        least recently used one first.
+        """
+
+        store: MemoryBucketStore = MemoryBucketStore(max_entries=2)
+        store.acquire(key="a", rate=1.0, burst=1)
+        store.acquire(key="b", rate=1.0, burst=1)
+        store.acquire(key="a", rate=1.0, burst=1)
+        store.acquire(key="c", rate=1.0, burst=1)
+
+        self.assertEqual(first=len(store), second=2)
+        self.assertEqual(
+            first=store.acquire(key="b", rate=1.0, burst=1),
+            second=0.0,
+            msg="The evicted bucket should start full again.",
+        )
+
+
+class QuestionSearchTests(TestCase):
+    """
+    Question Search Test Cases
+
+    Description:
+        - This class contains the test cases for the question search.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `create_indexed_question(self, question_text: str, days: int,
+        choices: tuple[str, ...] = ()) -> Question`
+        - `test_search_matches_prefixes_of_questions_and_choices(self) ->
+        None`
+        - `test_search_ranks_better_matches_first(self) -> None`
+        - `test_search_index_follows_changes(self) -> None`
+        - `test_votes_do_not_reindex(self) -> None`
+        - `test_search_view_lists_only_published_questions(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def create_indexed_question(
+        self, question_text: str, days: int, choices: tuple[str, ...] = ()
+    ) -> Question:
+        """
+        Creates a question and its choices and indexes them.
+        """
+
+        with run_on_commit(test_case=self):
+            question: Question = create_question(
+                question_text=question_text, days=days
+            )
+            for choice_text in choices:
+                Choice.objects.create(  # type: ignore
+                    question=question, choice_text=choice_text
+                )
+
+        return question
+
+    def test_search_matches_prefixes_of_questions_and_choices(self) -> None:
+        """
+        Words of the question and of its choices match by prefix.
+        """
+
+        question: Question = self.create_indexed_question(
+            question_text="Favourite programming language?",
+            days=-1,
+            choices=("Python", "Rust"),
+        )
+        self.create_indexed_question(question_text="Best pizza?", days=-1)
+
+        using: str = question._state.db  # type: ignore
+        self.assertEqual(
+            first=search(query="progr", using=using),
+            second=[question.id],  # type: ignore
+        )
+        self.assertEqual(
+            first=search(query="favourite pyth", using=using),
+            second=[question.id],  # type: ignore
+        )
+        self.assertEqual(
+            first=search(query="pyth pizza", using=using), second=[]
+        )
+        self.assertEqual(first=search(query="  ?! ", using=using), second=[])
+
+    @one_database
+    def test_search_ranks_better_matches_first(self) -> None:
+        """
+        Questions mentioning the words more often rank higher.
+        """
+
+        weak: Question = self.create_indexed_question(
+            question_text="Is tea better than coffee today?", days=-1
+        )
+        strong: Question = self.create_indexed_question(
+            question_text="Tea?", days=-1, choices=("Green tea", "Black tea")
+        )
+
+        self.assertEqual(
+            first=search(query="tea"),
+            second=[strong.id, weak.id],  # type: ignore
+        )
+
+    def test_search_index_follows_changes(self) -> None:
+        """
+        Renaming a choice or deleting a question updates the index.
+        """
+
+        question: Question = self.create_indexed_question(
+            question_text="Holiday plans?", days=-1, choices=("Mountains",)
+        )
+        choice: Choice = question.choice_set.get()  # type: ignore
+        using: str = question._state.db  # type: ignore
+
+        with run_on_commit(test_case=self):
+            choice.choice_text = "Seaside"
+            choice.save()
+
+        self.assertEqual(
+            first=search(query="mountain", using=using), second=[]
+        )
+        self.assertEqual(
+            first=search(query="seas", using=using),
+            second=[question.id],  # type: ignore
+        )
+
+        with run_on_commit(test_case=self):
+            question.delete()
+
+        self.assertEqual(first=search(query="holiday", using=using), second=[])
+
+    def test_votes_do_not_reindex(self) -> None:
+        """
+        Votes, and saves of vote counts only, leave the index alone.
+        """
+
+        question: Question = self.create_indexed_question(
+            question_text="Lunch?", days=-1, choices=("Soup",)
+        )
+        choice: Choice = question.choice_set.get()  # type: ignore
+
+        with mock.patch(target="django_polls.signals.reindex") as reindex:
+            with run_on_commit(test_case=self):
+                self.client.post(
+                    path=reverse(
+                        viewname="polls:vote",
+                        args=(question.id,),  # type: ignore
+                    ),
+                    data={"choice": choice.id},  # type: ignore
+                )
+                choice.votes = 5
+                choice.save(update_fields=["votes"])
+
+        reindex.assert_not_called()
+        choice.refresh_from_db()
+        self.assertEqual(first=choice.votes, second=5)
+
+    def test_search_view_lists_only_published_questions(self) -> None:
+        """
+        The search page lists matching published questions only.
+        """
+
+        question: Question = self.create_indexed_question(
+            question_text="Past election poll.", days=-1
+        )
+        self.create_indexed_question(
+            question_text="Future election poll.", days=1
+        )
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="polls:search"), data={"q": "elect"}
+        )
+
+        self.assertEqual(first=response.status_code, second=200)
+        self.assertEqual(
+            first=response.context["question_list"],  # type: ignore
+            second=[question],
+        )
+        self.assertContains(response=response, text="Past election poll.")
+
+
+class TrendingTests(TestCase):
+    """
+    Trending Test Cases
+
+    Description:
+        - This class contains the test cases for the trending ranking.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_recent_votes_outweigh_older_votes(self) -> None`
+        - `test_vote_updates_trending_page(self) -> None`
+        - `test_first_vote_with_large_weight(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        memory_store.clear()
+
+    @override_settings(POLLS_TRENDING_HALF_LIFE=3_600)
+    def test_recent_votes_outweigh_older_votes(self) -> None:
+        """
+        One vote outranks three votes cast three half-lives earlier, and
+        scheduled questions are never listed.
+        """
+
+        old: Question = create_question(question_text="Old.", days=-1)
+        new: Question = create_question(question_text="New.", days=-1)
+        create_question(question_text="Scheduled.", days=1)
+        now: datetime = timezone.now()
+
+        for _ in range(3):
+            record_votes(
+                question_ids=[old.id],  # type: ignore
+                now=now - timedelta(hours=3),
+                using=old._state.db,  # type: ignore
+            )
+        record_votes(
+            question_ids=[new.id], now=now, using=new._state.db  # type: ignore
+        )
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="polls:trending")
+        )
+
+        self.assertQuerySetEqual(
+            qs=response.context["trending_question_list"],  # type: ignore
+            values=[new, old],
+        )
+
+    def test_vote_updates_trending_page(self) -> None:
+        """
+        A vote raises the score of its question, and the trending page is
+        read with a single query.
+        """
+
+        quiet: Question = create_question(question_text="Quiet.", days=-1)
+        busy: Question = create_question(question_text="Busy.", days=-2)
+        choice: Choice = Choice.objects.create(  # type: ignore
+            question=busy, choice_text="Yes"
+        )
+
+        self.client.post(
+            path=reverse(
+                viewname="polls:vote", args=(busy.id,)  # type: ignore
+            ),
+            data={"choice": choice.id},  # type: ignore
+        )
+
+        with self.assertNumQueries(num=1):
+            response: HttpResponse = self.client.get(  # type: ignore
+                path=reverse(viewname="polls:trending")
+            )
+
+        self.assertContains(response=response, text="Busy.")
+        self.assertQuerySetEqual(
+            qs=response.context["trending_question_list"],  # type: ignore
+            values=[busy, quiet],
+        )
+
+    @override_settings(POLLS_TRENDING_HALF_LIFE=3_600)
+    def test_first_vote_with_large_weight(self) -> None:
+        """
+        The first vote on a fresh question, thousands of half-lives after
+        the epoch, sets its score to the weight of the vote.
+        """
+
+        question: Question = create_question(question_text="New.", days=-1)
+        now: datetime = timezone.now()
+
+        record_votes(
+            question_ids=[question.id],  # type: ignore
+            now=now,
+            using=question._state.db,  # type: ignore
+        )
+
+        question.refresh_from_db()
+        self.assertGreater(a=vote_weight(now=now), b=745)
+        self.assertAlmostEqual(
+            first=question.trending_score, second=vote_weight(now=now)
+        )
+
+
+class FailingSink(OutboxSink):
+    """
+    An outbox sink whose deliveries always fail.
+    """
+
+    def send(self, events: list[dict[str, Any]]) -> None:
+        raise OSError("The sink is down.")
+
+
+class VoteOutboxTests(TestCase):
+    """
+    Vote Outbox Test Cases
+
+    Description:
+        - This class contains the test cases for the vote outbox.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `create_events(self, count: int) -> list[VoteEvent]`
+        - `test_vote_writes_outbox_event(self) -> None`
+        - `test_relay_delivers_ordered_batches_and_checkpoints(self) ->
+        None`
+        - `test_failed_delivery_is_retried(self) -> None`
+        - `test_late_events_in_gaps_are_delivered(self) -> None`
+        - `test_sinks_must_implement_send(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        memory_store.clear()
+        directory: TemporaryDirectory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path: Path = Path(directory.name) / "votes.jsonl"
+
+    def create_events(self, count: int) -> list[VoteEvent]:
+        """
+        Creates `count` vote events cast a minute ago.
+        """
+
+        return VoteEvent.objects.bulk_create(  # type: ignore
+            objs=[
+                VoteEvent(
+                    question_id=1,
+                    choice_id=index,
+                    created_at=timezone.now() - timedelta(minutes=1),
+                )
+                for index in range(count)
+            ]
+        )
+
+    def test_vote_writes_outbox_event(self) -> None:
+        """
+        A vote records an outbox event for its question and choice.
+        """
+
+        question: Question = create_question(question_text="Q.", days=-1)
+        choice: Choice = Choice.objects.create(  # type: ignore
+            question=question, choice_text="Yes"
+        )
+
+        self.client.post(
+            path=reverse(
+                viewname="polls:vote", args=(question.id,)  # type: ignore
+            ),
+            data={"choice": choice.id},  # type: ignore
+        )
+
+        self.assertEqual(
+            first=list(
+                VoteEvent.objects.using(  # type: ignore
+                    question._state.db  # type: ignore
+                ).values_list("question_id", "choice_id")
+            ),
+            second=[(question.id, choice.id)],  # type: ignore
+        )
+
+    def test_relay_delivers_ordered_batches_and_checkpoints(self) -> None:
+        """
+        The relay writes every event once, in order, in batches, and a
+        prune removes the delivered events.
+        """
+
+        events: list[VoteEvent] = self.create_events(count=5)
+        VoteEvent.objects.create(question_id=1, choice_id=99)  # type: ignore
+
+        output: StringIO = StringIO()
+        call_command(
+            "relay_vote_events",
+            f"file:{self.path}",
+            "--batch-size=2",
+            "--lag=30",
+            "--prune",
+            stdout=output,
+        )
+
+        self.assertIn(
+            member="Relayed 5 vote events.", container=output.getvalue()
+        )
+        self.assertEqual(
+            first=[
+                json.loads(line)["id"]
+                for line in self.path.read_text().splitlines()
+            ],
+            second=[event.id for event in events],  # type: ignore
+        )
+        self.assertEqual(
+            first=OutboxCheckpoint.objects.get().last_event_id,  # type: ignore
+            second=events[-1].id,  # type: ignore
+        )
+        self.assertEqual(
+            first=VoteEvent.objects.count(), second=1  # type: ignore
+        )
+
+    def test_failed_delivery_is_retried(self) -> None:
+        """
+        A batch the sink failed to deliver is sent again by the next run.
+        """
+
+        self.create_events(count=3)
+
+        with self.assertRaises(expected_exception=OSError):
+            relay(sink=FailingSink())
+
+        self.assertEqual(
+            first=OutboxCheckpoint.objects.get().last_event_id,  # type: ignore
+            second=0,
+        )
+        self.assertEqual(first=prune(), second=0)
+
+        sink: FileSink = FileSink(path=str(self.path))
+        self.addCleanup(sink.close)
+
+        self.assertEqual(first=relay(sink=sink), second=3)
+        self.assertEqual(
+            first=len(self.path.read_text().splitlines()), second=3
+        )
+
+    def test_late_events_in_gaps_are_delivered(self) -> None:
+        """
+        An event committed after the checkpoint passed its id is delivered
+        by the next run and kept from prunes, until the gap times out.
+        """
+
+        events: list[VoteEvent] = self.create_events(count=4)
+        ids: list[int] = [event.id for event in events]  # type: ignore
+        events[1].delete()
+        sink: FileSink = FileSink(path=str(self.path))
+        self.addCleanup(sink.close)
+
+        self.assertEqual(first=relay(sink=sink), second=3)
+        self.assertEqual(
+            first=list(OutboxCheckpoint.objects.get().gaps),  # type: ignore
+            second=[str(ids[1])],
+        )
+
+        events[1].pk = ids[1]
+        events[1].save()
+        self.assertEqual(first=prune(), second=3)
+        self.assertEqual(first=relay(sink=sink), second=1)
+        self.assertEqual(
+            first=[
+                json.loads(line)["id"]
+                for line in self.path.read_text().splitlines()
+            ],
+            second=[ids[0], ids[2], ids[3], ids[1]],
+        )
+        self.assertEqual(
+            first=list(OutboxCheckpoint.objects.get().gaps),  # type: ignore
+            second=[],
+        )
+
+        # A rolled back id is looked up until the gap times out.
+        VoteEvent.objects.create(  # type: ignore
+            id=ids[3] + 2, question_id=1, choice_id=1
+        )
+        relay(sink=sink, lag=0)
+        self.assertEqual(
+            first=list(OutboxCheckpoint.objects.get().gaps),  # type: ignore
+            second=[str(ids[3] + 1)],
+        )
+        self.assertEqual(first=relay(sink=sink, gap_timeout=0), second=0)
+        self.assertEqual(
+            first=list(OutboxCheckpoint.objects.get().gaps),  # type: ignore
+            second=[],
+        )
+
+    def test_sinks_must_implement_send(self) -> None:
+        """
+        A sink without `send` can't be built.
+        """
+
+        with self.assertRaises(expected_exception=TypeError):
+            type("IncompleteSink", (OutboxSink,), {})()
+
+
+class PublishingScheduleTests(TransactionTestCase):
+    """
+    Publishing Schedule Test Cases
+
+    Description:
+        - This class contains the test cases for the publishing schedule.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_index_is_served_from_snapshot(self) -> None`
+        - `test_scheduled_question_appears_at_pub_date(self) -> None`
+        - `test_saving_question_invalidates_snapshot(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        schedule.invalidate()
+
+    def test_index_is_served_from_snapshot(self) -> None:
+        """
+        Once built, the index page is served without querying the database.
+        """
+
+        question: Question = create_question(
+            question_text="Past question.", days=-1
+        )
+        self.client.get(path=reverse(viewname="polls:index"))
+
+        with self.assertNumQueries(num=0):
+            response: HttpResponse = self.client.get(  # type: ignore
+                path=reverse(viewname="polls:index")
+            )
+
+        self.assertEqual(
+            first=response.context["latest_question_list"],  # type: ignore
+            second=[question],
+        )
+
+    def test_scheduled_question_appears_at_pub_date(self) -> None:
+        """
+        A scheduled question becomes visible as soon as its pub_date passes.
+        """
+
+        question: Question = create_question(
+            question_text="Scheduled question.", days=1
+        )
+
+        self.assertIs(
+            expr1=schedule.is_published(pk=question.id),  # type: ignore
+            expr2=False,
+            msg="Scheduled questions should not be published yet.",
+        )
+
+        with mock.patch(
+            target="django_polls.publishing.timezone.now",
+            return_value=timezone.now() + timedelta(days=2),
+        ):
+            self.assertIs(
+                expr1=schedule.is_published(pk=question.id),  # type: ignore
+                expr2=True,
+                msg="Questions should be published at their pub_date.",
+            )
+            self.assertEqual(first=schedule.latest(), second=[question])
+
+    def test_saving_question_invalidates_snapshot(self) -> None:
+        """
+        Saving a question rebuilds the snapshot on the next lookup.
+        """
+
+        question: Question = create_question(
+            question_text="Past question.", days=-1
+        )
+        self.assertIs(
+            expr1=schedule.is_published(pk=question.id),  # type: ignore
+            expr2=True,
+        )
+
+        question.pub_date = timezone.now() + timedelta(days=1)
+        question.save()
+
+        self.assertIs(
+            expr1=schedule.is_published(pk=question.id),  # type: ignore
+            expr2=False,
+            msg="Rescheduled questions should be hidden again.",
+        )
+        self.assertEqual(first=schedule.latest(), second=[])
+
+
+class ClosedQuestionTests(TransactionTestCase):
+    """
+    Closed Question Test Cases
+
+    Description:
+        - This class contains the test cases for closing questions.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_vote_on_closed_question_is_rejected(self) -> None`
+        - `test_closed_results_are_frozen(self) -> None`
+        - `test_reopening_question_thaws_results(self) -> None`
+        - `test_frozen_results_expire(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        memory_store.clear()
+        schedule.invalidate()
+        self.question: Question = create_question(
+            question_text="Closed question.", days=-2
+        )
+        self.choice: Choice = Choice.objects.create(  # type: ignore
+            question=self.question, choice_text="Yes", votes=3
+        )
+        self.question.closes_at = timezone.now() - timedelta(days=1)
+        self.question.save()
+        thaw_results(question_id=self.question.id)  # type: ignore
+
+    def test_vote_on_closed_question_is_rejected(self) -> None:
+        """
+        Votes on a closed question are rejected, without a query once its
+        results are frozen.
+        """
+
+        url: str = reverse(
+            viewname="polls:vote", args=(self.question.id,)  # type: ignore
+        )
+        self.client.post(path=url, data={"choice": self.choice.id})
+
+        with self.assertNumQueries(num=0):
+            response: HttpResponse = self.client.post(  # type: ignore
+                path=url, data={"choice": self.choice.id}
+            )
+
+        self.assertEqual(
+            first=response.status_code,
+            second=403,
+            msg="Votes on closed questions should be rejected.",
+        )
+        self.choice.refresh_from_db()
+        self.assertEqual(first=self.choice.votes, second=3)
+
+    def test_closed_results_are_frozen(self) -> None:
+        """
+        Results of a closed question are frozen and served without queries,
+        cacheable for as long as they are kept.
+        """
+
+        url: str = reverse(
+            viewname="polls:results", args=(self.question.id,)  # type: ignore
+        )
+        self.client.get(path=url)
+
+        with self.assertNumQueries(num=0):
+            response: HttpResponse = self.client.get(path=url)  # type: ignore
+
+        self.assertContains(response=response, text="Yes -- 3 votes")
+        self.assertContains(response=response, text="This poll is closed.")
+        self.assertEqual(
+            first=response.headers["Cache-Control"],
+            second="public, max-age=300",
+        )
+
+    def test_reopening_question_thaws_results(self) -> None:
+        """
+        Reopening a closed question drops its frozen results.
+        """
+
+        self.client.get(
+            path=reverse(
+                viewname="polls:results",
+                args=(self.question.id,),  # type: ignore
+            )
+        )
+        self.question.closes_at = None
+        self.question.save()
+
+        question_id: int = self.question.id  # type: ignore
+
+        self.assertIsNone(obj=get_frozen_results(question_id=question_id))
+
+    @override_settings(POLLS_RESULTS_TIMEOUT=60)
+    def test_frozen_results_expire(self) -> None:
+        """
+        Frozen results expire, so a process that missed a thaw serves the
+        current results after the timeout.
+        """
+
+        freeze_results(question=self.question)
+
+        with mock.patch(target="time.time", return_value=time() + 61):
+            self.assertIsNone(
+                obj=get_frozen_results(
+                    question_id=self.question.id  # type: ignore
+                )
+            )
+
+
+@one_database
+class BatchVoteTests(TransactionTestCase):
+    """
+    Batch Vote Test Cases
+
+    Description:
+        - This class contains the test cases for the batch vote view.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `post(self, votes: dict[int, int]) -> HttpResponse`
+        - `test_votes_are_applied_in_one_transaction(self) -> None`
+        - `test_invalid_pair_rejects_whole_batch(self) -> None`
+        - `test_closed_question_rejects_whole_batch(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        memory_store.clear()
+        self.choices: list[Choice] = [
+            Choice.objects.create(  # type: ignore
+                question=create_question(question_text=f"Q{i}", days=-1),
+                choice_text="Yes",
+            )
+            for i in range(3)
+        ]
+
+    def post(self, votes: dict[int, int]) -> HttpResponse:
+        """
+        Posts `votes` to the batch vote view as JSON.
+        """
+
+        return self.client.post(  # type: ignore
+            path=reverse(viewname="polls:vote_batch"),
+            data={"votes": votes},
+            content_type="application/json",
+        )
+
+    def test_votes_are_applied_in_one_transaction(self) -> None:
+        """
+        A batch is validated with one query, then applied in one transaction
+        with one update of the choices, one read of the voter bitmaps, one
+        update of the trending scores and one insert into the outbox.
+        """
+
+        votes: dict[int, int] = {
+            choice.question_id: choice.id  # type: ignore
+            for choice in self.choices
+        }
+        # The first batch of a voter also registers it and its bitmaps.
+        self.post(votes=votes)
+
+        with self.assertNumQueries(num=7):
+            response: HttpResponse = self.post(votes=votes)
+
+        self.assertEqual(first=response.status_code, second=2_00)
+        self.assertEqual(
+            first=sorted(
+                Choice.objects.values_list("votes", flat=True)  # type: ignore
+            ),
+            second=[2, 2, 2],
+        )
+
+    def test_invalid_pair_rejects_whole_batch(self) -> None:
+        """
+        A choice that doesn't belong to its question rejects every vote.
+        """
+
+        first, second = self.choices[:2]
+        response: HttpResponse = self.post(
+            votes={
+                first.question_id: first.id,  # type: ignore
+                second.question_id: first.id,  # type: ignore
+            }
+        )
+
+        self.assertEqual(first=response.status_code, second=400)
+        self.assertEqual(
+            first=response.json()["questions"],  # type: ignore
+            second=[second.question_id],  # type: ignore
+        )
+        self.assertFalse(
+            expr=Choice.objects.filter(votes__gt=0).exists()  # type: ignore
+        )
+
+    def test_closed_question_rejects_whole_batch(self) -> None:
+        """
+        A closed question in the batch rejects every vote.
+        """
+
+        closed: Question = self.choices[0].question
+        closed.closes_at = timezone.now() - timedelta(minutes=1)
+        closed.save()
+
+        response: HttpResponse = self.post(
+            votes={
+                choice.question_id: choice.id  # type: ignore
+                for choice in self.choices
+            }
+        )
+
+        self.assertEqual(first=response.status_code, second=400)
+        self.assertFalse(
+            expr=Choice.objects.filter(votes__gt=0).exists()  # type: ignore
+        )
+
+
+@override_settings(POLLS_ADMIN_CHOICES_PER_PAGE=2)
+class ChoiceInlineTests(TestCase):
+    """
+    Choice Inline Test Cases
+
+    Description:
+        - This class contains the test cases for the paginated choice inline.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `get_request(self, **data: int) -> HttpRequest`
+        - `test_inline_renders_one_page(self) -> None`
+        - `test_only_changed_rows_are_saved(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        self.question: Question = create_question(
+            question_text="Many choices.", days=-1
+        )
+        self.choices: list[Choice] = [
+            Choice.objects.create(  # type: ignore
+                question=self.question, choice_text=f"Choice {i}", votes=i
+            )
+            for i in range(3)
+        ]
+        self.inline: ChoiceInline = ChoiceInline(
+            parent_model=Question, admin_site=site
+        )
+        self.user: User = User.objects.create_superuser(username="admin")
+
+    def get_request(self, **data: int) -> HttpRequest:
+        """
+        Builds a GET request made by a superuser.
+        """
+
+        request: HttpRequest = RequestFactory().get(path="/", data=data)
+        request.user = self.user
+
+        return request
+
+    def test_inline_renders_one_page(self) -> None:
+        """
+        The inline only builds forms for the choices of the requested page.
+        """
+
+        formset_class = self.inline.get_formset(
+            request=self.get_request(choice_page=2),
+            obj=self.question,
+        )
+        formset = formset_class(instance=self.question)
+
+        self.assertEqual(first=formset.initial_form_count(), second=1)
+        self.assertEqual(
+            first=formset.forms[0].instance, second=self.choices[2]
+        )
+
+    def test_only_changed_rows_are_saved(self) -> None:
+        """
+        Saving a page writes the changed choices with a single bulk update.
+        """
+
+        formset_class = self.inline.get_formset(
+            request=self.get_request(), obj=self.question
+        )
+        prefix: str = formset_class.get_default_prefix()
+        data: dict[str, str | int] = {
+            f"{prefix}-TOTAL_FORMS": 2,
+            f"{prefix}-INITIAL_FORMS": 2,
+        }
+        for index, choice in enumerate(self.choices[:2]):
+            data |= {
+                f"{prefix}-{index}-id": choice.id,  # type: ignore
+                f"{prefix}-{index}-question": self.question.id,  # type: ignore
+                f"{prefix}-{index}-choice_text": choice.choice_text,
+                f"{prefix}-{index}-votes": choice.votes,
+            }
+        data[f"{prefix}-1-choice_text"] = "Renamed"
+        formset = formset_class(data=data, instance=self.question)
+
+        self.assertTrue(expr=formset.is_valid(), msg=formset.errors)
+
+        with self.assertNumQueries(
+            num=1, using=self.question._state.db  # type: ignore
+        ):
+            formset.save()
+
+        self.choices[1].refresh_from_db()
+        self.assertEqual(first=self.choices[1].choice_text, second="Renamed")
+
+
+@one_database
+class BulkActionTests(TestCase):
+    """
+    Bulk Action Test Cases
+
+    Description:
+        - This class contains the test cases for the question admin bulk
+        actions.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `post_action(self, action: str, **data: Any) -> HttpResponse`
+        - `test_confirmation_page_counts_with_one_query(self) -> None`
+        - `test_reset_votes_without_signals(self) -> None`
+        - `test_reschedule_unpublishes_in_chunks(self) -> None`
+        - `test_delete_across_pages_without_signals(self) -> None`
+        - `test_delete_sends_signals_on_request(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        cache.clear()
+        schedule.invalidate()
+        self.questions: list[Question] = []
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(3):
+                question: Question = create_question(
+                    question_text=f"Bulk question {index}.", days=-1
+                )
+                for votes in (index, 1):
+                    Choice.objects.create(  # type: ignore
+                        question=question,
+                        choice_text="Bulk choice",
+                        votes=votes,
+                    )
+                self.questions.append(question)
+
+        self.client.force_login(
+            user=User.objects.create_superuser(username="admin")
+        )
+        self.signals: mock.Mock = mock.Mock()
+        for signal in (post_save, post_delete):
+            signal.connect(receiver=self.signals, dispatch_uid="bulk-test")
+            self.addCleanup(signal.disconnect, dispatch_uid="bulk-test")
+
+    def post_action(self, action: str, **data: Any) -> HttpResponse:
+        """
+        Posts an admin action for the first two questions, or for all of
+        them with `select_across`.
+        """
+
+        data.setdefault("_selected_action", [q.pk for q in self.questions[:2]])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(
+                path=reverse(viewname="admin:polls_question_changelist"),
+                data={"action": action, "index": 0, **data},
+            )
+
+    def test_confirmation_page_counts_with_one_query(self) -> None:
+        """
+        The confirmation page shows the size of the selection, counted with
+        a single aggregate query, and changes nothing.
+        """
+
+        with self.assertNumQueries(num=1):
+            summarize(queryset=Question.objects.all())  # type: ignore
+
+        response: HttpResponse = self.post_action(action="reset_votes")
+
+        self.assertTemplateUsed(
+            response=response,
+            template_name="polls/admin/bulk_confirmation.html",
+        )
+        self.assertEqual(
+            first=response.context["summary"],
+            second={"questions": 2, "choices": 4, "votes": 3},
+        )
+        self.assertEqual(
+            first=Choice.objects.filter(votes__gt=0).count(), second=5
+        )
+
+    @override_settings(POLLS_ADMIN_CHUNK_SIZE=1)
+    def test_reset_votes_without_signals(self) -> None:
+        """
+        Resetting votes updates every chunk of the selection and drops its
+        frozen results, without sending model signals.
+        """
+
+        freeze_results(question=self.questions[0])
+
+        response: HttpResponse = self.post_action(
+            action="reset_votes", post="yes"
+        )
+
+        self.assertEqual(first=response.status_code, second=302)
+        self.assertEqual(
+            first=set(
+                Choice.objects.filter(votes__gt=0).values_list(
+                    "question_id", flat=True
+                )
+            ),
+            second={self.questions[2].pk},
+        )
+        self.assertIsNone(
+            obj=get_frozen_results(question_id=self.questions[0].pk)
+        )
+        self.signals.assert_not_called()
+
+    @override_settings(POLLS_ADMIN_CHUNK_SIZE=1)
+    def test_reschedule_unpublishes_in_chunks(self) -> None:
+        """
+        A future publication date takes the selection off the index until
+        then.
+        """
+
+        response: HttpResponse = self.post_action(
+            action="reschedule",
+            post="yes",
+            pub_date=(timezone.now() + timedelta(days=1)).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            ),
+        )
+
+        self.assertEqual(first=response.status_code, second=302)
+        self.assertQuerySetEqual(
+            qs=self.client.get(path=reverse(viewname="polls:index")).context[
+                "latest_question_list"
+            ],
+            values=[self.questions[2]],
+        )
+        self.signals.assert_not_called()
+
+    @override_settings(POLLS_ADMIN_CHUNK_SIZE=2)
+    def test_delete_across_pages_without_signals(self) -> None:
+        """
+        Deleting every question of the change list removes them, their
+        choices and their search documents without sending model signals.
+        """
+
+        response: HttpResponse = self.post_action(
+            action="delete_questions",
+            post="yes",
+            select_across=1,
+            _selected_action=[self.questions[0].pk],
+        )
+
+        self.assertEqual(first=response.status_code, second=302)
+        self.assertFalse(expr=Question.objects.exists())
+        self.assertFalse(expr=Choice.objects.exists())
+        self.assertEqual(first=search(query="bulk"), second=[])
+        self.signals.assert_not_called()
+
+    def test_delete_sends_signals_on_request(self) -> None:
+        """
+        Deleting with "send delete signals" goes through the ORM collector.
+        """
+
+        self.post_action(
+            action="delete_questions", post="yes", send_signals="on"
+        )
+
+        self.assertEqual(first=Question.objects.count(), second=1)
+        self.assertEqual(first=self.signals.call_count, second=6)
+
+
+class WarmupTests(TransactionTestCase):
+    """
+    Warmup Test Cases
+
+    Description:
+        - This class contains the test cases for the cache warm-up.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_command_warms_active_questions(self) -> None`
+        - `test_server_start_warms_in_background(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        cache.clear()
+        memory_store.clear()
+        schedule.invalidate()
+        now: datetime = timezone.now()
+        self.open: list[Question] = []
+        for index in range(3):
+            question: Question = create_question(
+                question_text=f"Warm question {index}.", days=-1
+            )
+            Choice.objects.create(  # type: ignore
+                question=question, choice_text="Yes", votes=index
+            )
+            record_votes(
+                question_ids=[question.pk], now=now, using=question._state.db
+            )
+            self.open.append(question)
+        self.closed: Question = Question.objects.create(  # type: ignore
+            question_text="Closed question.",
+            pub_date=now - timedelta(days=2),
+            closes_at=now - timedelta(days=1),
+        )
+        record_votes(
+            question_ids=[self.closed.pk],
+            now=now - timedelta(days=1),
+            using=self.closed._state.db,
+        )
+        self.cold: Question = create_question(
+            question_text="Cold question.", days=-3
+        )
+        schedule.invalidate()
+
+    def test_command_warms_active_questions(self) -> None:
+        """
+        The command renders the pages of the most active questions, so that
+        their first requests are answered from the cache, and reports the
+        hit ratio before and after.
+        """
+
+        output: StringIO = StringIO()
+        call_command(
+            "warm_polls_cache", "--top=4", "--workers=2", stdout=output
+        )
+
+        self.assertIn(
+            member="0% before, 100% after", container=output.getvalue()
+        )
+        self.assertIn(
+            member="Warmed 5 templates and 8 pages of 4 questions",
+            container=output.getvalue(),
+        )
+        self.assertIsNotNone(
+            obj=get_frozen_results(question_id=self.closed.pk)
+        )
+        for question in self.open:
+            with self.assertNumQueries(num=0):
+                self.client.get(
+                    path=reverse(viewname="polls:detail", args=(question.pk,))
+                )
+
+        self.assertIsNone(obj=get_detail_page(question_id=self.cold.pk))
+
+    def test_server_start_warms_in_background(self) -> None:
+        """
+        With `POLLS_WARMUP_ON_READY`, starting a server starts a warm-up
+        thread, while readying the app, as every management command does,
+        doesn't.
+        """
+
+        with mock.patch(
+            target="django_polls.warmup.warm_up_in_background"
+        ) as start:
+            self.assertIsNone(obj=warm_up_on_start())
+
+            with self.settings(POLLS_WARMUP_ON_READY=True):
+                apps.get_app_config(app_label="polls").ready()
+                start.assert_not_called()
+
+                warm_up_on_start()
+
+        start.assert_called_once_with()
+
+        warm_up_in_background().join()
+        self.assertIsNotNone(obj=get_detail_page(question_id=self.open[0].pk))
+
+
+class CachedDetailPageTests(TransactionTestCase):
+    """
+    Cached Detail Page Test Cases
+
+    Description:
+        - This class contains the test cases for the cacheable detail page.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_detail_page_is_shared_and_cached(self) -> None`
+        - `test_changing_choice_drops_cached_page(self) -> None`
+        - `test_votes_keep_cached_page(self) -> None`
+        - `test_csrf_endpoint_returns_token(self) -> None`
+        - `test_vote_accepts_token_from_cookie(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        memory_store.clear()
+        schedule.invalidate()
+        self.question: Question = create_question(
+            question_text="Cached question.", days=-1
+        )
+        self.choice: Choice = Choice.objects.create(  # type: ignore
+            question=self.question, choice_text="Cached choice"
+        )
+        self.url: str = reverse(
+            viewname="polls:detail", args=(self.question.id,)  # type: ignore
+        )
+
+    def test_detail_page_is_shared_and_cached(self) -> None:
+        """
+        The detail page carries no CSRF token, is publicly cacheable and is
+        served from the page cache without queries.
+        """
+
+        self.client.get(path=self.url)
+
+        with self.assertNumQueries(num=0):
+            response: HttpResponse = self.client.get(  # type: ignore
+                path=self.url
+            )
+
+        self.assertContains(response=response, text="Cached choice")
+        self.assertContains(
+            response=response,
+            text='<input type="hidden" name="csrfmiddlewaretoken" value="">',
+        )
+        self.assertIn(
+            member="public", container=response.headers["Cache-Control"]
+        )
+        self.assertNotIn(member="csrftoken", container=response.cookies)
+
+    def test_changing_choice_drops_cached_page(self) -> None:
+        """
+        Saving a choice drops the cached detail page of its question.
+        """
+
+        self.client.get(path=self.url)
+        self.choice.choice_text = "Renamed choice"
+        self.choice.save()
+
+        self.assertContains(
+            response=self.client.get(path=self.url), text="Renamed choice"
+        )
+
+    def test_votes_keep_cached_page(self) -> None:
+        """
+        Votes, and saves of vote counts only, leave the cached detail page
+        alone.
+        """
+
+        self.client.get(path=self.url)
+        self.client.post(
+            path=reverse(
+                viewname="polls:vote", args=(self.question.id,)  # type: ignore
+            ),
+            data={"choice": self.choice.id},  # type: ignore
+        )
+        self.choice.votes = 5
+        self.choice.save(update_fields=["votes"])
+
+        with self.assertNumQueries(num=0):
+            self.client.get(path=self.url)
+
+    def test_csrf_endpoint_returns_token(self) -> None:
+        """
+        The CSRF endpoint returns a token and sets the CSRF cookie.
+        """
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="polls:csrf")
+        )
+
+        self.assertTrue(expr=response.json()["token"])  # type: ignore
+        self.assertIn(member="csrftoken", container=response.cookies)
+        self.assertIn(
+            member="no-cache", container=response.headers["Cache-Control"]
+        )
+
+    def test_vote_accepts_token_from_cookie(self) -> None:
+        """
+        A vote posted with the token read from the CSRF cookie is accepted.
+        """
+
+        client: Client = Client(enforce_csrf_checks=True)
+        client.get(path=reverse(viewname="polls:csrf"))
+
+        response: HttpResponse = client.post(  # type: ignore
+            path=reverse(
+                viewname="polls:vote",
+                args=(self.question.id,),  # type: ignore
+            ),
+            data={
+                "choice": self.choice.id,  # type: ignore
+                "csrfmiddlewaretoken": client.cookies["csrftoken"].value,
+            },
+        )
+
+        self.assertEqual(first=response.status_code, second=302)
+
+
+class ArchiveTests(TransactionTestCase):
+    """
+    Archive Test Cases
+
+    Description:
+        - This class contains the test cases for archiving cold questions.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_old_questions_are_moved_to_archive(self) -> None`
+        - `test_archived_results_keep_their_urls(self) -> None`
+        - `test_rolled_back_batch_is_not_exported(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        cache.clear()
+        memory_store.clear()
+        schedule.invalidate()
+        self.old: Question = create_question(
+            question_text="Old question.", days=-400
+        )
+        Choice.objects.create(  # type: ignore
+            question=self.old, choice_text="Yes", votes=3
+        )
+        Choice.objects.create(  # type: ignore
+            question=self.old, choice_text="No", votes=1
+        )
+        self.recent: Question = create_question(
+            question_text="Recent question.", days=-1
+        )
+
+    def test_old_questions_are_moved_to_archive(self) -> None:
+        """
+        Questions older than the threshold leave the hot tables with their
+        choices and are kept in the archive table and the export.
+        """
+
+        with TemporaryDirectory() as directory:
+            export: Path = Path(directory) / "archive.jsonl.gz"
+            call_command(
+                "archive_questions",
+                "--days=365",
+                f"--export={export}",
+                stdout=StringIO(),
+            )
+
+            with gzip.open(filename=export, mode="rt") as file:
+                exported: list[dict[str, Any]] = [
+                    json.loads(line) for line in file
+                ]
+
+        self.assertEqual(
+            first=[
+                question
+                for alias in get_shards()
+                for question in Question.objects.using(alias)  # type: ignore
+            ],
+            second=[self.recent],
+        )
+        self.assertFalse(
+            expr=Choice.objects.using(self.old._state.db)  # type: ignore
+            .filter(question_id=self.old.id)  # type: ignore
+            .exists()
+        )
+        archived: ArchivedQuestion = (
+            ArchivedQuestion.objects.get()  # type: ignore
+        )
+        self.assertEqual(first=archived.id, second=self.old.id)  # type: ignore
+        self.assertEqual(
+            first=[votes for _, _, votes in archived.results], second=[3, 1]
+        )
+        self.assertEqual(
+            first=[question["id"] for question in exported],
+            second=[self.old.id],  # type: ignore
+        )
+
+    def test_rolled_back_batch_is_not_exported(self) -> None:
+        """
+        A batch that fails before leaving its shard is exported only by the
+        run that archives it.
+        """
+
+        with TemporaryDirectory() as directory:
+            export: Path = Path(directory) / "archive.jsonl.gz"
+
+            with mock.patch(
+                target="django_polls.archive.ChoiceBitmap"
+            ) as bitmap:
+                bitmap.objects.using.side_effect = RuntimeError("Shard down")
+                with self.assertRaises(expected_exception=RuntimeError):
+                    archive_questions(
+                        before=timezone.now() - timedelta(days=365),
+                        export=str(export),
+                    )
+
+            self.assertFalse(expr=export.exists())
+
+            archive_questions(
+                before=timezone.now() - timedelta(days=365),
+                export=str(export),
+            )
+            with gzip.open(filename=export, mode="rt") as file:
+                exported: list[int] = [json.loads(line)["id"] for line in file]
+
+        self.assertEqual(first=exported, second=[self.old.id])  # type: ignore
+
+    def test_archived_results_keep_their_urls(self) -> None:
+        """
+        The results URL of an archived question serves its final tally,
+        its detail URL redirects there and votes are rejected.
+        """
+
+        call_command("archive_questions", "--days=365", stdout=StringIO())
+        results_url: str = reverse(
+            viewname="polls:results", args=(self.old.id,)  # type: ignore
+        )
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=results_url
+        )
+        self.assertContains(response=response, text="Yes -- 3 votes")
+        self.assertContains(response=response, text="This poll is closed.")
+
+        with self.assertNumQueries(num=0):
+            self.client.get(path=results_url)
+
+        self.assertRedirects(
+            response=self.client.get(  # type: ignore
+                path=reverse(
+                    viewname="polls:detail",
+                    args=(self.old.id,),  # type: ignore
+                )
+            ),
+            expected_url=results_url,
+            status_code=301,
+        )
+        self.assertEqual(
+            first=self.client.post(
+                path=reverse(
+                    viewname="polls:vote",
+                    args=(self.old.id,),  # type: ignore
+                ),
+                data={"choice": 1},
+            ).status_code,
+            second=403,
+        )
+
+
+SHARDS: list[str] = ["default", "shard_1", "shard_2"]
+
+
+@skipUnless(
+    condition=set(SHARDS) <= set(settings.DATABASES),
+    reason="The shard databases are not configured.",
+)
+@override_settings(POLLS_SHARDS=SHARDS, POLLS_WORKER_ID=1)
+class ShardingTests(TransactionTestCase):
+    """
+    Sharding Test Cases
+
+    Description:
+        - This class contains the test cases for the sharding of questions
+        across several SQLite databases.
+        - The shard databases are only configured while sharding is on, so
+        these tests run with `SHARDING=True` in the environment.
+
+    Attributes:
+        - `databases (set[str])`: The databases used by the tests.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `create_questions(self, count: int, topic: str = "Sharded") ->
+        list[Question]`
+        - `assert_placed(self, question: Question) -> None`
+        - `test_ring_moves_keys_only_to_new_nodes(self) -> None`
+        - `test_snowflake_ids_are_unique_and_ordered(self) -> None`
+        - `test_sharding_requires_worker_id(self) -> None`
+        - `test_questions_live_on_their_shard(self) -> None`
+        - `test_views_read_from_every_shard(self) -> None`
+        - `test_votes_are_recorded_on_the_question_shard(self) -> None`
+        - `test_admin_and_archive_reach_every_shard(self) -> None`
+        - `test_rebalance_moves_questions_to_new_shard(self) -> None`
+
+    """
+
+    databases = set(SHARDS) & set(settings.DATABASES)
+
+    def setUp(self) -> None:
+        cache.clear()
+        memory_store.clear()
+        schedule.invalidate()
+
+    def create_questions(
+        self, count: int, topic: str = "Sharded"
+    ) -> list[Question]:
+        """
+        Creates questions published on distinct days, with two choices each.
+        """
+
+        questions: list[Question] = []
+        for index in range(count):
+            question: Question = create_question(
+                question_text=f"{topic} question {index}.", days=-index - 1
+            )
+            Choice.objects.create(  # type: ignore
+                question=question, choice_text="Yes", votes=index
+            )
+            question.choice_set.create(  # type: ignore
+                choice_text="No", votes=1
+            )
+            questions.append(question)
+
+        return questions
+
+    def assert_placed(self, question: Question) -> None:
+        """
+        Asserts that a question and its choices are on its shard only.
+        """
+
+        for alias in SHARDS:
+            expected: int = int(alias == shard_for(question_id=question.pk))
+            self.assertEqual(
+                first=Question.objects.using(alias)
+                .filter(pk=question.pk)
+                .count(),
+                second=expected,
+            )
+            self.assertEqual(
+                first=Choice.objects.using(alias)
+                .filter(question_id=question.pk)
+                .count(),
+                second=2 * expected,
+            )
+
+    def test_ring_moves_keys_only_to_new_nodes(self) -> None:
+        """
+        Adding a node to the ring only moves keys to the new node, and each
+        node gets a fair share of the keys.
+        """
+
+        before: HashRing = HashRing(nodes=SHARDS[:2])
+        after: HashRing = HashRing(nodes=SHARDS)
+        placements: list[tuple[str, str]] = [
+            (before.get_node(key=key), after.get_node(key=key))
+            for key in range(3_000)
+        ]
+
+        self.assertTrue(
+            expr=all(old == new or new == "shard_2" for old, new in placements)
+        )
+        for alias in SHARDS:
+            self.assertGreater(
+                a=sum(new == alias for _, new in placements), b=700
+            )
+
+    def test_snowflake_ids_are_unique_and_ordered(self) -> None:
+        """
+        Snowflake ids increase strictly and carry the worker id.
+        """
+
+        generator: SnowflakeGenerator = SnowflakeGenerator(worker_id=5)
+        ids: list[int] = [generator.next_id() for _ in range(10_000)]
+
+        self.assertEqual(first=ids, second=sorted(set(ids)))
+        self.assertTrue(expr=all((pk >> 12) & 1023 == 5 for pk in ids))
+        with self.assertRaises(expected_exception=ValueError):
+            SnowflakeGenerator(worker_id=1024)
+
+    @override_settings(POLLS_WORKER_ID=None)
+    def test_sharding_requires_worker_id(self) -> None:
+        """
+        Questions can't be created on shards without a worker id.
+        """
+
+        with self.assertRaises(expected_exception=ImproperlyConfigured):
+            create_question(question_text="Orphan question.", days=-1)
+
+    def test_questions_live_on_their_shard(self) -> None:
+        """
+        Questions get snowflake ids and are written to the shard of their
+        id, together with their choices.
+        """
+
+        questions: list[Question] = self.create_questions(count=40)
+
+        for question in questions:
+            self.assertGreater(a=question.pk, b=1 << 32)
+            self.assert_placed(question=question)
+
+        self.assertEqual(
+            first={shard_for(question_id=q.pk) for q in questions},
+            second=set(SHARDS),
+        )
+
+    def test_views_read_from_every_shard(self) -> None:
+        """
+        The index gathers the newest questions of all shards, and detail,
+        search and trending pages find questions on any shard.
+        """
+
+        questions: list[Question] = self.create_questions(
+            count=20, topic="Scattered"
+        )
+
+        self.assertQuerySetEqual(
+            qs=self.client.get(path=reverse(viewname="polls:index")).context[
+                "latest_question_list"
+            ],
+            values=questions[:5],
+        )
+        for question in questions:
+            self.assertContains(
+                response=self.client.get(
+                    path=reverse(viewname="polls:detail", args=(question.pk,))
+                ),
+                text=question.question_text,
+            )
+
+        self.assertEqual(
+            first=len(
+                self.client.get(
+                    path=reverse(viewname="polls:search"),
+                    data={"q": "scattered"},
+                ).context["question_list"]
+            ),
+            second=20,
+        )
+        self.assertEqual(
+            first=len(
+                self.client.get(
+                    path=reverse(viewname="polls:trending")
+                ).context["trending_question_list"]
+            ),
+            second=10,
+        )
+
+    def test_votes_are_recorded_on_the_question_shard(self) -> None:
+        """
+        Single and batch votes update the tallies and outbox of the shards
+        of their questions.
+        """
+
+        questions: list[Question] = self.create_questions(count=9)
+        choices: dict[int, int] = {
+            question.pk: question.choice_set.get(  # type: ignore
+                choice_text="No"
+            ).pk
+            for question in questions
+        }
+
+        self.client.post(
+            path=reverse(viewname="polls:vote", args=(questions[0].pk,)),
+            data={"choice": choices[questions[0].pk]},
+        )
+        response: HttpResponse = self.client.post(
+            path=reverse(viewname="polls:vote_batch"),
+            data=json.dumps(obj={"votes": choices}),
+            content_type="application/json",
+        )
+
+        self.assertEqual(first=response.status_code, second=200)
+        for question in questions:
+            using: str = shard_for(question_id=question.pk)
+            self.assertEqual(
+                first=Choice.objects.using(using)
+                .get(pk=choices[question.pk])
+                .votes,
+                second=3 if question == questions[0] else 2,
+            )
+            self.assertEqual(
+                first=VoteEvent.objects.using(using)
+                .filter(question_id=question.pk)
+                .count(),
+                second=2 if question == questions[0] else 1,
+            )
+
+        with TemporaryDirectory() as directory:
+            call_command(
+                "relay_vote_events",
+                f"file:{Path(directory) / 'votes.jsonl'}",
+                "--lag=0",
+                stdout=StringIO(),
+            )
+            with open(
+                file=Path(directory) / "votes.jsonl", encoding="utf-8"
+            ) as file:
+                events: list[dict[str, Any]] = [
+                    json.loads(line) for line in file
+                ]
+
+        self.assertEqual(
+            first=sorted((e["shard"], e["question"]) for e in events),
+            second=sorted(
+                (shard_for(question_id=pk), pk)
+                for pk in [questions[0].pk, *choices]
+            ),
+        )
+
+    def test_admin_and_archive_reach_every_shard(self) -> None:
+        """
+        The admin lists and edits the questions of every shard, its actions
+        work on the listed shard and the archive empties every shard.
+        """
+
+        questions: list[Question] = self.create_questions(count=12)
+        self.client.force_login(
+            user=User.objects.create_superuser(username="admin")
+        )
+        changelist: str = reverse(viewname="admin:polls_question_changelist")
+
+        for alias in SHARDS:
+            self.assertEqual(
+                first={
+                    question.pk
+                    for question in self.client.get(
+                        path=changelist, data={"shard": alias}
+                    )
+                    .context["cl"]
+                    .result_list
+                },
+                second={
+                    question.pk
+                    for question in questions
+                    if shard_for(question_id=question.pk) == alias
+                },
+            )
+        for question in questions:
+            self.assertContains(
+                response=self.client.get(
+                    path=reverse(
+                        viewname="admin:polls_question_change",
+                        args=(question.pk,),
+                    )
+                ),
+                text='value="Yes"',
+            )
+
+        self.client.post(
+            path=f"{changelist}?shard=shard_1",
+            data={
+                "action": "reset_votes",
+                "index": 0,
+                "select_across": 1,
+                "_selected_action": [questions[0].pk],
+                "post": "yes",
+            },
+        )
+        for alias in SHARDS:
+            self.assertEqual(
+                first=Choice.objects.using(alias).filter(votes__gt=0).exists(),
+                second=alias != "shard_1",
+            )
+
+        call_command("archive_questions", "--days=0", stdout=StringIO())
+
+        self.assertEqual(
+            first=ArchivedQuestion.objects.count(), second=12  # type: ignore
+        )
+        for alias in SHARDS:
+            self.assertFalse(expr=Question.objects.using(alias).exists())
+
+    def test_rebalance_moves_questions_to_new_shard(self) -> None:
+        """
+        After a shard is added, rebalancing moves only the questions it now
+        owns, with their choices, and they stay reachable.
+        """
+
+        with override_settings(POLLS_SHARDS=SHARDS[:2]):
+            questions: list[Question] = self.create_questions(count=30)
+
+        dry_run: StringIO = StringIO()
+        call_command("rebalance_shards", "--dry-run", stdout=dry_run)
+        self.assertFalse(
+            expr=Question.objects.using("shard_2").exists(),
+        )
+
+        output: StringIO = StringIO()
+        call_command("rebalance_shards", "--batch-size=7", stdout=output)
+
+        self.assertEqual(
+            first=dry_run.getvalue().replace("Would move", "Moved"),
+            second=output.getvalue(),
+        )
+        self.assertNotIn(member="to default", container=output.getvalue())
+        self.assertNotIn(member="to shard_1", container=output.getvalue())
+        self.assertTrue(expr=Question.objects.using("shard_2").exists())
+        for question in questions:
+            self.assert_placed(question=question)
+            self.assertEqual(
+                first=self.client.get(
+                    path=reverse(viewname="polls:detail", args=(question.pk,))
+                ).status_code,
+                second=200,
+            )
+
+
+class VoterBitmapTests(TransactionTestCase):
+    """
+    Voter Bitmap Test Cases
+
+    Description:
+        - This class contains the test cases for the voter bitmaps and the
+        segmented results.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `crosstab(self, question: Question, *filters: Choice) -> dict[str,
+        Any]`
+        - `test_containers_switch_to_bitsets_when_dense(self) -> None`
+        - `test_bitmaps_intersect_across_containers(self) -> None`
+        - `test_voter_keeps_its_ordinal(self) -> None`
+        - `test_results_are_broken_down_by_segment(self) -> None`
+        - `test_reset_votes_empties_bitmaps(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        cache.clear()
+        memory_store.clear()
+        schedule.invalidate()
+        self.questions: list[Question] = [
+            create_question(question_text=f"Segment {index}?", days=-1)
+            for index in range(2)
+        ]
+        self.choices: list[list[Choice]] = [
+            [
+                Choice.objects.create(  # type: ignore
+                    question=question, choice_text=text
+                )
+                for text in ("Yes", "No")
+            ]
+            for question in self.questions
+        ]
+
+    def crosstab(self, question: Question, *filters: Choice) -> dict[str, Any]:
+        """
+        Returns the segmented results of a question.
+        """
+
+        response: HttpResponse = self.client.get(
+            path=reverse(viewname="polls:crosstab", args=(question.pk,)),
+            data={"choice": [choice.pk for choice in filters]},
+        )
+        self.assertEqual(first=response.status_code, second=200)
+
+        return response.json()
+
+    def test_containers_switch_to_bitsets_when_dense(self) -> None:
+        """
+        Sparse containers are stored as 16-bit values, dense ones as 8 KiB
+        bitsets, and both read back the same.
+        """
+
+        sparse: int = 1 << 3 | 1 << 65_535
+        dense: int = sum(1 << value for value in range(0, 65_536, 8))
+
+        self.assertEqual(first=len(encode_container(bits=sparse)), second=4)
+        self.assertEqual(first=len(encode_container(bits=dense)), second=8_192)
+        for bits in (0, sparse, dense):
+            self.assertEqual(
+                first=decode_container(data=encode_container(bits=bits)),
+                second=bits,
+            )
+
+    def test_bitmaps_intersect_across_containers(self) -> None:
+        """
+        Set operations work across containers and drop empty ones.
+        """
+
+        first: Bitmap = Bitmap.from_ordinals(ordinals=[1, 70_000, 140_000])
+        second: Bitmap = Bitmap.from_ordinals(ordinals=[70_000, 140_001])
+
+        self.assertEqual(first=list(first & second), second=[70_000])
+        self.assertEqual(first=len((first & second).containers), second=1)
+        self.assertEqual(first=len(first | second), second=4)
+        self.assertIn(member=140_001, container=first | second)
+        self.assertNotIn(member=140_001, container=first)
+
+    def test_voter_keeps_its_ordinal(self) -> None:
+        """
+        A voter gets one ordinal, kept in a signed cookie across votes,
+        without a session.
+        """
+
+        for choices in self.choices:
+            self.client.post(
+                path=reverse(
+                    viewname="polls:vote", args=(choices[0].question_id,)
+                ),
+                data={"choice": choices[0].pk},
+            )
+
+        self.assertEqual(first=Voter.objects.count(), second=1)  # type: ignore
+        self.assertEqual(
+            first=signing.get_cookie_signer(
+                salt=VOTER_COOKIE + VOTER_COOKIE_SALT
+            ).unsign(value=self.client.cookies[VOTER_COOKIE].value),
+            second=str(Voter.objects.get().pk),  # type: ignore
+        )
+        self.assertNotIn(
+            member=settings.SESSION_COOKIE_NAME, container=self.client.cookies
+        )
+
+    def test_results_are_broken_down_by_segment(self) -> None:
+        """
+        The votes of a question are counted among the voters who picked a
+        choice of another question.
+        """
+
+        (yes, no), (agree, disagree) = self.choices
+        for ballot in ((yes, agree), (no, agree), (yes, disagree)):
+            Client().post(
+                path=reverse(viewname="polls:vote_batch"),
+                data={
+                    "votes": {
+                        choice.question_id: choice.pk for choice in ballot
+                    }
+                },
+                content_type="application/json",
+            )
+
+        everyone: dict[str, Any] = self.crosstab(self.questions[0])
+        segment: dict[str, Any] = self.crosstab(self.questions[0], agree)
+        nobody: dict[str, Any] = self.crosstab(
+            self.questions[0], agree, disagree
+        )
+
+        self.assertEqual(first=everyone["voters"], second=3)
+        self.assertEqual(
+            first=[choice["voters"] for choice in everyone["choices"]],
+            second=[2, 1],
+        )
+        self.assertEqual(first=segment["voters"], second=2)
+        self.assertEqual(
+            first=[choice["voters"] for choice in segment["choices"]],
+            second=[1, 1],
+        )
+        self.assertEqual(first=nobody["voters"], second=0)
+        self.assertEqual(
+            first=self.client.get(
+                path=reverse(
+                    viewname="polls:crosstab", args=(self.questions[0].pk,)
+                ),
+                data={"choice": "x"},
+            ).status_code,
+            second=400,
+        )
+
+    def test_reset_votes_empties_bitmaps(self) -> None:
+        """
+        Resetting the votes of a question drops its voters.
+        """
+
+        yes: Choice = self.choices[0][0]
+        self.client.post(
+            path=reverse(viewname="polls:vote", args=(yes.question_id,)),
+            data={"choice": yes.pk},
+        )
+        self.assertEqual(
+            first=self.crosstab(self.questions[0])["voters"], second=1
+        )
+
+        reset_votes(
+            queryset=Question.objects.using(  # pylint: disable=no-member
+                self.questions[0]._state.db
+            ).filter(pk=self.questions[0].pk)
+        )
+
+        self.assertEqual(
+            first=self.crosstab(self.questions[0])["voters"], second=0
+        )
@@ -0,0 +1,371 @@
+"""
+Polls Throttling Module
+
+Description:
+    - This module contains the rate limiter for the vote views.
+    - Limits are enforced with a token bucket in its GCRA form, so each key
+    only needs a single float: the theoretical arrival time of the next
+    request.
+    - Requests are rejected before the wrapped view runs, so excess traffic
+    never reaches the database.
+
+"""
+
+from collections.abc import Callable
+from functools import wraps
+from threading import Lock
+from time import monotonic, time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse
+
+DEFAULTS: dict[str, Any] = {
+    "ENABLED": True,
+    "RATE": 1.0,
+    "BURST": 10,
+    "IP_RATE": 5.0,
+    "IP_BURST": 50,
+    "QUESTION_LIMITS": {},
+    "BACKEND": "memory",
+    "CACHE_ALIAS": "default",
+    "KEY_PREFIX": "polls:throttle",
+    "MAX_ENTRIES": 50_000,
+    "IP_META_KEY": "REMOTE_ADDR",
+    # The number of trusted proxies appending to the `IP_META_KEY` header.
+    "TRUSTED_PROXIES": 1,
+}
+
+
+def get_config() -> dict[str, Any]:
+    """
+    Get Config Function
+
+    Description:
+        - This function returns the throttle configuration.
+        - Values from the `POLLS_VOTE_THROTTLE` setting override the defaults.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `config (dict[str, Any])`: The throttle configuration.
+
+    """
+
+    return {**DEFAULTS, **getattr(settings, "POLLS_VOTE_THROTTLE", {})}
+
+
+class MemoryBucketStore:
+    """
+    Memory Bucket Store Class
+
+    Description:
+        - This class keeps token buckets in process memory.
+        - Each bucket is stored as one float in an insertion ordered dict.
+        Touched keys are moved to the end, so the oldest key is evicted first
+        once `max_entries` is reached.
+
+    Attributes:
+        - `max_entries (int)`: The maximum number of buckets to keep.
+
+    Methods:
+        - `acquire(self, key: str, rate: float, burst: int) -> float`
+        - `clear(self) -> None`
+
+    """
+
+    def __init__(self, max_entries: int = DEFAULTS["MAX_ENTRIES"]) -> None:
+        self.max_entries: int = max_entries
+        self._buckets: dict[str, float] = {}
+        self._lock: Lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Acquire Method
+
+        Description:
+            - This method takes one token from the bucket of `key`.
+
+        Args:
+            - `key (str)`: The bucket key.  **(Required)**
+            - `rate (float)`: The refill rate in tokens per second.
+            **(Required)**
+            - `burst (int)`: The bucket capacity.  **(Required)**
+
+        Returns:
+            - `retry_after (float)`: Zero if the token was taken, otherwise
+            the number of seconds until one is available.
+
+        """
+
+        now: float = monotonic()
+
+        with self._lock:
+            tat: float | None = self._buckets.pop(key, None)
+            retry_after, tat = _gcra(tat=tat, now=now, rate=rate, burst=burst)
+            self._buckets[key] = tat
+
+            while len(self._buckets) > self.max_entries:
+                del self._buckets[next(iter(self._buckets))]
+
+        return retry_after
+
+    def clear(self) -> None:
+        """
+        Clear Method
+
+        Description:
+            - This method drops every bucket.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `None`
+
+        """
+
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBucketStore:
+    """
+    Cache Bucket Store Class
+
+    Description:
+        - This class keeps token buckets in a Django cache so that limits are
+        shared by every worker using that cache.
+        - The read and write are not atomic, so concurrent requests for the
+        same key may occasionally both be admitted.
+
+    Attributes:
+        - `alias (str)`: The cache alias.
+        - `key_prefix (str)`: The prefix of every bucket key.
+
+    Methods:
+        - `acquire(self, key: str, rate: float, burst: int) -> float`
+
+    """
+
+    def __init__(self, alias: str, key_prefix: str) -> None:
+        self.alias: str = alias
+        self.key_prefix: str = key_prefix
+
+    def acquire(self, key: str, rate: float, burst: int) -> float:
+        """
+        Acquire Method
+
+        Description:
+            - This method takes one token from the bucket of `key`.
+
+        Args:
+            - `key (str)`: The bucket key.  **(Required)**
+            - `rate (float)`: The refill rate in tokens per second.
+            **(Required)**
+            - `burst (int)`: The bucket capacity.  **(Required)**
+
+        Returns:
+            - `retry_after (float)`: Zero if the token was taken, otherwise
+            the number of seconds until one is available.
+
+        """
+
+        cache = caches[self.alias]
+        cache_key: str = f"{self.key_prefix}:{key}"
+        now: float = time()
+
+        retry_after, tat = _gcra(
+            tat=cache.get(key=cache_key), now=now, rate=rate, burst=burst
+        )
+        if not retry_after:
+            cache.set(key=cache_key, value=tat, timeout=int(tat - now) + 1)
+
+        return retry_after
+
+
+def _gcra(
+    tat: float | None, now: float, rate: float, burst: int
+) -> tuple[float, float]:
+    """
+    Evaluates one request against a bucket and returns the seconds to wait
+    (zero when admitted) together with the new theoretical arrival time.
+    """
+
+    interval: float = 1 / rate
+    tat = now if tat is None else max(tat, now)
+    wait: float = tat - now - (burst - 1) * interval
+
+    if wait > 0:
+        return wait, tat
+
+    return 0.0, tat + interval
+
+
+memory_store: MemoryBucketStore = MemoryBucketStore()
+
+
+def get_store(config: dict[str, Any]) -> MemoryBucketStore | CacheBucketStore:
+    """
+    Get Store Function
+
+    Description:
+        - This function returns the bucket store selected by `BACKEND`.
+
+    Args:
+        - `config (dict[str, Any])`: The throttle configuration.
+        **(Required)**
+
+    Returns:
+        - `store (MemoryBucketStore | CacheBucketStore)`: The bucket store.
+
+    """
+
+    if config["BACKEND"] == "cache":
+        return CacheBucketStore(
+            alias=config["CACHE_ALIAS"], key_prefix=config["KEY_PREFIX"]
+        )
+
+    memory_store.max_entries = config["MAX_ENTRIES"]
+    return memory_store
+
+
+def get_client_ip(
+    request: HttpRequest, meta_key: str, trusted_proxies: int = 1
+) -> str:
+    """
+    Get Client IP Function
+
+    Description:
+        - This function returns the client address of the request.
+        - When `meta_key` names a forwarding header, the address added by
+        the outermost trusted proxy is used: the `trusted_proxies`-th from
+        the right. The addresses left of it are sent by the client and can
+        be forged. A header with fewer addresses didn't come through the
+        proxies, so the peer address is used instead.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+        - `meta_key (str)`: The `request.META` key holding the address.
+        **(Required)**
+        - `trusted_proxies (int)`: The number of trusted proxies appending
+        to the header.  **(Optional)**
+
+    Returns:
+        - `ip (str)`: The client address.
+
+    """
+
+    remote_addr: str = request.META.get("REMOTE_ADDR", "")
+    addresses: list[str] = [
+        address.strip()
+        for address in (request.META.get(meta_key) or remote_addr).split(",")
+    ]
+    if len(addresses) < trusted_proxies:
+        return remote_addr
+
+    return addresses[-trusted_proxies]
+
+
+def check_throttle(
+    request: HttpRequest, question_id: int | str | None = None
+) -> float:
+    """
+    Check Throttle Function
+
+    Description:
+        - This function charges one request to the client's IP bucket and,
+        when a session cookie is present, to its session bucket.
+        - Questions listed in `QUESTION_LIMITS` get their own session bucket
+        with the configured limits.
+        - The session is identified by its cookie only, so the session store
+        is never loaded.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+        - `question_id (int | str)`: The question being voted on.
+        **(Optional)**
+
+    Returns:
+        - `retry_after (float)`: Zero if the request is allowed, otherwise
+        the number of seconds to wait.
+
+    """
+
+    config: dict[str, Any] = get_config()
+    if not config["ENABLED"]:
+        return 0.0
+
+    store: MemoryBucketStore | CacheBucketStore = get_store(config=config)
+    ip: str = get_client_ip(
+        request=request,
+        meta_key=config["IP_META_KEY"],
+        trusted_proxies=config["TRUSTED_PROXIES"],
+    )
+
+    retry_after: float = store.acquire(
+        key=f"ip:{ip}", rate=config["IP_RATE"], burst=config["IP_BURST"]
+    )
+    if retry_after:
+        return retry_after
+
+    session_key: str | None = request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not session_key:
+        return 0.0
+
+    limits: dict[str, Any] | None = None
+    if question_id is not None:
+        limits = config["QUESTION_LIMITS"].get(int(question_id))
+
+    if limits is None:
+        return store.acquire(
+            key=f"session:{session_key}",
+            rate=config["RATE"],
+            burst=config["BURST"],
+        )
+
+    return store.acquire(
+        key=f"session:{session_key}:question:{question_id}",
+        rate=limits.get("RATE", config["RATE"]),
+        burst=limits.get("BURST", config["BURST"]),
+    )
+
+
+def throttle_vote(view: Callable[..., HttpResponse]) -> Callable:
+    """
+    Throttle Vote Decorator
+
+    Description:
+        - This decorator rejects requests over the vote rate limit with a
+        `429 Too Many Requests` response before `view` is called.
+
+    Args:
+        - `view (Callable)`: The view function.  **(Required)**
+
+    Returns:
+        - `wrapper (Callable)`: The throttled view function.
+
+    """
+
+    @wraps(view)
+    def wrapper(request: HttpRequest, *args: Any, **kwargs: Any):
+        retry_after: float = check_throttle(
+            request=request, question_id=kwargs.get("question_id")
+        )
+
+        if retry_after:
+            response: HttpResponse = HttpResponse(
+                content="Too many votes. Please try again later.",
+                status=429,
+            )
+            response["Retry-After"] = str(int(retry_after) + 1)
+            return response
+
+        return view(request, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,127 @@
+"""
+Polls Trending Module
+
+Description:
+    - This module contains the trending score of the polls app.
+    - Each vote is worth `2 ** (age / half_life)` relative to a fixed epoch,
+    so every vote loses half its weight relative to new ones per
+    `POLLS_TRENDING_HALF_LIFE` seconds. Because the decay is the same for
+    every question, the ranking never has to be recomputed as time passes.
+    - The sum is stored as its natural logarithm, which stays small for
+    decades, and is updated with a log-sum-exp `UPDATE` as votes arrive.
+
+"""
+
+import heapq
+from collections.abc import Iterable
+from datetime import UTC, datetime
+from math import log
+from operator import attrgetter
+
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Abs, Exp, Greatest, Ln
+from django.utils import timezone
+
+from .models import Question
+from .sharding import get_shards
+
+EPOCH: datetime = datetime(2024, 1, 1, tzinfo=UTC)
+# `exp()` of a double underflows below about -745 on PostgreSQL, where it
+# raises instead of returning 0; the correction term is negligible long
+# before that.
+MIN_EXPONENT: float = -700.0
+
+
+def vote_weight(now: datetime) -> float:
+    """
+    Vote Weight Function
+
+    Description:
+        - This function returns the logarithm of the weight of a vote cast
+        at `now`.
+
+    Args:
+        - `now (datetime)`: The time of the vote.  **(Required)**
+
+    Returns:
+        - `weight (float)`: The logarithm of the vote weight.
+
+    """
+
+    half_life: float = getattr(settings, "POLLS_TRENDING_HALF_LIFE", 3_600)
+
+    return (now - EPOCH).total_seconds() * log(2) / half_life
+
+
+def record_votes(
+    question_ids: Iterable[int], now: datetime, using: str = "default"
+) -> int:
+    """
+    Record Votes Function
+
+    Description:
+        - This function adds one vote cast at `now` to the trending score of
+        each given question with a single `UPDATE`.
+        - The numerically stable form `max(s, w) + ln(1 + exp(-|s - w|))` of
+        `ln(exp(s) + exp(w))` is used, so the exponent never overflows, and
+        it is clamped at `MIN_EXPONENT`, so it never underflows either, e.g.
+        on the first vote of a question or after a long idle time.
+
+    Args:
+        - `question_ids (Iterable[int])`: The voted question ids.
+        **(Required)**
+        - `now (datetime)`: The time of the votes.  **(Required)**
+        - `using (str)`: The database alias of the questions.  **(Optional)**
+
+    Returns:
+        - `updated (int)`: The number of updated questions.
+
+    """
+
+    weight: Value = Value(vote_weight(now=now))
+
+    return (
+        Question.objects.using(using)
+        .filter(pk__in=question_ids)  # pylint: disable=no-member
+        .update(
+            trending_score=Greatest(F("trending_score"), weight)
+            + Ln(
+                Value(1.0)
+                + Exp(
+                    Greatest(
+                        -Abs(F("trending_score") - weight),
+                        Value(MIN_EXPONENT),
+                    )
+                )
+            )
+        )
+    )
+
+
+def trending_questions(limit: int) -> list[Question]:
+    """
+    Trending Questions Function
+
+    Description:
+        - This function returns the published questions with the highest
+        trending score, read in one query per shard along the score index.
+
+    Args:
+        - `limit (int)`: The number of questions.  **(Required)**
+
+    Returns:
+        - `questions (list[Question])`: The trending questions.
+
+    """
+
+    now: datetime = timezone.now()
+    questions: list[Question] = []
+    for alias in get_shards():
+        questions.extend(
+            Question.objects.using(alias)  # pylint: disable=no-member
+            .filter(pub_date__lte=now)
+            .order_by("-trending_score")[:limit]
+        )
+
+    return heapq.nlargest(limit, questions, key=attrgetter("trending_score"))
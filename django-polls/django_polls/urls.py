@@ -25,5 +25,18 @@ urlpatterns: list[URLPattern] = [
         view=views.ResultsView.as_view(),
         name="results",
     ),
+    path(
+        route="<int:question_id>/crosstab/",
+        view=views.results_crosstab,
+        name="crosstab",
+    ),
     path(route="<int:question_id>/vote/", view=views.vote, name="vote"),
+    path(route="vote/", view=views.vote_batch, name="vote_batch"),
+    path(route="csrf/", view=views.csrf_token, name="csrf"),
+    path(
+        route="trending/",
+        view=views.TrendingView.as_view(),
+        name="trending",
+    ),
+    path(route="search/", view=views.SearchView.as_view(), name="search"),
 ]
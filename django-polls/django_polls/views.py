@@ -6,14 +6,46 @@ Description:
 
 """
 
-from django.db.models import F, QuerySet
-from django.http import HttpRequest, HttpResponse, HttpResponseRedirect
+import json
+from contextlib import ExitStack
+from datetime import datetime
+from itertools import zip_longest
+from typing import Any
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, QuerySet
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseForbidden,
+    HttpResponsePermanentRedirect,
+    HttpResponseRedirect,
+    JsonResponse,
+)
+from django.middleware.csrf import get_token
 from django.shortcuts import get_object_or_404, render
 from django.urls import reverse
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
 from django.views import generic
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET, require_POST
 
-from .models import Choice, Question
+from .archive import get_archived_results
+from .bitmaps import add_voter, crosstab, get_voter, remember_voter
+from .models import Choice, Question, VoteEvent
+from .pages import get_detail_page, set_detail_page
+from .publishing import schedule
+from .results import TIMEOUT as RESULTS_TIMEOUT
+from .results import FrozenResults, freeze_results, get_frozen_results
+from .search import search
+from .sharding import get_shards, group_by_shard, shard_for
+from .throttling import throttle_vote
+from .trending import record_votes, trending_questions
+
+CLOSED_MESSAGE: str = "This poll is closed."
 
 
 class IndexView(generic.ListView):
@@ -28,34 +60,191 @@ class IndexView(generic.ListView):
         - `context_object_name (str)`: The context object name.
 
     Methods:
-        - `get_queryset(self) -> QuerySet[Question]`
+        - `get_queryset(self) -> list[Question]`
 
     """
 
     template_name = "polls/index.html"
     context_object_name = "latest_question_list"
 
-    def get_queryset(self) -> QuerySet[Question]:  # type: ignore
+    def get_queryset(self) -> list[Question]:  # type: ignore
         """
         Get Queryset Method
 
         Description:
             - This method returns the last five published questions.
+            - The questions come from the publishing schedule, so no query
+            runs until the next question is published.
 
         Args:
             - `None`
 
         Returns:
-            - `queryset (QuerySet)`: The queryset object.
+            - `questions (list[Question])`: The list of questions.
 
         """
 
-        return Question.objects.filter(  # pylint: disable=no-member
-            pub_date__lte=timezone.now()
-        ).order_by("-pub_date")[:5]
+        return schedule.latest()
+
+
+class SearchView(generic.ListView):
+    """
+    Search View
+
+    Description:
+        - This class is the public search view for the polls app.
+
+    Attributes:
+        - `template_name (str)`: The template name.
+        - `context_object_name (str)`: The context object name.
 
+    Methods:
+        - `get_queryset(self) -> list[Question]`
+        - `get_context_data(self, **kwargs: Any) -> dict[str, Any]`
 
-class DetailView(generic.DetailView):
+    """
+
+    template_name = "polls/search.html"
+    context_object_name = "question_list"
+
+    def get_queryset(self) -> list[Question]:  # type: ignore
+        """
+        Get Queryset Method
+
+        Description:
+            - This method returns the published questions matching the `q`
+            parameter, best match first.
+            - Matching runs against the search index; the matching questions
+            are then loaded with one query. With several shards, each shard
+            is searched and the rankings are interleaved.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `questions (list[Question])`: The list of questions.
+
+        """
+
+        query: str = self.request.GET.get("q", "")
+        limit: int = getattr(settings, "POLLS_SEARCH_LIMIT", 20)
+        rankings: list[list[Question]] = []
+
+        for alias in get_shards():
+            question_ids: list[int] = [
+                pk
+                for pk in search(query=query, limit=limit, using=alias)
+                if schedule.is_published(pk=pk)
+            ]
+            questions: dict[int, Question] = Question.objects.using(
+                alias
+            ).in_bulk(id_list=question_ids)
+            rankings.append(
+                [questions[pk] for pk in question_ids if pk in questions]
+            )
+
+        return [
+            question
+            for questions in zip_longest(*rankings)
+            for question in questions
+            if question is not None
+        ][:limit]
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        """
+        Adds the search query to the context.
+
+        """
+
+        context: dict[str, Any] = super().get_context_data(**kwargs)
+        context["query"] = self.request.GET.get("q", "")
+
+        return context
+
+
+class TrendingView(generic.ListView):
+    """
+    Trending View
+
+    Description:
+        - This class is the trending view for the polls app.
+
+    Attributes:
+        - `template_name (str)`: The template name.
+        - `context_object_name (str)`: The context object name.
+
+    Methods:
+        - `get_queryset(self) -> list[Question]`
+
+    """
+
+    template_name = "polls/trending.html"
+    context_object_name = "trending_question_list"
+
+    def get_queryset(self) -> list[Question]:  # type: ignore
+        """
+        Get Queryset Method
+
+        Description:
+            - This method returns the published questions with the most
+            recent votes.
+            - The trending scores are maintained as votes arrive, so this is
+            a single query per shard along the score index.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `questions (list[Question])`: The list of questions.
+
+        """
+
+        return trending_questions(
+            limit=getattr(settings, "POLLS_TRENDING_SIZE", 10)
+        )
+
+
+class PublishedQuestionMixin:
+    """
+    Published Question Mixin
+
+    Description:
+        - This mixin makes question detail views answer 404 for questions
+        that aren't published yet.
+        - Visibility is a set lookup in the publishing schedule, so scheduled
+        questions are rejected without a query.
+        - Questions are read from their shard.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `get_object(self, queryset: QuerySet[Question] | None = None) ->
+        Question`
+
+    """
+
+    def get_object(
+        self, queryset: QuerySet[Question] | None = None
+    ) -> Question:
+        """
+        Excludes any questions that aren't published yet.
+
+        """
+
+        pk: int = self.kwargs["pk"]  # type: ignore
+        if not schedule.is_published(pk=pk):
+            raise Http404("No question found matching the query")
+
+        if queryset is None:
+            queryset = self.get_queryset()  # type: ignore
+
+        return super().get_object(  # type: ignore
+            queryset=queryset.using(shard_for(question_id=pk))
+        )
+
+
+class DetailView(PublishedQuestionMixin, generic.DetailView):
     """
     Detail View
 
@@ -67,25 +256,82 @@ class DetailView(generic.DetailView):
         - `template_name (str)`: The template name.
 
     Methods:
-        - `get_queryset(self) -> QuerySet[Question]`
+        - `get(self, request: HttpRequest, *args: Any, **kwargs: Any) ->
+        HttpResponse`
 
     """
 
     model = Question
     template_name = "polls/detail.html"
 
-    def get_queryset(self) -> QuerySet[Question]:  # type: ignore
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
         """
-        Excludes any questions that aren't published yet.
+        Get Method
+
+        Description:
+            - This method renders the voting form of a question.
+            - The page holds no per-visitor data, so it is served from the
+            page cache and marked as cacheable by shared caches.
+            - A page is never cached past the closing date of its question.
+            - Archived questions redirect to their results.
+
+        Args:
+            - `request (HttpRequest)`: The request object.  **(Required)**
+
+        Returns:
+            - `response (HttpResponse)`: The response object.
 
         """
 
-        return Question.objects.filter(  # pylint: disable=no-member
-            pub_date__lte=timezone.now()
+        if not schedule.is_published(pk=kwargs["pk"]):
+            raise Http404("No question found matching the query")
+
+        content: bytes | None = get_detail_page(question_id=kwargs["pk"])
+
+        if content is None:
+            try:
+                response: HttpResponse = super().get(request, *args, **kwargs)
+
+            except Http404:
+                if get_archived_results(question_id=kwargs["pk"]) is None:
+                    raise
+
+                return HttpResponsePermanentRedirect(
+                    redirect_to=reverse(
+                        viewname="polls:results", args=(kwargs["pk"],)
+                    )
+                )
+
+            response.render()  # type: ignore
+            content = response.content
+
+            timeout: float = getattr(
+                settings, "POLLS_DETAIL_CACHE_TIMEOUT", 300
+            )
+            if self.object.closes_at is not None:  # type: ignore
+                timeout = min(
+                    timeout,
+                    (
+                        self.object.closes_at - timezone.now()  # type: ignore
+                    ).total_seconds(),
+                )
+            set_detail_page(
+                question_id=kwargs["pk"], content=content, timeout=timeout
+            )
+
+        response = HttpResponse(content=content)
+        patch_cache_control(
+            response=response,
+            public=True,
+            max_age=getattr(settings, "POLLS_DETAIL_MAX_AGE", 60),
         )
 
+        return response
+
 
-class ResultsView(generic.DetailView):
+class ResultsView(PublishedQuestionMixin, generic.DetailView):
     """
     Results View
 
@@ -97,20 +343,112 @@ class ResultsView(generic.DetailView):
         - `template_name (str)`: The template name.
 
     Methods:
-        - `None`
+        - `get(self, request: HttpRequest, *args: Any, **kwargs: Any) ->
+        HttpResponse`
+        - `get_context_data(self, **kwargs: Any) -> dict[str, Any]`
 
     """
 
     model = Question
     template_name = "polls/results.html"
 
+    def get(
+        self, request: HttpRequest, *args: Any, **kwargs: Any
+    ) -> HttpResponse:
+        """
+        Get Method
 
+        Description:
+            - This method renders the results of a question.
+            - Closed questions are served from their frozen results, without
+            any query, and marked as cacheable for as long as the frozen
+            results are kept, since reopening the question thaws them.
+            - Archived questions are served from the archive the same way.
+
+        Args:
+            - `request (HttpRequest)`: The request object.  **(Required)**
+
+        Returns:
+            - `response (HttpResponse)`: The response object.
+
+        """
+
+        results: FrozenResults | None = get_frozen_results(
+            question_id=kwargs["pk"]
+        )
+
+        if results is None:
+            try:
+                self.object = self.get_object()
+
+            except Http404:
+                results = get_archived_results(question_id=kwargs["pk"])
+                if results is None:
+                    raise
+
+            else:
+                if not self.object.is_closed():
+                    return self.render_to_response(
+                        context=self.get_context_data(object=self.object)
+                    )
+
+                results = freeze_results(question=self.object)
+
+        response: HttpResponse = render(
+            request=request,
+            template_name=self.template_name,
+            context={
+                "question": results,
+                "choices": results.choices,
+                "closed": True,
+            },
+        )
+        patch_cache_control(
+            response=response,
+            public=True,
+            max_age=getattr(
+                settings, "POLLS_RESULTS_TIMEOUT", RESULTS_TIMEOUT
+            ),
+        )
+
+        return response
+
+    def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
+        """
+        Get Context Data Method
+
+        Description:
+            - This method adds the choices of an open question.
+
+        Args:
+            - `**kwargs (Any)`: The context arguments.
+
+        Returns:
+            - `context (dict[str, Any])`: The template context.
+
+        """
+
+        context: dict[str, Any] = super().get_context_data(**kwargs)
+        context["choices"] = self.object.choice_set.all()  # type: ignore
+        context["closed"] = False
+
+        return context
+
+
+@throttle_vote
 def vote(request: HttpRequest, question_id) -> HttpResponse:
     """
     Vote View
 
     Description:
         - This method is the vote view for the polls app.
+        - Requests over the vote rate limit and votes on questions that
+        aren't published yet are rejected before the question is loaded.
+        - Votes on closed or archived questions are rejected with a 403
+        response, without a query once the results are frozen.
+        - A vote is recorded in the vote outbox and the voter in the voter
+        bitmap of the choice, in the same transaction as the tally, on the
+        shard of the question.
 
     Args:
         - `request (HttpRequest)`: The request object.  **(Required)**
@@ -121,7 +459,28 @@ def vote(request: HttpRequest, question_id) -> HttpResponse:
 
     """
 
-    question: Question = get_object_or_404(klass=Question, pk=question_id)
+    if not schedule.is_published(pk=question_id):
+        raise Http404("No question found matching the query")
+
+    if get_frozen_results(question_id=question_id) is not None:
+        return HttpResponseForbidden(content=CLOSED_MESSAGE)
+
+    using: str = shard_for(question_id=question_id)
+    try:
+        question: Question = get_object_or_404(
+            klass=Question.objects.using(using),  # pylint: disable=no-member
+            pk=question_id,
+        )
+
+    except Http404:
+        if get_archived_results(question_id=question_id) is None:
+            raise
+
+        return HttpResponseForbidden(content=CLOSED_MESSAGE)
+
+    if question.is_closed():
+        freeze_results(question=question)
+        return HttpResponseForbidden(content=CLOSED_MESSAGE)
 
     try:
         selected_choice: Choice = question.choice_set.get(  # type: ignore
@@ -139,15 +498,210 @@ def vote(request: HttpRequest, question_id) -> HttpResponse:
             },
         )
 
-    selected_choice.votes = F("votes") + 1
-    selected_choice.save()
+    now: datetime = timezone.now()
+    voter: int = get_voter(request=request)
+    with transaction.atomic(using=using):
+        # A single UPDATE, without the read-modify-write of `save()` and the
+        # save signals, which rebuild the caches of edited questions.
+        Choice.objects.using(using).filter(  # pylint: disable=no-member
+            pk=selected_choice.pk
+        ).update(votes=F("votes") + 1)
+        add_voter(
+            ordinal=voter,
+            votes={question.id: selected_choice.id},  # type: ignore
+            using=using,
+        )
+        record_votes(
+            question_ids=[question.id], now=now, using=using  # type: ignore
+        )
+        VoteEvent.objects.using(using).create(  # pylint: disable=no-member
+            question_id=question.id,  # type: ignore
+            choice_id=selected_choice.id,  # type: ignore
+            created_at=now,
+        )
 
     # Always return an HttpResponseRedirect after successfully dealing
     # with POST data. This prevents data from being posted twice if a
     # user hits the Back button.
-    return HttpResponseRedirect(
+    response: HttpResponse = HttpResponseRedirect(
         redirect_to=reverse(
             viewname="polls:results",
             args=(question.id,),  # type: ignore
         )
     )
+    remember_voter(request=request, response=response)
+
+    return response
+
+
+@require_POST
+@throttle_vote
+def vote_batch(request: HttpRequest) -> HttpResponse:
+    """
+    Vote Batch View
+
+    Description:
+        - This method is the batch vote view for the polls app.
+        - It takes a JSON body of the form `{"votes": {"<question_id>":
+        <choice_id>, ...}}` and counts one vote per question.
+        - All pairs are validated with a single query. In one transaction,
+        every vote is applied with a single `UPDATE`, followed by the
+        voter bitmap updates, one `UPDATE` of the trending scores and one
+        `INSERT` into the vote outbox. If any pair is invalid, no vote is
+        counted.
+        - With several shards, each of these runs once per shard involved,
+        in transactions that are opened together and committed one after
+        the other.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+
+    Returns:
+        - `response (JsonResponse)`: The ids of the voted questions, or the
+        errors of the request.
+
+    """
+
+    try:
+        votes: dict[int, int] = {
+            int(question_id): int(choice_id)
+            for question_id, choice_id in json.loads(request.body)[
+                "votes"
+            ].items()
+        }
+
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return JsonResponse(
+            data={"error": 'Expected {"votes": {question: choice}}.'},
+            status=400,
+        )
+
+    if not votes:
+        return JsonResponse(data={"error": "No votes given."}, status=400)
+
+    if len(votes) > getattr(settings, "POLLS_BATCH_VOTE_LIMIT", 100):
+        return JsonResponse(data={"error": "Too many votes."}, status=400)
+
+    now: datetime = timezone.now()
+    shards: dict[str, list[int]] = group_by_shard(question_ids=votes)
+    valid: dict[int, int] = {}
+    for using, question_ids in shards.items():
+        valid.update(
+            Choice.objects.using(using)  # pylint: disable=no-member
+            .filter(
+                Q(question__closes_at__isnull=True)
+                | Q(question__closes_at__gt=now),
+                pk__in=[votes[pk] for pk in question_ids],
+                question_id__in=question_ids,
+                question__pub_date__lte=now,
+            )
+            .values_list("id", "question_id")
+        )
+    invalid: list[int] = [
+        question_id
+        for question_id, choice_id in votes.items()
+        if valid.get(choice_id) != question_id
+    ]
+
+    if invalid:
+        return JsonResponse(
+            data={"error": "Invalid or closed choices.", "questions": invalid},
+            status=400,
+        )
+
+    voter: int = get_voter(request=request)
+    with ExitStack() as stack:
+        for using in shards:
+            stack.enter_context(transaction.atomic(using=using))
+
+        for using, question_ids in shards.items():
+            Choice.objects.using(using).filter(  # pylint: disable=no-member
+                pk__in=[votes[pk] for pk in question_ids]
+            ).update(votes=F("votes") + 1)
+            add_voter(
+                ordinal=voter,
+                votes={pk: votes[pk] for pk in question_ids},
+                using=using,
+            )
+            record_votes(question_ids=question_ids, now=now, using=using)
+            VoteEvent.objects.using(  # pylint: disable=no-member
+                using
+            ).bulk_create(
+                objs=[
+                    VoteEvent(
+                        question_id=question_id,
+                        choice_id=votes[question_id],
+                        created_at=now,
+                    )
+                    for question_id in question_ids
+                ]
+            )
+
+    response: HttpResponse = JsonResponse(data={"voted": list(votes)})
+    remember_voter(request=request, response=response)
+
+    return response
+
+
+@require_GET
+@never_cache
+def csrf_token(request: HttpRequest) -> JsonResponse:
+    """
+    CSRF Token View
+
+    Description:
+        - This method is the CSRF token view for the polls app.
+        - Cached voting forms carry no token of their own, so they fetch one
+        here when the CSRF cookie isn't set yet.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+
+    Returns:
+        - `response (JsonResponse)`: The CSRF token of the visitor.
+
+    """
+
+    return JsonResponse(data={"token": get_token(request=request)})
+
+
+@require_GET
+def results_crosstab(request: HttpRequest, question_id: int) -> JsonResponse:
+    """
+    Results Crosstab View
+
+    Description:
+        - This method is the segmented results view for the polls app.
+        - It counts the voters of each choice of a question among the voters
+        who picked every choice given as a `choice` parameter, e.g.
+        `?choice=12&choice=34`, see `django_polls.bitmaps`.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+        - `question_id (int)`: The question id.  **(Required)**
+
+    Returns:
+        - `response (JsonResponse)`: The breakdown, or the error of the
+        request.
+
+    """
+
+    if not schedule.is_published(pk=question_id):
+        raise Http404("No question found matching the query")
+
+    try:
+        filters: list[int] = [
+            int(choice_id) for choice_id in request.GET.getlist("choice")
+        ]
+
+    except ValueError:
+        return JsonResponse(data={"error": "Expected choice ids."}, status=400)
+
+    question: Question = get_object_or_404(
+        klass=Question.objects.using(  # pylint: disable=no-member
+            shard_for(question_id=question_id)
+        ),
+        pk=question_id,
+    )
+
+    return JsonResponse(data=crosstab(question=question, filters=filters))
@@ -0,0 +1,274 @@
+"""
+Polls Warmup Module
+
+Description:
+    - This module contains the cache warm-up of the polls app, run after a
+    deploy or a cold start so the first wave of traffic doesn't reach the
+    database all at once.
+    - It compiles the polls templates into the cached template loader,
+    builds the publishing snapshot behind the index page and renders the
+    detail and results pages of the most active questions through their
+    views, which fills the detail page cache and freezes the results of
+    closed questions.
+    - Questions are rendered by a bounded pool of threads, each with its own
+    database connection.
+
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.template.loader import get_template
+from django.test import RequestFactory
+
+from .models import Question
+from .pages import get_detail_page
+from .publishing import schedule
+from .results import get_frozen_results
+from .trending import trending_questions
+from .views import DetailView, ResultsView
+
+logger: logging.Logger = logging.getLogger(name="django_polls.warmup")
+
+TEMPLATES: tuple[str, ...] = (
+    "polls/index.html",
+    "polls/detail.html",
+    "polls/results.html",
+    "polls/search.html",
+    "polls/trending.html",
+)
+
+
+@dataclass(slots=True)
+class WarmupReport:
+    """
+    Warmup Report Class
+
+    Description:
+        - This class holds the outcome of one warm-up.
+
+    Attributes:
+        - `templates (int)`: The number of compiled templates.
+        - `questions (int)`: The number of warmed questions.
+        - `pages (int)`: The number of rendered pages.
+        - `errors (int)`: The number of pages that failed to render.
+        - `hits_before (int)`: Cached entries found before the warm-up.
+        - `hits_after (int)`: Cached entries found after the warm-up.
+        - `lookups (int)`: The number of cache entries checked each time.
+        - `duration (float)`: The time the warm-up took, in seconds.
+
+    Methods:
+        - `hit_ratio(self, after: bool = True) -> float`
+        - `format(self) -> str`
+
+    """
+
+    templates: int = 0
+    questions: int = 0
+    pages: int = 0
+    errors: int = 0
+    hits_before: int = 0
+    hits_after: int = 0
+    lookups: int = 0
+    duration: float = 0.0
+
+    def hit_ratio(self, after: bool = True) -> float:
+        """
+        Returns the share of the checked cache entries that were present.
+        """
+
+        if not self.lookups:
+            return 1.0
+
+        return (self.hits_after if after else self.hits_before) / self.lookups
+
+    def format(self) -> str:
+        """
+        Returns the report as log text.
+        """
+
+        return (
+            f"Warmed {self.templates} templates and {self.pages} pages of "
+            f"{self.questions} questions in {self.duration:.2f}s "
+            f"({self.errors} errors); cache hit ratio "
+            f"{self.hit_ratio(after=False):.0%} before, "
+            f"{self.hit_ratio():.0%} after."
+        )
+
+
+def _cached(question: Question) -> int:
+    """
+    Counts the cache entries of a question that a request would hit.
+    """
+
+    if question.is_closed():
+        return int(get_frozen_results(question_id=question.pk) is not None)
+
+    return int(get_detail_page(question_id=question.pk) is not None)
+
+
+def _render_pages(questions: list[Question]) -> tuple[int, int]:
+    """
+    Renders the detail and results pages of some questions in a worker
+    thread, and returns the numbers of rendered and failed pages.
+    """
+
+    views: tuple[Callable[..., HttpResponse], ...] = (
+        DetailView.as_view(),
+        ResultsView.as_view(),
+    )
+    factory: RequestFactory = RequestFactory()
+    rendered: int = 0
+    errors: int = 0
+
+    try:
+        for question in questions:
+            for view in views:
+                request: HttpRequest = factory.get(path="/")
+                try:
+                    response: HttpResponse = view(request, pk=question.pk)
+                    if hasattr(response, "render"):
+                        response.render()
+                    rendered += 1
+
+                except Exception:  # pylint: disable=broad-exception-caught
+                    logger.exception(
+                        "Warm-up of question %s failed", question.pk
+                    )
+                    errors += 1
+
+    finally:
+        # Each worker thread opened its own connections.
+        connections.close_all()
+
+    return rendered, errors
+
+
+def warm_up(
+    top: int | None = None, workers: int | None = None
+) -> WarmupReport:
+    """
+    Warm Up Function
+
+    Description:
+        - This function warms the polls caches and reports how long it took
+        and how many of the cache entries of the warmed questions were
+        present before and after.
+        - The most active questions are the published ones with the highest
+        trending score.
+
+    Args:
+        - `top (int | None)`: The number of questions to warm, by default
+        the `POLLS_WARMUP_TOP` setting.  **(Optional)**
+        - `workers (int | None)`: The number of rendering threads, by default
+        the `POLLS_WARMUP_WORKERS` setting.  **(Optional)**
+
+    Returns:
+        - `report (WarmupReport)`: The warm-up report.
+
+    """
+
+    top = getattr(settings, "POLLS_WARMUP_TOP", 50) if top is None else top
+    workers = (
+        getattr(settings, "POLLS_WARMUP_WORKERS", 4)
+        if workers is None
+        else workers
+    )
+    report: WarmupReport = WarmupReport()
+    started: float = perf_counter()
+
+    for name in TEMPLATES:
+        get_template(template_name=name)
+        report.templates += 1
+
+    schedule.get_snapshot()
+
+    questions: list[Question] = trending_questions(limit=top)
+    report.questions = len(questions)
+    report.lookups = len(questions)
+    report.hits_before = sum(_cached(question=q) for q in questions)
+
+    workers = max(1, min(workers, len(questions)))
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="polls-warmup"
+    ) as executor:
+        results: list[tuple[int, int]] = list(
+            executor.map(
+                _render_pages,
+                [questions[index::workers] for index in range(workers)],
+            )
+        )
+
+    report.pages = sum(rendered for rendered, _ in results)
+    report.errors = sum(errors for _, errors in results)
+    report.hits_after = sum(_cached(question=q) for q in questions)
+    report.duration = perf_counter() - started
+
+    logger.info("%s", report.format())
+
+    return report
+
+
+def warm_up_in_background() -> threading.Thread:
+    """
+    Warm Up In Background Function
+
+    Description:
+        - This function runs `warm_up` in a daemon thread, so a starting
+        process can serve requests while its caches fill.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `thread (threading.Thread)`: The started thread.
+
+    """
+
+    def run() -> None:
+        try:
+            warm_up()
+
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Cache warm-up failed")
+
+        finally:
+            connections.close_all()
+
+    thread: threading.Thread = threading.Thread(
+        target=run, name="polls-warmup", daemon=True
+    )
+    thread.start()
+
+    return thread
+
+
+def warm_up_on_start() -> threading.Thread | None:
+    """
+    Warm Up On Start Function
+
+    Description:
+        - This function starts warming the polls caches in the background
+        when the `POLLS_WARMUP_ON_READY` setting is on. It is meant for the
+        WSGI and ASGI entry points, so only server processes warm up, not
+        `migrate`, `shell` or other management commands.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `thread (threading.Thread | None)`: The started thread, if any.
+
+    """
+
+    if not getattr(settings, "POLLS_WARMUP_ON_READY", False):
+        return None
+
+    return warm_up_in_background()
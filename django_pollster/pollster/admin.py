@@ -11,10 +11,18 @@ from typing import Any
 from django.contrib import admin
 from django.contrib.auth.admin import GroupAdmin
 from django.contrib.auth.models import Group
+from django.db.models import ManyToManyField, QuerySet
+from django.forms import ModelMultipleChoiceField
 from django.forms.models import ModelForm
 from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+from django.utils.html import format_html, format_html_join
+from django.utils.safestring import SafeString
 from django.utils.translation import gettext_lazy
 
+from .models import RequestProfile, Task
+from .permissions import get_permission_choices
+
 
 # Subclass the Group model to change verbose name
 class Role(Group):
@@ -89,6 +97,8 @@ class RoleAdmin(GroupAdmin):
         -> HttpResponse`
         - `get_form(self, request: HttpRequest, obj: Any | None = None, change:
         bool = False, **kwargs: Any) -> type[ModelForm]`
+        - `formfield_for_manytomany(self, db_field: ManyToManyField, request:
+        HttpRequest, **kwargs: Any) -> ModelMultipleChoiceField | None`
 
     """
 
@@ -190,5 +200,193 @@ class RoleAdmin(GroupAdmin):
         form.base_fields["name"].label = gettext_lazy("Role name")
         return form
 
+    def formfield_for_manytomany(  # type: ignore
+        self,
+        db_field: ManyToManyField,
+        request: HttpRequest,
+        **kwargs: Any,
+    ) -> ModelMultipleChoiceField | None:
+        """
+        Formfield For Many To Many
+
+        Description:
+            - This method is used to get the form field of a many to many
+            relation of the Role model.
+            - The permission picker reads its choices from the permission
+            cache instead of loading every permission on each change form.
+
+        Args:
+            - `db_field (ManyToManyField)`: The model field.  **(Required)**
+            - `request (HttpRequest)`: The request object.  **(Required)**
+            - `**kwargs`: Additional keyword arguments. **(Optional)**
+
+        Returns:
+            - `ModelMultipleChoiceField`: The form field.
+
+        """
+
+        formfield: ModelMultipleChoiceField | None = (
+            super().formfield_for_manytomany(db_field, request, **kwargs)
+        )
+
+        if formfield is not None and db_field.name == "permissions":
+            formfield.choices = get_permission_choices()
+
+        return formfield
+
     list_display = ("name",)
     search_fields = ("name",)
+
+
+@admin.register(RequestProfile)
+class RequestProfileAdmin(admin.ModelAdmin):
+    """
+    Request Profile Admin
+
+    Description:
+        - This class is used to browse the recorded request profiles.
+        - Profiles are written by the profiling middleware only, so they are
+        read-only here.
+
+    Attributes:
+        - `list_display (list)`: The fields to display in the list view.
+        - `list_filter (list)`: The fields to filter by.
+        - `search_fields (list)`: The fields to search by.
+        - `fields (list)`: The fields of the detail view.
+        - `readonly_fields (list)`: The fields of the detail view.
+
+    Methods:
+        - `has_add_permission(self, request: HttpRequest) -> bool`
+        - `has_change_permission(self, request: HttpRequest, obj:
+        RequestProfile | None = None) -> bool`
+        - `sql_trace(self, obj: RequestProfile) -> SafeString`
+        - `call_profile(self, obj: RequestProfile) -> SafeString`
+
+    """
+
+    list_display = [
+        "request_id",
+        "method",
+        "path",
+        "status_code",
+        "duration_ms",
+        "query_count",
+        "trigger",
+        "created_at",
+    ]
+    list_filter = ["trigger", "method", "status_code"]
+    search_fields = ["request_id", "client_request_id", "path", "view_name"]
+    fields = readonly_fields = [
+        "request_id",
+        "client_request_id",
+        "method",
+        "path",
+        "view_name",
+        "status_code",
+        "trigger",
+        "duration_ms",
+        "query_count",
+        "created_at",
+        "sql_trace",
+        "call_profile",
+    ]
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(
+        self, request: HttpRequest, obj: RequestProfile | None = None
+    ) -> bool:
+        return False
+
+    @admin.display(description="SQL")
+    def sql_trace(self, obj: RequestProfile) -> SafeString:
+        """
+        Renders the recorded queries as a table, slowest first.
+        """
+
+        return format_html(
+            "<table><tr><th>ms</th><th>database</th><th>SQL</th></tr>"
+            "{}</table>",
+            format_html_join(
+                sep="",
+                format_string="<tr><td>{}</td><td>{}</td><td><code>{}</code>"
+                "</td></tr>",
+                args_generator=(
+                    (query["ms"], query["alias"], query["sql"])
+                    for query in sorted(
+                        obj.sql, key=lambda query: -query["ms"]
+                    )
+                ),
+            ),
+        )
+
+    @admin.display(description="Profile")
+    def call_profile(self, obj: RequestProfile) -> SafeString:
+        """
+        Renders the profiler statistics.
+        """
+
+        return format_html("<pre>{}</pre>", obj.profile)
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    """
+    Task Admin
+
+    Description:
+        - This class is used to follow the tasks of the task queue.
+        - Tasks are queued and updated by the code and the workers only, so
+        they are read-only here, apart from queueing them again.
+
+    Attributes:
+        - `list_display (list)`: The fields to display in the list view.
+        - `list_filter (list)`: The fields to filter by.
+        - `search_fields (list)`: The fields to search by.
+        - `readonly_fields (list)`: The fields of the detail view.
+        - `actions (list)`: The actions of the list view.
+
+    Methods:
+        - `has_add_permission(self, request: HttpRequest) -> bool`
+        - `has_change_permission(self, request: HttpRequest, obj: Task |
+        None = None) -> bool`
+        - `requeue(self, request: HttpRequest, queryset: QuerySet) -> None`
+
+    """
+
+    list_display = [
+        "name",
+        "status",
+        "priority",
+        "attempts",
+        "run_at",
+        "locked_by",
+        "finished_at",
+    ]
+    list_filter = ["status", "name"]
+    search_fields = ["name", "locked_by"]
+    readonly_fields = [field.name for field in Task._meta.fields]
+    actions = ["requeue"]
+
+    def has_add_permission(self, request: HttpRequest) -> bool:
+        return False
+
+    def has_change_permission(
+        self, request: HttpRequest, obj: Task | None = None
+    ) -> bool:
+        return False
+
+    @admin.action(description="Queue the selected failed tasks again")
+    def requeue(self, request: HttpRequest, queryset: QuerySet) -> None:
+        """
+        Queues failed tasks again with a fresh set of attempts.
+        """
+
+        count: int = queryset.filter(status=Task.FAILED).update(
+            status=Task.QUEUED,
+            attempts=0,
+            run_at=timezone.now(),
+            finished_at=None,
+        )
+        self.message_user(request=request, message=f"Queued {count} tasks.")
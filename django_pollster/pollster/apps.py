@@ -0,0 +1,44 @@
+"""
+Pollster Apps Module
+
+Description:
+    - This module contains the configuration for the pollster app.
+
+"""
+
+from django.apps import AppConfig
+
+
+class PollsterConfig(AppConfig):
+    """
+    Pollster Configuration Class
+
+    Description:
+        - This class contains the configuration for the pollster app.
+
+    Attributes:
+        - `name (str)`: The name of the app.
+
+    Methods:
+        - `ready(self) -> None`
+
+    """
+
+    name: str = "pollster"
+
+    def ready(self) -> None:
+        """
+        Ready Method
+
+        Description:
+            - This method connects the signal receivers of the pollster app.
+
+        Args:
+            - `None`
+
+        Returns:
+            - `None`
+
+        """
+
+        from . import signals  # noqa: F401  pylint: disable=unused-import
@@ -0,0 +1,54 @@
+"""
+Pollster Backends Module
+
+Description:
+    - This module contains the authentication backends of the pollster app.
+
+"""
+
+from typing import Any
+
+from django.contrib.auth.backends import ModelBackend
+
+from . import permissions
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    Cached Model Backend
+
+    Description:
+        - This backend resolves user and role permissions from the versioned
+        permission cache instead of the database.
+        - Authentication and object permissions behave as in `ModelBackend`.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `None`
+
+    """
+
+    def _get_permissions(
+        self, user_obj: Any, obj: Any, from_name: str
+    ) -> set[str]:
+        if not user_obj.is_active or user_obj.is_anonymous or obj is not None:
+            return set()
+
+        perm_cache_name: str = f"_{from_name}_perm_cache"
+        if not hasattr(user_obj, perm_cache_name):
+            if user_obj.is_superuser:
+                perms: set[str] = permissions.get_all_permissions()
+
+            elif from_name == "user":
+                perms = permissions.get_user_permissions(user=user_obj)
+
+            else:
+                perms = permissions.get_role_permissions(
+                    role_ids=permissions.get_user_role_ids(user=user_obj)
+                )
+
+            setattr(user_obj, perm_cache_name, perms)
+
+        return getattr(user_obj, perm_cache_name)
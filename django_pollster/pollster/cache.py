@@ -0,0 +1,527 @@
+"""
+Pollster Cache Module
+
+Description:
+    - This module contains a cache backend that keeps its entries in a
+    memory-mapped file, so every worker process on a host shares one copy.
+    - The file is split into buckets of `WAYS` fixed size slots. A key is
+    hashed to one bucket and may live in any slot of it; when the bucket is
+    full, the least recently used slot is reused.
+    - Reads take no lock. Every slot carries a sequence number that writers
+    make odd while they change the slot, and readers retry when the number
+    was odd or moved while they copied the slot.
+    - Writers of one process are serialized by a thread lock, and writers of
+    different processes by an `fcntl` record lock on the bucket they change.
+    - Slots default to 32 KiB, room for the detail page of a question with a
+    couple hundred choices. Only the pages of the file an entry touches take
+    memory, so small entries in large slots cost address space, not memory.
+    Entries that don't fit are counted in the "cache.oversize" metric, and
+    the first one of each file is logged.
+
+"""
+
+import fcntl
+import logging
+import mmap
+import os
+import pickle
+import struct
+from hashlib import blake2b
+from threading import Lock
+from time import time
+from typing import Any
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+from .metrics import increment
+
+logger: logging.Logger = logging.getLogger(name="pollster.cache")
+
+MAGIC: bytes = b"PLSHM001"
+FILE_HEADER: struct.Struct = struct.Struct("<8sIII")
+FILE_HEADER_SIZE: int = 64
+# seq, value length, key hash, expiry (0 = never), access time, key length.
+SLOT_HEADER: struct.Struct = struct.Struct("<IIQddH6x")
+SEQ: struct.Struct = struct.Struct("<I")
+ATIME: struct.Struct = struct.Struct("<d")
+ATIME_OFFSET: int = 24
+READ_RETRIES: int = 4
+SLOT_SIZE: int = 32 * 1024
+
+
+class SharedFile:
+    """
+    Shared File Class
+
+    Description:
+        - This class holds the mapping of one cache file.
+        - Each process maps a file once: closing any descriptor of a file
+        drops every `fcntl` lock the process holds on it, so the descriptor
+        has to outlive all the cache instances Django creates per thread.
+
+    Attributes:
+        - `fd (int)`: The file descriptor.
+        - `mm (mmap.mmap)`: The shared mapping.
+        - `buckets (int)`: The number of buckets.
+        - `ways (int)`: The number of slots per bucket.
+        - `slot_size (int)`: The size of a slot in bytes.
+        - `lock (Lock)`: The lock serializing the writers of this process.
+        - `oversize_logged (bool)`: Whether an oversize entry was logged.
+
+    Methods:
+        - `slot_offset(self, bucket: int, way: int) -> int`
+        - `lock_bucket(self, bucket: int | None) -> None`
+        - `unlock_bucket(self, bucket: int | None) -> None`
+
+    """
+
+    _files: dict[str, "SharedFile"] = {}
+    _files_lock: Lock = Lock()
+
+    def __init__(self, path: str, size: int, ways: int, slot_size: int):
+        self.ways: int = ways
+        self.slot_size: int = slot_size
+        self.buckets: int = max(
+            1, (size - FILE_HEADER_SIZE) // (ways * slot_size)
+        )
+        length: int = FILE_HEADER_SIZE + self.buckets * ways * slot_size
+        self.lock: Lock = Lock()
+        self.oversize_logged: bool = False
+
+        self.fd: int = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        fcntl.lockf(self.fd, fcntl.LOCK_EX)
+        try:
+            header: bytes = os.pread(self.fd, FILE_HEADER.size, 0)
+            if os.fstat(self.fd).st_size != length or header != (
+                FILE_HEADER.pack(MAGIC, self.buckets, ways, slot_size)
+            ):
+                # A new file, or one laid out for other options: start over.
+                # Every process sharing a file must use the same options.
+                os.ftruncate(self.fd, 0)
+                os.ftruncate(self.fd, length)
+                os.pwrite(
+                    self.fd,
+                    FILE_HEADER.pack(MAGIC, self.buckets, ways, slot_size),
+                    0,
+                )
+
+            self.mm: mmap.mmap = mmap.mmap(self.fd, length)
+
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN)
+
+    @classmethod
+    def open(
+        cls, path: str, size: int, ways: int, slot_size: int
+    ) -> "SharedFile":
+        """
+        Returns the mapping of `path` for this process, creating it once.
+        """
+
+        with cls._files_lock:
+            shared: SharedFile | None = cls._files.get(path)
+            if shared is None:
+                shared = cls._files[path] = cls(
+                    path=path, size=size, ways=ways, slot_size=slot_size
+                )
+
+            return shared
+
+    def slot_offset(self, bucket: int, way: int) -> int:
+        return FILE_HEADER_SIZE + (bucket * self.ways + way) * self.slot_size
+
+    def lock_bucket(self, bucket: int | None) -> None:
+        """
+        Locks one bucket, or the whole file when `bucket` is None, against
+        the writers of other processes.
+        """
+
+        if bucket is None:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX)
+        else:
+            fcntl.lockf(self.fd, fcntl.LOCK_EX, 1, bucket)
+
+    def unlock_bucket(self, bucket: int | None) -> None:
+        if bucket is None:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN)
+        else:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, 1, bucket)
+
+
+class SharedMemoryCache(BaseCache):
+    """
+    Shared Memory Cache Class
+
+    Description:
+        - This class is a Django cache backend storing its entries in a
+        memory-mapped file shared by the processes of a host.
+        - `LOCATION` is the path of the file. `OPTIONS` may set `SIZE`, the
+        file size in bytes, `WAYS`, the slots per bucket, and `SLOT_SIZE`,
+        the bytes per slot. Entries whose key and pickled value don't fit in
+        a slot are not cached.
+
+    Attributes:
+        - `shared (SharedFile)`: The mapping of the cache file.
+
+    Methods:
+        - `add(self, key: str, value: Any, timeout: float | None, version:
+        int | None) -> bool`
+        - `get(self, key: str, default: Any, version: int | None) -> Any`
+        - `set(self, key: str, value: Any, timeout: float | None, version:
+        int | None) -> None`
+        - `touch(self, key: str, timeout: float | None, version: int | None)
+        -> bool`
+        - `delete(self, key: str, version: int | None) -> bool`
+        - `has_key(self, key: str, version: int | None) -> bool`
+        - `incr(self, key: str, delta: int, version: int | None) -> int`
+        - `clear(self) -> None`
+
+    """
+
+    pickle_protocol: int = pickle.HIGHEST_PROTOCOL
+
+    def __init__(self, location: str, params: dict[str, Any]) -> None:
+        super().__init__(params=params)
+        options: dict[str, Any] = params.get("OPTIONS", {})
+        self.shared: SharedFile = SharedFile.open(
+            path=location,
+            size=options.get("SIZE", 64 * 1024 * 1024),
+            ways=options.get("WAYS", 8),
+            slot_size=options.get("SLOT_SIZE", SLOT_SIZE),
+        )
+
+    def _locate(self, key: str, version: int | None) -> tuple[bytes, int, int]:
+        """
+        Returns the encoded key, its hash and its bucket.
+        """
+
+        key = self.make_and_validate_key(key=key, version=version)
+        encoded: bytes = key.encode()
+        key_hash: int = int.from_bytes(
+            blake2b(encoded, digest_size=8).digest(), "little"
+        )
+
+        return encoded, key_hash, key_hash % self.shared.buckets
+
+    def _read(
+        self, encoded: bytes, key_hash: int, bucket: int, now: float
+    ) -> tuple[int, bytes] | None:
+        """
+        Returns the offset and the pickled value of a live entry, without
+        taking a lock.
+        """
+
+        mm: mmap.mmap = self.shared.mm
+
+        for way in range(self.shared.ways):
+            offset: int = self.shared.slot_offset(bucket=bucket, way=way)
+
+            for _ in range(READ_RETRIES):
+                seq, value_len, slot_hash, expires, _, key_len = (
+                    SLOT_HEADER.unpack_from(mm, offset)
+                )
+                if seq & 1:
+                    continue
+
+                if slot_hash != key_hash or key_len != len(encoded):
+                    break
+
+                start: int = offset + SLOT_HEADER.size
+                data: bytes = mm[start : start + key_len + value_len]
+
+                if SEQ.unpack_from(mm, offset)[0] != seq:
+                    continue
+
+                if data[:key_len] != encoded or (expires and expires <= now):
+                    break
+
+                return offset, data[key_len:]
+
+        return None
+
+    def _find_slot(
+        self, encoded: bytes, key_hash: int, bucket: int, now: float
+    ) -> tuple[int, bool, bool]:
+        """
+        Returns the offset of the slot holding the key, or else of the slot
+        to reuse, whether the key was found and whether its entry is live.
+        Writers call it with the bucket locked.
+        """
+
+        mm: mmap.mmap = self.shared.mm
+        victim: int = -1
+        victim_atime: float = float("inf")
+
+        for way in range(self.shared.ways):
+            offset: int = self.shared.slot_offset(bucket=bucket, way=way)
+            _, _, slot_hash, expires, atime, key_len = SLOT_HEADER.unpack_from(
+                mm, offset
+            )
+
+            if key_len == len(encoded) and slot_hash == key_hash:
+                start: int = offset + SLOT_HEADER.size
+                if mm[start : start + key_len] == encoded:
+                    return offset, True, not expires or expires > now
+
+            if not key_len or (expires and expires <= now):
+                atime = -1.0
+
+            if atime < victim_atime:
+                victim, victim_atime = offset, atime
+
+        return victim, False, False
+
+    def _write(
+        self,
+        offset: int,
+        encoded: bytes,
+        key_hash: int,
+        value: bytes,
+        expires: float,
+        now: float,
+    ) -> None:
+        """
+        Writes an entry to a slot under the sequence protocol. An empty key
+        marks the slot as free.
+        """
+
+        mm: mmap.mmap = self.shared.mm
+        # Force the parity instead of counting on it: a writer that died
+        # mid-write leaves the sequence odd, and adding one would then mark
+        # the slot as readable while it is being changed.
+        odd: int = SEQ.unpack_from(mm, offset)[0] | 1
+
+        SEQ.pack_into(mm, offset, odd)
+        start: int = offset + SLOT_HEADER.size
+        mm[start : start + len(encoded) + len(value)] = encoded + value
+        SLOT_HEADER.pack_into(
+            mm,
+            offset,
+            odd,
+            len(value),
+            key_hash,
+            expires,
+            now,
+            len(encoded),
+        )
+        SEQ.pack_into(mm, offset, (odd + 1) & 0xFFFFFFFF)
+
+    def _store(
+        self,
+        key: str,
+        value: Any,
+        timeout: float | None,
+        version: int | None,
+        only_missing: bool,
+    ) -> bool:
+        encoded, key_hash, bucket = self._locate(key=key, version=version)
+        pickled: bytes = pickle.dumps(value, self.pickle_protocol)
+
+        size: int = SLOT_HEADER.size + len(encoded) + len(pickled)
+        if size > self.shared.slot_size:
+            # Too large for a slot: drop any stale copy instead.
+            increment(name="cache.oversize")
+            if not self.shared.oversize_logged:
+                self.shared.oversize_logged = True
+                logger.warning(
+                    "Entry %s of %d bytes doesn't fit in a %d byte slot; "
+                    "raise SLOT_SIZE. Further ones are only counted.",
+                    key,
+                    size,
+                    self.shared.slot_size,
+                )
+            self.delete(key=key, version=version)
+            return False
+
+        expires: float | None = self.get_backend_timeout(timeout=timeout)
+        now: float = time()
+
+        with self.shared.lock:
+            self.shared.lock_bucket(bucket=bucket)
+            try:
+                offset, _, live = self._find_slot(
+                    encoded=encoded, key_hash=key_hash, bucket=bucket, now=now
+                )
+                if only_missing and live:
+                    return False
+
+                self._write(
+                    offset=offset,
+                    encoded=encoded,
+                    key_hash=key_hash,
+                    value=pickled,
+                    expires=expires or 0.0,
+                    now=now,
+                )
+                return True
+
+            finally:
+                self.shared.unlock_bucket(bucket=bucket)
+
+    def add(
+        self,
+        key: str,
+        value: Any,
+        timeout: float | None = DEFAULT_TIMEOUT,  # type: ignore
+        version: int | None = None,
+    ) -> bool:
+        return self._store(
+            key=key,
+            value=value,
+            timeout=timeout,
+            version=version,
+            only_missing=True,
+        )
+
+    def get(
+        self, key: str, default: Any = None, version: int | None = None
+    ) -> Any:
+        encoded, key_hash, bucket = self._locate(key=key, version=version)
+        now: float = time()
+        found: tuple[int, bytes] | None = self._read(
+            encoded=encoded, key_hash=key_hash, bucket=bucket, now=now
+        )
+        if found is None:
+            return default
+
+        offset, pickled = found
+        # The access time is only an eviction hint, so it is written
+        # without the lock; a lost update merely ages the entry.
+        ATIME.pack_into(self.shared.mm, offset + ATIME_OFFSET, now)
+
+        return pickle.loads(pickled)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        timeout: float | None = DEFAULT_TIMEOUT,  # type: ignore
+        version: int | None = None,
+    ) -> None:
+        self._store(
+            key=key,
+            value=value,
+            timeout=timeout,
+            version=version,
+            only_missing=False,
+        )
+
+    def touch(
+        self,
+        key: str,
+        timeout: float | None = DEFAULT_TIMEOUT,  # type: ignore
+        version: int | None = None,
+    ) -> bool:
+        encoded, key_hash, bucket = self._locate(key=key, version=version)
+        now: float = time()
+
+        with self.shared.lock:
+            self.shared.lock_bucket(bucket=bucket)
+            try:
+                found: tuple[int, bytes] | None = self._read(
+                    encoded=encoded, key_hash=key_hash, bucket=bucket, now=now
+                )
+                if found is None:
+                    return False
+
+                self._write(
+                    offset=found[0],
+                    encoded=encoded,
+                    key_hash=key_hash,
+                    value=found[1],
+                    expires=self.get_backend_timeout(timeout=timeout) or 0.0,
+                    now=now,
+                )
+                return True
+
+            finally:
+                self.shared.unlock_bucket(bucket=bucket)
+
+    def delete(self, key: str, version: int | None = None) -> bool:
+        encoded, key_hash, bucket = self._locate(key=key, version=version)
+        now: float = time()
+
+        with self.shared.lock:
+            self.shared.lock_bucket(bucket=bucket)
+            try:
+                offset, found, live = self._find_slot(
+                    encoded=encoded, key_hash=key_hash, bucket=bucket, now=now
+                )
+                if not found:
+                    return False
+
+                self._write(
+                    offset=offset,
+                    encoded=b"",
+                    key_hash=0,
+                    value=b"",
+                    expires=0.0,
+                    now=0.0,
+                )
+                return live
+
+            finally:
+                self.shared.unlock_bucket(bucket=bucket)
+
+    def has_key(self, key: str, version: int | None = None) -> bool:
+        encoded, key_hash, bucket = self._locate(key=key, version=version)
+
+        return (
+            self._read(
+                encoded=encoded, key_hash=key_hash, bucket=bucket, now=time()
+            )
+            is not None
+        )
+
+    def incr(
+        self, key: str, delta: int = 1, version: int | None = None
+    ) -> int:
+        encoded, key_hash, bucket = self._locate(key=key, version=version)
+        now: float = time()
+
+        with self.shared.lock:
+            self.shared.lock_bucket(bucket=bucket)
+            try:
+                found: tuple[int, bytes] | None = self._read(
+                    encoded=encoded, key_hash=key_hash, bucket=bucket, now=now
+                )
+                if found is None:
+                    raise ValueError(f"Key '{key}' not found")
+
+                offset, pickled = found
+                value: int = pickle.loads(pickled) + delta
+                _, _, _, expires, _, _ = SLOT_HEADER.unpack_from(
+                    self.shared.mm, offset
+                )
+                self._write(
+                    offset=offset,
+                    encoded=encoded,
+                    key_hash=key_hash,
+                    value=pickle.dumps(value, self.pickle_protocol),
+                    expires=expires,
+                    now=now,
+                )
+                return value
+
+            finally:
+                self.shared.unlock_bucket(bucket=bucket)
+
+    def clear(self) -> None:
+        with self.shared.lock:
+            self.shared.lock_bucket(bucket=None)
+            try:
+                for bucket in range(self.shared.buckets):
+                    for way in range(self.shared.ways):
+                        self._write(
+                            offset=self.shared.slot_offset(
+                                bucket=bucket, way=way
+                            ),
+                            encoded=b"",
+                            key_hash=0,
+                            value=b"",
+                            expires=0.0,
+                            now=0.0,
+                        )
+
+            finally:
+                self.shared.unlock_bucket(bucket=None)
@@ -0,0 +1,333 @@
+"""
+Pollster Compression Module
+
+Description:
+    - This module contains the response compression of the pollster
+    project, used by the compression middleware.
+    - Responses are compressed with brotli when the `brotli` package is
+    installed and the client accepts it, with gzip otherwise. Only text
+    content types from an allowlist are compressed, and only above a size
+    threshold.
+    - Streaming responses are compressed chunk by chunk and flushed after
+    each chunk, so the client receives every chunk as soon as it is sent.
+    - Compressing a secret next to text an attacker controls leaks the
+    secret through the compressed size (BREACH). Pages that carry a CSRF
+    token, and paths listed in the configuration, are never compressed.
+    - The bytes before and after compression are counted in the metrics, see
+    `pollster.metrics`.
+
+"""
+
+import re
+import zlib
+from collections.abc import AsyncIterator, Callable, Iterator
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+from django.utils.cache import patch_vary_headers
+
+from .metrics import increment
+
+try:
+    import brotli  # type: ignore
+except ImportError:
+    brotli = None
+
+DEFAULTS: dict[str, Any] = {
+    # Smaller responses gain too little to be worth the CPU.
+    "MIN_LENGTH": 500,
+    "CONTENT_TYPES": [
+        "text/html",
+        "text/plain",
+        "text/css",
+        "text/javascript",
+        "application/javascript",
+        "application/json",
+        "image/svg+xml",
+    ],
+    "GZIP_LEVEL": 6,
+    "BROTLI_QUALITY": 5,
+    # Never compress pages that carry a CSRF token.
+    "BREACH_PROTECTION": True,
+    # Regular expressions of paths never compressed, e.g. pages showing
+    # secrets other than the CSRF token.
+    "EXCLUDE_PATHS": [],
+}
+
+
+def get_config() -> dict[str, Any]:
+    """
+    Get Config Function
+
+    Description:
+        - This function returns the compression configuration, with the
+        `COMPRESSION` setting applied over the defaults.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `config (dict[str, Any])`: The compression configuration.
+
+    """
+
+    return {**DEFAULTS, **getattr(settings, "COMPRESSION", {})}
+
+
+@lru_cache(maxsize=8)
+def _compile(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    if not patterns:
+        return None
+
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+class Encoder:
+    """
+    Encoder Class
+
+    Description:
+        - This class compresses one response, in one go or chunk by chunk.
+
+    Attributes:
+        - `encoding (str)`: The content coding, "br" or "gzip".
+        - `compressor (Any)`: The compressor of the response.
+
+    Methods:
+        - `compress(self, data: bytes) -> bytes`
+        - `flush(self) -> bytes`
+        - `finish(self) -> bytes`
+
+    """
+
+    def __init__(self, encoding: str, config: dict[str, Any]) -> None:
+        self.encoding: str = encoding
+        self.compressor: Any = (
+            brotli.Compressor(quality=config["BROTLI_QUALITY"])
+            if encoding == "br"
+            else zlib.compressobj(
+                config["GZIP_LEVEL"], zlib.DEFLATED, 16 + zlib.MAX_WBITS
+            )
+        )
+
+    def compress(self, data: bytes) -> bytes:
+        """
+        Returns the compressed data available so far.
+        """
+
+        if self.encoding == "br":
+            return self.compressor.process(data)
+
+        return self.compressor.compress(data)
+
+    def flush(self) -> bytes:
+        """
+        Returns the rest of the data compressed so far, without ending the
+        stream.
+        """
+
+        if self.encoding == "br":
+            return self.compressor.flush()
+
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        """
+        Returns the end of the stream.
+        """
+
+        if self.encoding == "br":
+            return self.compressor.finish()
+
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """
+    Choose Encoding Function
+
+    Description:
+        - This function picks the content coding of a response from the
+        Accept-Encoding header of the request: the one with the highest
+        quality value, brotli before gzip on a tie.
+
+    Args:
+        - `accept_encoding (str)`: The Accept-Encoding header.
+        **(Required)**
+
+    Returns:
+        - `encoding (str | None)`: "br", "gzip", or None when the client
+        accepts neither.
+
+    """
+
+    qualities: dict[str, float] = {}
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality: float = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.strip()] = quality
+
+    supported: list[str] = ["br", "gzip"] if brotli is not None else ["gzip"]
+    candidates: list[tuple[float, int, str]] = [
+        (qualities.get(coding, qualities.get("*", 0.0)), -rank, coding)
+        for rank, coding in enumerate(supported)
+    ]
+    quality, _, encoding = max(candidates)
+
+    return encoding if quality > 0 else None
+
+
+def _excluded(request: HttpRequest, config: dict[str, Any]) -> str | None:
+    """
+    Returns why the response of a request must not be compressed, or None.
+    """
+
+    # Rendering a CSRF token, or rotating it, adds this key to the request.
+    if (
+        config["BREACH_PROTECTION"]
+        and "CSRF_COOKIE_NEEDS_UPDATE" in request.META
+    ):
+        return "breach"
+
+    pattern: re.Pattern[str] | None = _compile(
+        patterns=tuple(config["EXCLUDE_PATHS"])
+    )
+    if pattern is not None and pattern.match(request.path_info):
+        return "path"
+
+    return None
+
+
+def _count(encoding: str, before: int, after: int) -> None:
+    increment(name=f"compression.{encoding}.bytes_in", value=before)
+    increment(name=f"compression.{encoding}.bytes_out", value=after)
+    increment(name="compression.bytes_saved", value=before - after)
+
+
+def _stream(content: Iterator[bytes], encoder: Encoder) -> Iterator[bytes]:
+    before: int = 0
+    after: int = 0
+
+    for chunk in content:
+        data: bytes = encoder.compress(data=chunk) + encoder.flush()
+        before += len(chunk)
+        after += len(data)
+        if data:
+            yield data
+
+    data = encoder.finish()
+    _count(encoding=encoder.encoding, before=before, after=after + len(data))
+    yield data
+
+
+async def _astream(
+    content: AsyncIterator[bytes], encoder: Encoder
+) -> AsyncIterator[bytes]:
+    before: int = 0
+    after: int = 0
+
+    async for chunk in content:
+        data: bytes = encoder.compress(data=chunk) + encoder.flush()
+        before += len(chunk)
+        after += len(data)
+        if data:
+            yield data
+
+    data = encoder.finish()
+    _count(encoding=encoder.encoding, before=before, after=after + len(data))
+    yield data
+
+
+def compress_response(
+    request: HttpRequest, response: HttpResponse | StreamingHttpResponse
+) -> HttpResponse | StreamingHttpResponse:
+    """
+    Compress Response Function
+
+    Description:
+        - This function compresses a response when its content type is
+        allowed, it is large enough, it isn't excluded and the client
+        accepts a supported coding. Compressible responses vary on
+        Accept-Encoding, and their strong ETag becomes a weak one.
+        - A compressed response that isn't smaller is sent uncompressed.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+        - `response (HttpResponse | StreamingHttpResponse)`: The response
+        object.  **(Required)**
+
+    Returns:
+        - `response (HttpResponse | StreamingHttpResponse)`: The same
+        response, compressed or not.
+
+    """
+
+    config: dict[str, Any] = get_config()
+    content_type: str = (
+        response.get("Content-Type", "").partition(";")[0].strip().lower()
+    )
+
+    if (
+        content_type not in config["CONTENT_TYPES"]
+        or response.has_header("Content-Encoding")
+        or response.status_code == 206
+        or "no-transform" in response.get("Cache-Control", "")
+        or (
+            not response.streaming
+            and len(response.content) < config["MIN_LENGTH"]
+        )
+    ):
+        return response
+
+    reason: str | None = _excluded(request=request, config=config)
+    if reason is not None:
+        increment(name=f"compression.skipped.{reason}")
+        return response
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+
+    encoding: str | None = choose_encoding(
+        accept_encoding=request.headers.get("Accept-Encoding", "")
+    )
+    if encoding is None:
+        return response
+
+    encoder: Encoder = Encoder(encoding=encoding, config=config)
+
+    if response.streaming:
+        compress: Callable[..., Any] = (
+            _astream if response.is_async else _stream
+        )
+        response.streaming_content = compress(  # type: ignore
+            content=response.streaming_content,  # type: ignore
+            encoder=encoder,
+        )
+        del response["Content-Length"]
+
+    else:
+        content: bytes = response.content
+        compressed: bytes = encoder.compress(data=content) + encoder.finish()
+        if len(compressed) >= len(content):
+            return response
+
+        response.content = compressed
+        response.headers["Content-Length"] = str(len(compressed))
+        _count(encoding=encoding, before=len(content), after=len(compressed))
+
+    etag: str | None = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response.headers["ETag"] = f"W/{etag}"
+
+    response.headers["Content-Encoding"] = encoding
+    increment(name=f"compression.{encoding}.responses")
+
+    return response
@@ -0,0 +1,132 @@
+"""
+Benchmark Cache Command Module
+
+Description:
+    - This module contains the command that compares the shared memory cache
+    with the local memory and file based caches.
+
+"""
+
+import multiprocessing
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any
+
+from django.core.cache.backends.base import BaseCache
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils.module_loading import import_string
+
+BACKENDS: dict[str, str] = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "filebased": "django.core.cache.backends.filebased.FileBasedCache",
+    "shared": "pollster.cache.SharedMemoryCache",
+}
+
+
+def _open(backend: str, location: str) -> BaseCache:
+    return import_string(BACKENDS[backend])(
+        location, {"TIMEOUT": None, "OPTIONS": {"MAX_ENTRIES": 1_000_000}}
+    )
+
+
+def _hits_in_new_process(backend: str, location: str, keys: int) -> int:
+    """
+    Counts the keys another worker process finds in the cache.
+    """
+
+    cache: BaseCache = _open(backend=backend, location=location)
+
+    return sum(
+        cache.get(key=f"key:{index}") is not None for index in range(keys)
+    )
+
+
+class Command(BaseCommand):
+    """
+    Benchmark Cache Command
+
+    Description:
+        - This command measures the sets, hits and misses per second of each
+        cache backend with a payload shaped like the cached poll pages, and
+        the share of the entries a new worker process can read.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Compare the shared memory cache with the LocMem and file caches."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--keys",
+            type=int,
+            default=10_000,
+            help="The number of keys written and read per backend.",
+        )
+        parser.add_argument(
+            "--payload",
+            type=int,
+            default=1_024,
+            help="The size of each cached value in bytes.",
+        )
+
+    def _rate(self, operation: Any, keys: int) -> float:
+        started: float = perf_counter()
+        for index in range(keys):
+            operation(f"key:{index}")
+
+        return keys / (perf_counter() - started)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        keys: int = options["keys"]
+        payload: bytes = b"x" * options["payload"]
+
+        self.stdout.write(
+            f"{'backend':<10} {'set/s':>12} {'hit/s':>12} {'miss/s':>12} "
+            f"{'shared':>8}"
+        )
+
+        with TemporaryDirectory() as directory:
+            context = multiprocessing.get_context(method="spawn")
+
+            for backend in BACKENDS:
+                location: str = str(Path(directory) / backend)
+                cache: BaseCache = _open(backend=backend, location=location)
+
+                sets: float = self._rate(
+                    operation=lambda key, cache=cache: cache.set(
+                        key=key, value=payload
+                    ),
+                    keys=keys,
+                )
+                hits: float = self._rate(
+                    operation=lambda key, cache=cache: cache.get(key=key),
+                    keys=keys,
+                )
+                misses: float = self._rate(
+                    operation=lambda key, cache=cache: cache.get(
+                        key=f"missing:{key}"
+                    ),
+                    keys=keys,
+                )
+
+                with context.Pool(processes=1) as pool:
+                    shared: int = pool.apply(
+                        func=_hits_in_new_process,
+                        kwds={
+                            "backend": backend,
+                            "location": location,
+                            "keys": keys,
+                        },
+                    )
+
+                self.stdout.write(
+                    f"{backend:<10} {sets:>12,.0f} {hits:>12,.0f} "
+                    f"{misses:>12,.0f} {shared / keys:>8.0%}"
+                )
@@ -0,0 +1,110 @@
+"""
+Benchmark Fast Path Command Module
+
+Description:
+    - This module contains the command that measures the per request savings
+    of the middleware fast path.
+
+"""
+
+from time import perf_counter
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+
+
+class Command(BaseCommand):
+    """
+    Benchmark Fast Path Command
+
+    Description:
+        - This command requests each path through the full middleware stack,
+        alternating rounds with the fast path disabled and enabled, and
+        reports the mean time and queries per request of the best round of
+        each mode.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Measure the per request savings of the middleware fast path."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "paths",
+            nargs="*",
+            default=["/polls/"],
+            help="The paths to request.",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1_000,
+            help="The number of requests per path, mode and round.",
+        )
+        parser.add_argument(
+            "--rounds",
+            type=int,
+            default=5,
+            help="The number of alternating rounds; the best one is kept.",
+        )
+
+    def _measure(self, path: str, requests: int) -> tuple[float, float]:
+        """
+        Returns the mean milliseconds and queries per request for `path`.
+        """
+
+        client: Client = Client(
+            HTTP_HOST=next(
+                (host for host in settings.ALLOWED_HOSTS if host != "*"),
+                "localhost",
+            ).lstrip("."),
+            REMOTE_ADDR="203.0.113.1",
+        )
+        client.get(path=path)
+
+        with CaptureQueriesContext(connection=connection) as queries:
+            started: float = perf_counter()
+            for _ in range(requests):
+                client.get(path=path)
+            elapsed: float = perf_counter() - started
+
+        return elapsed * 1_000 / requests, len(queries) / requests
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        self.stdout.write(
+            f"{'path':<30} {'full ms':>10} {'fast ms':>10} {'saved':>8} "
+            f"{'full q':>8} {'fast q':>8}"
+        )
+
+        for path in options["paths"]:
+            full: list[tuple[float, float]] = []
+            fast: list[tuple[float, float]] = []
+
+            for _ in range(options["rounds"]):
+                with override_settings(FAST_PATH_ROUTES=[]):
+                    full.append(
+                        self._measure(path=path, requests=options["requests"])
+                    )
+
+                fast.append(
+                    self._measure(path=path, requests=options["requests"])
+                )
+
+            full_ms, full_queries = min(full)
+            fast_ms, fast_queries = min(fast)
+            saved: float = (full_ms - fast_ms) / full_ms * 100
+
+            self.stdout.write(
+                f"{path:<30} {full_ms:>10.3f} {fast_ms:>10.3f} "
+                f"{saved:>7.1f}% {full_queries:>8.2f} {fast_queries:>8.2f}"
+            )
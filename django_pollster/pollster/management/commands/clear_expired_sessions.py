@@ -0,0 +1,87 @@
+"""
+Clear Expired Sessions Command Module
+
+Description:
+    - This module contains the command that deletes expired database sessions
+    in batches.
+
+"""
+
+from importlib import import_module
+from time import sleep
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+from django.utils import timezone
+
+from pollster.memory import track_command
+
+
+class Command(BaseCommand):
+    """
+    Clear Expired Sessions Command
+
+    Description:
+        - This command deletes expired sessions in batches of primary keys
+        instead of with a single `DELETE`, so the session table is never
+        locked for long and each transaction stays small.
+        - Session engines that don't store sessions in the database have
+        nothing to clean up.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Delete expired database sessions in batches."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1_000,
+            help="The number of sessions deleted per statement.",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="The seconds to wait between batches.",
+        )
+
+    @track_command
+    def handle(self, *args: Any, **options: Any) -> None:
+        engine = import_module(settings.SESSION_ENGINE)
+        get_model_class = getattr(engine.SessionStore, "get_model_class", None)
+
+        if get_model_class is None:
+            self.stdout.write(
+                f"{settings.SESSION_ENGINE} doesn't store sessions in the "
+                "database; nothing to clear."
+            )
+            return
+
+        model = get_model_class()
+        now = timezone.now()
+        deleted: int = 0
+
+        while True:
+            pks: list[str] = list(
+                model.objects.filter(expire_date__lt=now).values_list(
+                    "pk", flat=True
+                )[: options["batch_size"]]
+            )
+            if not pks:
+                break
+
+            deleted += model.objects.filter(pk__in=pks).delete()[0]
+
+            if options["sleep"]:
+                sleep(options["sleep"])
+
+        self.stdout.write(f"Deleted {deleted} expired sessions.")
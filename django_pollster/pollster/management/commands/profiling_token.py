@@ -0,0 +1,49 @@
+"""
+Profiling Token Command Module
+
+Description:
+    - This module contains the command that creates profiling tokens.
+
+"""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from pollster.profiling import get_config, sign_token
+
+
+class Command(BaseCommand):
+    """
+    Profiling Token Command
+
+    Description:
+        - This command prints a signed token which, sent in the profiling
+        header, profiles the requests to the given path prefix until the
+        token expires.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Create a token that enables profiling of matching requests."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "path_prefix",
+            nargs="?",
+            default="/",
+            help="Only profile requests whose path starts with this prefix.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        config: dict[str, Any] = get_config()
+        token: str = sign_token(path_prefix=options["path_prefix"])
+
+        self.stdout.write(f"{config['HEADER']}: {token}")
+        self.stderr.write(f"The token expires in {config['MAX_AGE']} seconds.")
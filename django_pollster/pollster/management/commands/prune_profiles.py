@@ -0,0 +1,52 @@
+"""
+Prune Profiles Command Module
+
+Description:
+    - This module contains the command that deletes old request profiles.
+
+"""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from pollster.memory import track_command
+from pollster.profiling import get_config, prune_profiles
+
+
+class Command(BaseCommand):
+    """
+    Prune Profiles Command
+
+    Description:
+        - This command deletes the request profiles older than the
+        `RETENTION` of the `PROFILING` setting, in batches. Run it
+        periodically, e.g. from cron, so sampled profiles don't pile up.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Delete request profiles older than the retention."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1_000,
+            help="The number of profiles deleted per statement.",
+        )
+
+    @track_command
+    def handle(self, *args: Any, **options: Any) -> None:
+        deleted: int = prune_profiles(batch_size=options["batch_size"])
+
+        self.stdout.write(
+            f"Deleted {deleted} profiles older than "
+            f"{get_config()['RETENTION']} seconds."
+        )
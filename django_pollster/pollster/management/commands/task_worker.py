@@ -0,0 +1,78 @@
+"""
+Task Worker Command Module
+
+Description:
+    - This module contains the command that runs the tasks of the task
+    queue.
+
+"""
+
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from pollster.memory import track_command
+from pollster.tasks import Worker, WorkerStats
+
+
+class Command(BaseCommand):
+    """
+    Task Worker Command
+
+    Description:
+        - This command claims queued tasks and runs them in a pool of threads,
+        or of processes for CPU bound tasks, until it is interrupted. Several
+        workers can run side by side, on one host or more.
+        - It reports the outcome of the runs and the throughput of the pool
+        when it stops.
+
+    Attributes:
+        - `help (str)`: The help text of the command.
+
+    Methods:
+        - `add_arguments(self, parser: CommandParser) -> None`
+        - `handle(self, *args: Any, **options: Any) -> None`
+
+    """
+
+    help = "Run the tasks of the task queue."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=4,
+            help="The number of tasks run at once.",
+        )
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Run tasks in processes instead of threads.",
+        )
+        parser.add_argument(
+            "--burst",
+            action="store_true",
+            help="Stop once no task is due.",
+        )
+        parser.add_argument(
+            "--max-tasks",
+            type=int,
+            default=None,
+            help="Stop after claiming this many tasks.",
+        )
+
+    @track_command
+    def handle(self, *args: Any, **options: Any) -> None:
+        worker: Worker = Worker(
+            concurrency=options["concurrency"],
+            processes=options["processes"],
+        )
+        mode: str = "processes" if worker.processes else "threads"
+
+        self.stderr.write(
+            f"Worker {worker.name} running {worker.concurrency} {mode}."
+        )
+        stats: WorkerStats = worker.run(
+            burst=options["burst"], max_tasks=options["max_tasks"]
+        )
+        self.stdout.write(stats.format())
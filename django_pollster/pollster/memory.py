@@ -0,0 +1,226 @@
+"""
+Pollster Memory Module
+
+Description:
+    - This module contains the opt-in memory tracking of the pollster
+    project, built on `tracemalloc`.
+    - Each tracked view or management command is measured for its peak
+    allocation and for what it still holds when it returns, and the
+    allocation sites that grew the most are reported.
+    - Tracking a block takes two snapshots of the traced heap, so only a
+    sample of the requests is tracked, and tracing runs only while a tracked
+    block does. Management commands are tracked when their `handle` is
+    decorated with `track_command`, and the commands of the polls app
+    through the `POLLS_COMMAND_WRAPPER` setting, which names `track`.
+    - Reports go to the "pollster.memory" logger: every report at debug
+    level, and a warning when the retained memory exceeds the budget.
+    - `tracemalloc` traces the whole process, so the numbers of concurrent
+    requests in threaded workers include each other's allocations. They are
+    exact with one request per process at a time.
+
+"""
+
+import logging
+import threading
+import tracemalloc
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+logger: logging.Logger = logging.getLogger(name="pollster.memory")
+
+_lock: threading.Lock = threading.Lock()
+# The number of blocks being tracked, and if tracing was started for them.
+_tracing: dict[str, int] = {"blocks": 0, "started": 0}
+
+DEFAULTS: dict[str, Any] = {
+    "ENABLED": False,
+    # The share of requests tracked while enabled, from 0.0 to 1.0.
+    "SAMPLE_RATE": 0.01,
+    # Retained bytes above which a report is logged as a warning.
+    "BUDGET": 8 * 1024 * 1024,
+    # The number of allocation sites reported.
+    "TOP": 10,
+    # The number of frames stored per allocation; more frames cost more.
+    "FRAMES": 1,
+}
+
+
+def get_config() -> dict[str, Any]:
+    """
+    Get Config Function
+
+    Description:
+        - This function returns the memory tracking configuration, with the
+        `MEMORY_TRACKING` setting applied over the defaults.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `config (dict[str, Any])`: The memory tracking configuration.
+
+    """
+
+    return {**DEFAULTS, **getattr(settings, "MEMORY_TRACKING", {})}
+
+
+@dataclass(slots=True)
+class MemoryReport:
+    """
+    Memory Report Class
+
+    Description:
+        - This class holds the memory usage of one tracked block.
+
+    Attributes:
+        - `label (str)`: The view or command that was tracked.
+        - `peak (int)`: The peak allocation above the starting point, in
+        bytes.
+        - `retained (int)`: The allocation still held at the end, in bytes.
+        - `top (list[tuple[str, int]])`: The allocation sites that grew the
+        most, with their growth in bytes.
+        - `over_budget (bool)`: If `retained` exceeds the budget.
+
+    Methods:
+        - `format(self) -> str`
+
+    """
+
+    label: str
+    peak: int = 0
+    retained: int = 0
+    top: list[tuple[str, int]] | None = None
+    over_budget: bool = False
+
+    def format(self) -> str:
+        """
+        Returns the report as log text.
+        """
+
+        lines: list[str] = [
+            f"{self.label}: peak {self.peak / 1024:.1f} KiB, "
+            f"retained {self.retained / 1024:.1f} KiB"
+        ]
+        lines.extend(
+            f"  {size / 1024:+.1f} KiB {site}" for site, size in self.top or []
+        )
+
+        return "\n".join(lines)
+
+
+def _start(frames: int) -> None:
+    """
+    Starts tracing for one more tracked block, unless it already runs.
+    """
+
+    with _lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            _tracing["started"] = 1
+        _tracing["blocks"] += 1
+
+
+def _stop() -> None:
+    """
+    Stops tracing when the last tracked block ends, if it was started here.
+    """
+
+    with _lock:
+        _tracing["blocks"] -= 1
+        if not _tracing["blocks"] and _tracing["started"]:
+            tracemalloc.stop()
+            _tracing["started"] = 0
+
+
+@contextmanager
+def track(label: str) -> Iterator[MemoryReport]:
+    """
+    Track Function
+
+    Description:
+        - This function measures the allocations of the block it wraps and
+        logs a report when the block ends. The report is filled in at exit.
+        - It does nothing unless memory tracking is enabled. Tracing starts
+        with the first tracked block and stops with the last one, unless it
+        was already running.
+
+    Args:
+        - `label (str)`: The name of the tracked block.  **(Required)**
+
+    Returns:
+        - `report (Iterator[MemoryReport])`: The report of the block.
+
+    """
+
+    report: MemoryReport = MemoryReport(label=label)
+    config: dict[str, Any] = get_config()
+
+    if not config["ENABLED"]:
+        yield report
+        return
+
+    _start(frames=config["FRAMES"])
+    before: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+    start: int = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+
+    try:
+        yield report
+
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        after: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+
+        report.peak = max(peak - start, 0)
+        report.retained = current - start
+        report.over_budget = report.retained > config["BUDGET"]
+        report.top = [
+            (str(stat.traceback), stat.size_diff)
+            for stat in after.filter_traces(
+                filters=[
+                    tracemalloc.Filter(
+                        inclusive=False, filename_pattern=tracemalloc.__file__
+                    )
+                ]
+            ).compare_to(old_snapshot=before, key_type="lineno")[
+                : config["TOP"]
+            ]
+        ]
+
+        _stop()
+
+        if report.over_budget:
+            logger.warning("Memory budget exceeded: %s", report.format())
+        else:
+            logger.debug("%s", report.format())
+
+
+def track_command(handle: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Track Command Function
+
+    Description:
+        - This function decorates the `handle` method of a management
+        command, so that the command is tracked under its name while memory
+        tracking is enabled.
+
+    Args:
+        - `handle (Callable)`: The `handle` method.  **(Required)**
+
+    Returns:
+        - `handle (Callable)`: The tracked `handle` method.
+
+    """
+
+    @wraps(handle)
+    def tracked_handle(self: BaseCommand, *args: Any, **options: Any) -> Any:
+        with track(label=f"command {self.__module__.rsplit('.', 1)[-1]}"):
+            return handle(self, *args, **options)
+
+    return tracked_handle
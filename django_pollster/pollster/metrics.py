@@ -0,0 +1,75 @@
+"""
+Pollster Metrics Module
+
+Description:
+    - This module contains the metrics of the pollster project: counters
+    kept in the memory of each process and shown to staff members by the
+    metrics view, one "name value" line per counter.
+    - Counters are named with dots, from the feature down, e.g.
+    "compression.gzip.bytes_out".
+
+"""
+
+import threading
+from collections import Counter
+
+_lock: threading.Lock = threading.Lock()
+_counters: Counter[str] = Counter()
+
+
+def increment(name: str, value: int = 1) -> None:
+    """
+    Increment Function
+
+    Description:
+        - This function adds a value to a counter.
+
+    Args:
+        - `name (str)`: The name of the counter.  **(Required)**
+        - `value (int)`: The value to add.  **(Optional)**
+
+    Returns:
+        - `None`
+
+    """
+
+    with _lock:
+        _counters[name] += value
+
+
+def get_metrics() -> dict[str, int]:
+    """
+    Get Metrics Function
+
+    Description:
+        - This function returns the counters of the process, by name.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `metrics (dict[str, int])`: The counters.
+
+    """
+
+    with _lock:
+        return dict(sorted(_counters.items()))
+
+
+def reset_metrics() -> None:
+    """
+    Reset Metrics Function
+
+    Description:
+        - This function sets every counter of the process back to zero.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `None`
+
+    """
+
+    with _lock:
+        _counters.clear()
@@ -0,0 +1,256 @@
+"""
+Pollster Middleware Module
+
+Description:
+    - This module contains the middleware of the pollster project.
+    - The fast path variants of the session, authentication and message
+    middleware skip their work for anonymous read-only requests to the routes
+    listed in `FAST_PATH_ROUTES`.
+    - The profiling middleware profiles requests on demand, see
+    `pollster.profiling`.
+    - The memory tracking middleware measures the allocations of a sample of
+    the views when memory tracking is enabled, see `pollster.memory`.
+    - The compression middleware compresses responses with gzip or brotli,
+    see `pollster.compression`.
+
+"""
+
+import random
+import re
+from collections.abc import Callable
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpRequest, HttpResponse
+
+from .compression import compress_response
+from .memory import MemoryReport, track
+from .memory import get_config as get_memory_config
+from .profiling import get_trigger, profile_request
+
+FAST_PATH_METHODS: frozenset[str] = frozenset({"GET", "HEAD"})
+
+
+@lru_cache(maxsize=8)
+def _compile(patterns: tuple[str, ...]) -> re.Pattern[str] | None:
+    if not patterns:
+        return None
+
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
+
+
+def is_fast_path(request: HttpRequest) -> bool:
+    """
+    Is Fast Path Function
+
+    Description:
+        - This function checks if a request can skip the session,
+        authentication and message work.
+        - That is the case for GET and HEAD requests without a session
+        cookie whose path matches one of the `FAST_PATH_ROUTES` patterns.
+        - The result is stored on the request, so it is computed once.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+
+    Returns:
+        - `bool`: True if the request takes the fast path.
+
+    """
+
+    try:
+        return request._fast_path  # type: ignore
+
+    except AttributeError:
+        pattern: re.Pattern[str] | None = _compile(
+            patterns=tuple(getattr(settings, "FAST_PATH_ROUTES", ()))
+        )
+        request._fast_path = bool(  # type: ignore
+            pattern is not None
+            and request.method in FAST_PATH_METHODS
+            and settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and pattern.match(request.path_info)
+        )
+
+        return request._fast_path  # type: ignore
+
+
+class FastPathSessionMiddleware(SessionMiddleware):
+    """
+    Fast Path Session Middleware
+
+    Description:
+        - This middleware doesn't attach a session to fast path requests.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `process_request(self, request: HttpRequest) -> None`
+        - `process_response(self, request: HttpRequest, response:
+        HttpResponse) -> HttpResponse`
+
+    """
+
+    def process_request(self, request: HttpRequest) -> None:
+        if not is_fast_path(request=request):
+            super().process_request(request)
+
+    def process_response(
+        self, request: HttpRequest, response: HttpResponse
+    ) -> HttpResponse:
+        if is_fast_path(request=request):
+            return response
+
+        return super().process_response(request, response)
+
+
+class FastPathAuthenticationMiddleware(AuthenticationMiddleware):
+    """
+    Fast Path Authentication Middleware
+
+    Description:
+        - This middleware marks fast path requests as anonymous without
+        looking at the session.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `process_request(self, request: HttpRequest) -> None`
+
+    """
+
+    def process_request(self, request: HttpRequest) -> None:
+        if is_fast_path(request=request):
+            request.user = AnonymousUser()
+            return
+
+        super().process_request(request)
+
+
+class FastPathMessageMiddleware(MessageMiddleware):
+    """
+    Fast Path Message Middleware
+
+    Description:
+        - This middleware doesn't attach a message storage to fast path
+        requests. Without a session there are no messages to show.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `process_request(self, request: HttpRequest) -> None`
+
+    """
+
+    def process_request(self, request: HttpRequest) -> None:
+        if not is_fast_path(request=request):
+            super().process_request(request)
+
+
+class ProfilingMiddleware:
+    """
+    Profiling Middleware
+
+    Description:
+        - This middleware profiles the requests that carry a signed
+        profiling header or are picked by the sample rate, and passes every
+        other request through untouched.
+        - It should come right after the security middleware, so the profile
+        covers the rest of the stack.
+
+    Attributes:
+        - `get_response (Callable)`: The rest of the middleware stack.
+
+    Methods:
+        - `__call__(self, request: HttpRequest) -> HttpResponse`
+
+    """
+
+    def __init__(
+        self, get_response: Callable[[HttpRequest], HttpResponse]
+    ) -> None:
+        self.get_response: Callable[[HttpRequest], HttpResponse] = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        trigger: str | None = get_trigger(request=request)
+        if trigger is None:
+            return self.get_response(request)
+
+        return profile_request(
+            request=request, get_response=self.get_response, trigger=trigger
+        )
+
+
+class MemoryTrackingMiddleware:
+    """
+    Memory Tracking Middleware
+
+    Description:
+        - This middleware measures the peak and retained allocations of the
+        requests picked by the sample rate, labelled with their view, when
+        the `MEMORY_TRACKING` setting enables it. Other requests pass
+        through untouched.
+
+    Attributes:
+        - `get_response (Callable)`: The rest of the middleware stack.
+
+    Methods:
+        - `__call__(self, request: HttpRequest) -> HttpResponse`
+
+    """
+
+    def __init__(
+        self, get_response: Callable[[HttpRequest], HttpResponse]
+    ) -> None:
+        self.get_response: Callable[[HttpRequest], HttpResponse] = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        config: dict[str, Any] = get_memory_config()
+        if not config["ENABLED"] or random.random() >= config["SAMPLE_RATE"]:
+            return self.get_response(request)
+
+        report: MemoryReport
+        with track(label=f"{request.method} {request.path}") as report:
+            response: HttpResponse = self.get_response(request)
+
+            if request.resolver_match is not None:
+                report.label = f"view {request.resolver_match.view_name}"
+
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Compression Middleware
+
+    Description:
+        - This middleware compresses the responses of the rest of the stack,
+        streaming ones included, see `pollster.compression`.
+        - It should come before any middleware that reads or changes the
+        response body, so the body is compressed last.
+
+    Attributes:
+        - `get_response (Callable)`: The rest of the middleware stack.
+
+    Methods:
+        - `__call__(self, request: HttpRequest) -> HttpResponse`
+
+    """
+
+    def __init__(
+        self, get_response: Callable[[HttpRequest], HttpResponse]
+    ) -> None:
+        self.get_response: Callable[[HttpRequest], HttpResponse] = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        return compress_response(  # type: ignore
+            request=request, response=self.get_response(request)
+        )
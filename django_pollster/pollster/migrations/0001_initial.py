@@ -0,0 +1,30 @@
+# Generated by Django 5.1 on 2026-10-18 23:30
+
+import django.contrib.auth.models
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Role",
+            fields=[],
+            options={
+                "verbose_name": "Role",
+                "verbose_name_plural": "Roles",
+                "proxy": True,
+                "indexes": [],
+                "constraints": [],
+            },
+            bases=("auth.group",),
+            managers=[
+                ("objects", django.contrib.auth.models.GroupManager()),
+            ],
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1 on 2026-10-19 01:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pollster", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RequestProfile",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("request_id", models.CharField(max_length=64, unique=True)),
+                ("method", models.CharField(max_length=10)),
+                ("path", models.CharField(max_length=2000)),
+                ("view_name", models.CharField(blank=True, max_length=200)),
+                ("status_code", models.PositiveSmallIntegerField()),
+                (
+                    "trigger",
+                    models.CharField(
+                        choices=[
+                            ("header", "Signed header"),
+                            ("sample", "Sampled"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("duration_ms", models.FloatField()),
+                ("query_count", models.PositiveIntegerField()),
+                ("sql", models.JSONField(default=list)),
+                ("profile", models.TextField()),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, db_index=True),
+                ),
+            ],
+        ),
+    ]
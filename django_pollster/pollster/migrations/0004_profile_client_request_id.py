@@ -0,0 +1,17 @@
+# Generated by Django 5.1 on 2026-10-19 14:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("pollster", "0003_task"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="requestprofile",
+            name="client_request_id",
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
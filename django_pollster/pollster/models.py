@@ -0,0 +1,147 @@
+"""
+Pollster Models Module
+
+Description:
+    - This module contains the models for the pollster app.
+
+"""
+
+from django.db import models
+from django.utils import timezone
+
+
+class RequestProfile(models.Model):
+    """
+    Request Profile Model
+
+    Description:
+        - This class represents the profile of one request, recorded by the
+        profiling middleware.
+
+    Attributes:
+        - `request_id (CharField)`: The id of the profile, generated by the
+        server.
+        - `client_request_id (CharField)`: The X-Request-Id header of the
+        request, kept as a label only.
+        - `method (CharField)`: The HTTP method.
+        - `path (CharField)`: The requested path.
+        - `view_name (CharField)`: The name of the resolved URL pattern.
+        - `status_code (PositiveSmallIntegerField)`: The response status.
+        - `trigger (CharField)`: What started the profile.
+        - `duration_ms (FloatField)`: The time spent in the view stack.
+        - `query_count (PositiveIntegerField)`: The number of SQL queries.
+        - `sql (JSONField)`: The SQL queries with their durations.
+        - `profile (TextField)`: The profiler statistics.
+        - `created_at (DateTimeField)`: The time of the request.
+
+    Methods:
+        - `__str__(self) -> str`
+
+    """
+
+    TRIGGERS: list[tuple[str, str]] = [
+        ("header", "Signed header"),
+        ("sample", "Sampled"),
+    ]
+
+    request_id: models.CharField = models.CharField(max_length=64, unique=True)
+    client_request_id: models.CharField = models.CharField(
+        max_length=64, blank=True
+    )
+    method: models.CharField = models.CharField(max_length=10)
+    path: models.CharField = models.CharField(max_length=2_000)
+    view_name: models.CharField = models.CharField(max_length=2_00, blank=True)
+    status_code: models.PositiveSmallIntegerField = (
+        models.PositiveSmallIntegerField()
+    )
+    trigger: models.CharField = models.CharField(
+        max_length=10, choices=TRIGGERS
+    )
+    duration_ms: models.FloatField = models.FloatField()
+    query_count: models.PositiveIntegerField = models.PositiveIntegerField()
+    sql: models.JSONField = models.JSONField(default=list)
+    profile: models.TextField = models.TextField()
+    created_at: models.DateTimeField = models.DateTimeField(
+        auto_now_add=True, db_index=True
+    )
+
+    def __str__(self) -> str:
+        return f"{self.method} {self.path} ({self.request_id})"
+
+
+class Task(models.Model):
+    """
+    Task Model
+
+    Description:
+        - This class represents one unit of deferred work in the task queue,
+        see `pollster.tasks`.
+        - Workers claim queued tasks whose `run_at` has passed, highest
+        priority first, and hold them for a lease. A task whose lease
+        expired is claimed again, so the work of a crashed worker is not
+        lost.
+
+    Attributes:
+        - `name (CharField)`: The dotted path of the task function.
+        - `kwargs (JSONField)`: The keyword arguments of the call.
+        - `priority (SmallIntegerField)`: Higher priorities run first.
+        - `status (CharField)`: The state of the task.
+        - `attempts (PositiveSmallIntegerField)`: The runs started so far.
+        - `max_attempts (PositiveSmallIntegerField)`: The runs allowed
+        before the task fails.
+        - `run_at (DateTimeField)`: When the task may run next.
+        - `locked_by (CharField)`: The worker holding the task.
+        - `locked_until (DateTimeField)`: When the lease of the worker ends.
+        - `last_error (TextField)`: The traceback of the last failed run.
+        - `created_at (DateTimeField)`: When the task was queued.
+        - `finished_at (DateTimeField)`: When the task succeeded or failed.
+
+    Methods:
+        - `__str__(self) -> str`
+
+    """
+
+    QUEUED: str = "queued"
+    RUNNING: str = "running"
+    DONE: str = "done"
+    FAILED: str = "failed"
+    STATUSES: list[tuple[str, str]] = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    name: models.CharField = models.CharField(max_length=2_00)
+    kwargs: models.JSONField = models.JSONField(default=dict, blank=True)
+    priority: models.SmallIntegerField = models.SmallIntegerField(default=0)
+    status: models.CharField = models.CharField(
+        max_length=10, choices=STATUSES, default=QUEUED
+    )
+    attempts: models.PositiveSmallIntegerField = (
+        models.PositiveSmallIntegerField(default=0)
+    )
+    max_attempts: models.PositiveSmallIntegerField = (
+        models.PositiveSmallIntegerField(default=3)
+    )
+    run_at: models.DateTimeField = models.DateTimeField(default=timezone.now)
+    locked_by: models.CharField = models.CharField(max_length=1_00, blank=True)
+    locked_until: models.DateTimeField = models.DateTimeField(
+        null=True, blank=True
+    )
+    last_error: models.TextField = models.TextField(blank=True)
+    created_at: models.DateTimeField = models.DateTimeField(auto_now_add=True)
+    finished_at: models.DateTimeField = models.DateTimeField(
+        null=True, blank=True
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["status", "-priority", "run_at"],
+                name="pollster_task_claim_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.name} ({self.status})"
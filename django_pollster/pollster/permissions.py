@@ -0,0 +1,275 @@
+"""
+Pollster Permissions Module
+
+Description:
+    - This module contains the versioned permission cache of the pollster
+    app.
+    - Every user, every role and the permission table itself have a version
+    token in the `PERMISSION_CACHE` cache. Cached entries are keyed by those
+    tokens, so bumping a token invalidates every entry built from it without
+    having to find and delete them.
+    - Tokens and entries expire after `PERMISSION_CACHE_TIMEOUT` seconds, 5
+    minutes by default. With a cache shared by every process, a bump is
+    seen at once. With a per-process cache such as `LocMemCache`, a bump only
+    reaches the process that made it, and the other processes keep serving
+    their entries until they expire: the timeout bounds how long a revoked
+    permission stays granted there.
+
+"""
+
+from collections.abc import Iterable
+from time import time_ns
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.core.cache import BaseCache, caches
+
+PREFIX: str = "pollster:perms"
+GLOBAL: str = "global"
+TIMEOUT: int = 5 * 60
+
+
+def _cache() -> BaseCache:
+    return caches[getattr(settings, "PERMISSION_CACHE", "default")]
+
+
+def _timeout() -> int:
+    return getattr(settings, "PERMISSION_CACHE_TIMEOUT", TIMEOUT)
+
+
+def _version_key(kind: str, pk: Any = "") -> str:
+    return f"{PREFIX}:{kind}:{pk}:version"
+
+
+def _versions(keys: list[str]) -> dict[str, int]:
+    """
+    Returns the version tokens of `keys`, creating the missing ones with a
+    fresh token so that entries cached under an evicted token never match.
+    """
+
+    cache: BaseCache = _cache()
+    versions: dict[str, int] = cache.get_many(keys=keys)
+    missing: dict[str, int] = {
+        key: time_ns() for key in keys if key not in versions
+    }
+
+    if missing:
+        cache.set_many(data=missing, timeout=_timeout())
+        versions |= missing
+
+    return versions
+
+
+def _version(kind: str, pk: Any = "") -> int:
+    key: str = _version_key(kind=kind, pk=pk)
+    return _versions(keys=[key])[key]
+
+
+def bump(kind: str, pks: Iterable[Any] = ("",)) -> None:
+    """
+    Bump Function
+
+    Description:
+        - This function invalidates the cached permissions of the given
+        users or roles by giving them a new version token.
+
+    Args:
+        - `kind (str)`: Either "user", "role" or "global".  **(Required)**
+        - `pks (Iterable[Any])`: The ids to invalidate.  **(Optional)**
+
+    Returns:
+        - `None`
+
+    """
+
+    token: int = time_ns()
+    _cache().set_many(
+        data={_version_key(kind=kind, pk=pk): token for pk in pks},
+        timeout=_timeout(),
+    )
+
+
+def _labels(rows: Iterable[tuple[str, str]]) -> set[str]:
+    return {f"{app_label}.{codename}" for app_label, codename in rows}
+
+
+def get_all_permissions() -> set[str]:
+    """
+    Get All Permissions Function
+
+    Description:
+        - This function returns every permission, as granted to superusers.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `permissions (set[str])`: The permission labels.
+
+    """
+
+    cache: BaseCache = _cache()
+    key: str = f"{PREFIX}:all:{_version(kind=GLOBAL)}"
+
+    permissions: set[str] | None = cache.get(key=key)
+    if permissions is None:
+        permissions = _labels(
+            rows=Permission.objects.values_list(
+                "content_type__app_label", "codename"
+            )
+        )
+        cache.set(key=key, value=permissions, timeout=_timeout())
+
+    return permissions
+
+
+def get_user_permissions(user: Any) -> set[str]:
+    """
+    Get User Permissions Function
+
+    Description:
+        - This function returns the permissions granted directly to a user.
+
+    Args:
+        - `user (AbstractUser)`: The user.  **(Required)**
+
+    Returns:
+        - `permissions (set[str])`: The permission labels.
+
+    """
+
+    cache: BaseCache = _cache()
+    keys: list[str] = [
+        _version_key(kind=GLOBAL),
+        _version_key(kind="user", pk=user.pk),
+    ]
+    versions: dict[str, int] = _versions(keys=keys)
+    key: str = f"{PREFIX}:user:{user.pk}:" + ":".join(
+        str(versions[version_key]) for version_key in keys
+    )
+
+    permissions: set[str] | None = cache.get(key=key)
+    if permissions is None:
+        permissions = _labels(
+            rows=user.user_permissions.values_list(
+                "content_type__app_label", "codename"
+            )
+        )
+        cache.set(key=key, value=permissions, timeout=_timeout())
+
+    return permissions
+
+
+def get_user_role_ids(user: Any) -> frozenset[int]:
+    """
+    Get User Role Ids Function
+
+    Description:
+        - This function returns the ids of the roles of a user.
+
+    Args:
+        - `user (AbstractUser)`: The user.  **(Required)**
+
+    Returns:
+        - `role_ids (frozenset[int])`: The role ids.
+
+    """
+
+    cache: BaseCache = _cache()
+    key: str = (
+        f"{PREFIX}:user:{user.pk}:roles:{_version(kind='user', pk=user.pk)}"
+    )
+
+    role_ids: frozenset[int] | None = cache.get(key=key)
+    if role_ids is None:
+        role_ids = frozenset(user.groups.values_list("id", flat=True))
+        cache.set(key=key, value=role_ids, timeout=_timeout())
+
+    return role_ids
+
+
+def get_role_permissions(role_ids: Iterable[int]) -> set[str]:
+    """
+    Get Role Permissions Function
+
+    Description:
+        - This function returns the union of the permissions of the given
+        roles.
+        - Roles missing from the cache are loaded together with one query.
+
+    Args:
+        - `role_ids (Iterable[int])`: The role ids.  **(Required)**
+
+    Returns:
+        - `permissions (set[str])`: The permission labels.
+
+    """
+
+    role_ids = list(role_ids)
+    if not role_ids:
+        return set()
+
+    cache: BaseCache = _cache()
+    global_key: str = _version_key(kind=GLOBAL)
+    versions: dict[str, int] = _versions(
+        keys=[global_key]
+        + [_version_key(kind="role", pk=role_id) for role_id in role_ids]
+    )
+    keys: dict[int, str] = {
+        role_id: f"{PREFIX}:role:{role_id}:{versions[global_key]}:"
+        f"{versions[_version_key(kind='role', pk=role_id)]}"
+        for role_id in role_ids
+    }
+
+    cached: dict[str, set[str]] = cache.get_many(keys=keys.values())
+    missing: list[int] = [
+        role_id for role_id, key in keys.items() if key not in cached
+    ]
+
+    if missing:
+        loaded: dict[int, set[str]] = {role_id: set() for role_id in missing}
+        for role_id, app_label, codename in Permission.objects.filter(
+            group__id__in=missing
+        ).values_list("group__id", "content_type__app_label", "codename"):
+            loaded[role_id].add(f"{app_label}.{codename}")
+
+        fresh: dict[str, set[str]] = {
+            keys[role_id]: permissions
+            for role_id, permissions in loaded.items()
+        }
+        cache.set_many(data=fresh, timeout=_timeout())
+        cached |= fresh
+
+    return set().union(*cached.values())
+
+
+def get_permission_choices() -> list[tuple[int, str]]:
+    """
+    Get Permission Choices Function
+
+    Description:
+        - This function returns the choices of the role permission picker.
+        - They are built once per permission table version instead of on
+        every change form.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `choices (list[tuple[int, str]])`: The permission ids and labels.
+
+    """
+
+    cache: BaseCache = _cache()
+    key: str = f"{PREFIX}:choices:{_version(kind=GLOBAL)}"
+
+    choices: list[tuple[int, str]] | None = cache.get(key=key)
+    if choices is None:
+        choices = [
+            (permission.pk, str(permission))
+            for permission in Permission.objects.select_related("content_type")
+        ]
+        cache.set(key=key, value=choices, timeout=_timeout())
+
+    return choices
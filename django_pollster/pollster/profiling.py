@@ -0,0 +1,285 @@
+"""
+Pollster Profiling Module
+
+Description:
+    - This module contains the on-demand request profiler of the pollster
+    project.
+    - A request is profiled when it carries a header signed with the
+    `SECRET_KEY`, created with the `profiling_token` command, or when it is
+    picked by the sample rate. Its call profile and SQL trace are stored as a
+    `RequestProfile` under an id generated by the server, and shown in the
+    admin. The X-Request-Id header of the client is kept as a label only, so
+    a client can't overwrite another profile.
+    - Profiles older than the retention are deleted by the `prune_profiles`
+    command.
+
+"""
+
+import cProfile
+import pstats
+import random
+from collections.abc import Callable
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from io import StringIO
+from time import perf_counter
+from typing import Any
+from uuid import uuid4
+
+from django.conf import settings
+from django.core import signing
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from django.utils import timezone
+
+from .models import RequestProfile
+
+DEFAULTS: dict[str, Any] = {
+    # The header carrying the signed token, as sent by the client.
+    "HEADER": "X-Profile",
+    # The share of requests profiled without a token, from 0.0 to 1.0.
+    "SAMPLE_RATE": 0.0,
+    # How long a signed token stays valid, in seconds.
+    "MAX_AGE": 60 * 60,
+    "SALT": "pollster.profiling",
+    # The number of functions and queries kept per profile.
+    "STATS_LIMIT": 60,
+    "SQL_LIMIT": 500,
+    # How long profiles are kept by `prune_profiles`, in seconds.
+    "RETENTION": 7 * 24 * 60 * 60,
+}
+
+
+def get_config() -> dict[str, Any]:
+    """
+    Get Config Function
+
+    Description:
+        - This function returns the profiling configuration, with the
+        `PROFILING` setting applied over the defaults.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `config (dict[str, Any])`: The profiling configuration.
+
+    """
+
+    return {**DEFAULTS, **getattr(settings, "PROFILING", {})}
+
+
+def sign_token(path_prefix: str = "/") -> str:
+    """
+    Sign Token Function
+
+    Description:
+        - This function returns a token that triggers profiling of requests
+        whose path starts with `path_prefix`.
+
+    Args:
+        - `path_prefix (str)`: The paths the token is valid for.
+        **(Optional)**
+
+    Returns:
+        - `token (str)`: The signed token.
+
+    """
+
+    return signing.TimestampSigner(salt=get_config()["SALT"]).sign(
+        value=path_prefix
+    )
+
+
+def get_trigger(request: HttpRequest) -> str | None:
+    """
+    Get Trigger Function
+
+    Description:
+        - This function decides if a request is profiled.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+
+    Returns:
+        - `trigger (str | None)`: "header" for a valid signed token, "sample"
+        for a sampled request, or None.
+
+    """
+
+    config: dict[str, Any] = get_config()
+    token: str | None = request.headers.get(config["HEADER"])
+
+    if token:
+        try:
+            path_prefix: str = signing.TimestampSigner(
+                salt=config["SALT"]
+            ).unsign(value=token, max_age=config["MAX_AGE"])
+
+        except signing.BadSignature:
+            return None
+
+        return "header" if request.path.startswith(path_prefix) else None
+
+    if config["SAMPLE_RATE"] and random.random() < config["SAMPLE_RATE"]:
+        return "sample"
+
+    return None
+
+
+class SQLRecorder:
+    """
+    SQL Recorder Class
+
+    Description:
+        - This class is a database execute wrapper that records every query
+        with its duration.
+
+    Attributes:
+        - `queries (list[dict[str, Any]])`: The recorded queries.
+        - `count (int)`: The number of queries, including those not kept.
+        - `limit (int)`: The number of queries kept.
+
+    Methods:
+        - `__call__(self, execute: Callable, sql: str, params: Any, many:
+        bool, context: dict[str, Any]) -> Any`
+
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.queries: list[dict[str, Any]] = []
+        self.count: int = 0
+        self.limit: int = limit
+
+    def __call__(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict[str, Any],
+    ) -> Any:
+        started: float = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+
+        finally:
+            self.count += 1
+            if len(self.queries) < self.limit:
+                self.queries.append(
+                    {
+                        "alias": context["connection"].alias,
+                        "sql": sql,
+                        "many": many,
+                        "ms": round((perf_counter() - started) * 1_000, 3),
+                    }
+                )
+
+
+def profile_request(
+    request: HttpRequest,
+    get_response: Callable[[HttpRequest], HttpResponse],
+    trigger: str,
+) -> HttpResponse:
+    """
+    Profile Request Function
+
+    Description:
+        - This function runs the rest of the middleware stack and the view
+        under `cProfile` while recording the SQL of every database, then
+        stores the result and returns the response with an
+        `X-Profile-Id` header.
+        - If another profiler is already active in the thread, the request
+        runs unprofiled.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+        - `get_response (Callable)`: The rest of the middleware stack.
+        **(Required)**
+        - `trigger (str)`: What started the profile.  **(Required)**
+
+    Returns:
+        - `response (HttpResponse)`: The response object.
+
+    """
+
+    config: dict[str, Any] = get_config()
+    profiler: cProfile.Profile = cProfile.Profile()
+    recorder: SQLRecorder = SQLRecorder(limit=config["SQL_LIMIT"])
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+
+        started: float = perf_counter()
+        try:
+            profiler.enable()
+
+        except ValueError:
+            return get_response(request)
+
+        try:
+            response: HttpResponse = get_response(request)
+
+        finally:
+            profiler.disable()
+            duration: float = (perf_counter() - started) * 1_000
+
+    stream: StringIO = StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats(
+        pstats.SortKey.CUMULATIVE
+    ).print_stats(config["STATS_LIMIT"])
+
+    request_id: str = uuid4().hex
+    RequestProfile.objects.create(  # pylint: disable=no-member
+        request_id=request_id,
+        client_request_id=request.headers.get("X-Request-Id", "")[:64],
+        method=request.method or "",
+        path=request.path[:2_000],
+        view_name=getattr(request.resolver_match, "view_name", "") or "",
+        status_code=response.status_code,
+        trigger=trigger,
+        duration_ms=round(duration, 3),
+        query_count=recorder.count,
+        sql=recorder.queries,
+        profile=stream.getvalue(),
+    )
+    response.headers["X-Profile-Id"] = request_id
+
+    return response
+
+
+def prune_profiles(batch_size: int = 1_000) -> int:
+    """
+    Prune Profiles Function
+
+    Description:
+        - This function deletes the profiles older than the retention, in
+        batches of primary keys so each statement stays small.
+
+    Args:
+        - `batch_size (int)`: The number of profiles deleted per statement.
+        **(Optional)**
+
+    Returns:
+        - `deleted (int)`: The number of deleted profiles.
+
+    """
+
+    before: datetime = timezone.now() - timedelta(
+        seconds=get_config()["RETENTION"]
+    )
+    deleted: int = 0
+
+    while True:
+        pks: list[int] = list(
+            RequestProfile.objects.filter(  # pylint: disable=no-member
+                created_at__lt=before
+            ).values_list("pk", flat=True)[:batch_size]
+        )
+        if not pks:
+            return deleted
+
+        deleted += RequestProfile.objects.filter(  # pylint: disable=no-member
+            pk__in=pks
+        ).delete()[0]
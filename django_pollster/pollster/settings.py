@@ -59,14 +59,25 @@ INSTALLED_APPS: list[str] = [
 
 MIDDLEWARE: list[str] = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    "pollster.middleware.ProfilingMiddleware",
+    "pollster.middleware.MemoryTrackingMiddleware",
+    "pollster.middleware.CompressionMiddleware",
+    "pollster.middleware.FastPathSessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "pollster.middleware.FastPathAuthenticationMiddleware",
+    "pollster.middleware.FastPathMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Anonymous GET and HEAD requests to these paths skip the session,
+# authentication and message middleware.
+FAST_PATH_ROUTES: list[str] = [
+    r"^/polls/$",
+    r"^/polls/\d+/$",
+    r"^/polls/\d+/results/$",
+]
+
 ROOT_URLCONF: str = "pollster.urls"
 
 TEMPLATES: list[dict[str, str | list[Path] | bool | dict[str, list[str]]]] = [
@@ -111,6 +122,114 @@ if env.str(var="DATABASE", default=None):  # type: ignore
         }
     }
 
+# Shards of the polls app, see django_polls.sharding, only defined while
+# SHARDING is on. Each shard is a copy of the default database: another SQLite
+# file locally, another database on the same server otherwise. The test suite
+# runs once without and once with SHARDING=True, see the django-polls README.
+SHARDING: bool = env.bool(var="SHARDING", default=False)  # type: ignore
+
+if SHARDING:
+    for index in range(
+        1, env.int(var="DB_SHARDS", default=2) + 1  # type: ignore
+    ):
+        DATABASES[f"shard_{index}"] = {
+            **DATABASES["default"],
+            "NAME": (
+                BASE_DIR / f"db_shard_{index}.sqlite3"
+                if DATABASES["default"]["ENGINE"].endswith("sqlite3")
+                else f"{DATABASES['default']['NAME']}_shard_{index}"
+            ),
+        }
+
+DATABASE_ROUTERS: list[str] = (
+    ["django_polls.sharding.ShardRouter"] if SHARDING else []
+)
+
+POLLS_SHARDS: list[str] = list(DATABASES)
+
+# Every process that creates questions on the shards needs a distinct worker
+# id, from 0 to 1023, for the ids it hands out.
+POLLS_WORKER_ID: int | None = env.int(
+    var="POLLS_WORKER_ID", default=None  # type: ignore
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/ref/settings/#caches
+
+CACHES: dict[str, dict[str, str | dict[str, int]]] = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pollster-default",
+    },
+    "sessions": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "pollster-sessions",
+        "OPTIONS": {"MAX_ENTRIES": 50_000},
+    },
+}
+
+# With several workers per host, SHARED_CACHE_DIR keeps both caches in
+# memory-mapped files shared by those workers instead of one copy each.
+# Compare the backends with `benchmark_cache`. The default cache holds detail
+# pages and frozen results, some 4 KiB for 20 choices, in 32 KiB slots;
+# sessions are small. Entries too large for a slot are counted in the
+# "cache.oversize" metric.
+if env.str(var="SHARED_CACHE_DIR", default=None):  # type: ignore
+    CACHES = {
+        alias: {
+            "BACKEND": "pollster.cache.SharedMemoryCache",
+            "LOCATION": str(
+                Path(env.str(var="SHARED_CACHE_DIR")) / f"pollster-{alias}"
+            ),
+            "OPTIONS": {"SIZE": size, "SLOT_SIZE": slot_size},
+        }
+        for alias, size, slot_size in (
+            ("default", 256 * 1024 * 1024, 32 * 1024),
+            ("sessions", 32 * 1024 * 1024, 4 * 1024),
+        )
+    }
+
+
+# Cached permissions expire after this many seconds, which bounds how long a
+# revoked permission stays granted in processes whose cache isn't shared.
+PERMISSION_CACHE_TIMEOUT: int = env.int(
+    var="PERMISSION_CACHE_TIMEOUT", default=5 * 60  # type: ignore
+)
+
+# Sessions
+# https://docs.djangoproject.com/en/5.1/topics/http/sessions/
+#
+# Voters only need a small session, so the database session table is kept out
+# of the vote path:
+#   - "signed_cookies" keeps the whole session in the cookie.
+#   - "cached_db" reads sessions from the "sessions" cache and only falls back
+#     to the database on a miss. With several workers per host, point the
+#     "sessions" cache at a cache shared by those workers.
+#   - "db" is Django's default database backend.
+# Expired database sessions are removed with `clear_expired_sessions`.
+
+SESSION_ENGINE: str = {
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "db": "django.contrib.sessions.backends.db",
+}[
+    env.str(
+        var="SESSION_BACKEND",
+        default="cached_db",  # type: ignore
+    )
+]
+
+SESSION_CACHE_ALIAS: str = "sessions"
+
+
+# Authentication
+# https://docs.djangoproject.com/en/5.1/ref/settings/#authentication-backends
+
+AUTHENTICATION_BACKENDS: list[str] = [
+    "pollster.backends.CachedModelBackend",
+]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -174,7 +293,93 @@ if not TESTING:
         *INSTALLED_APPS,
         "debug_toolbar",
     ]
+    # The toolbar only shows on uncompressed pages, so it goes right after
+    # the compression middleware.
+    _compression: int = MIDDLEWARE.index(
+        "pollster.middleware.CompressionMiddleware"
+    )
     MIDDLEWARE = [
+        *MIDDLEWARE[: _compression + 1],
         "debug_toolbar.middleware.DebugToolbarMiddleware",
-        *MIDDLEWARE,
+        *MIDDLEWARE[_compression + 1 :],
     ]
+
+
+# Response compression
+# HTML, JSON and other text responses are compressed with brotli, when the
+# brotli package is installed, or gzip; see pollster.compression for the
+# defaults. Pages carrying a CSRF token are never compressed (BREACH).
+COMPRESSION: dict[str, int] = {
+    "MIN_LENGTH": env.int(
+        var="COMPRESSION_MIN_LENGTH", default=500  # type: ignore
+    ),
+}
+
+
+# Polls vote throttling
+POLLS_VOTE_THROTTLE: dict[str, str | float | int] = {
+    "BACKEND": env.str(
+        var="POLLS_THROTTLE_BACKEND",
+        default="memory",  # type: ignore
+    ),
+    "RATE": env.float(var="POLLS_THROTTLE_RATE", default=1.0),  # type: ignore
+    "BURST": env.int(var="POLLS_THROTTLE_BURST", default=10),  # type: ignore
+}
+
+
+# Polls cache warm-up
+# With POLLS_WARMUP_ON_READY set, every server process warms the polls caches
+# in a background thread as it starts, like the `warm_polls_cache` command
+# does. The WSGI and ASGI entry points start it; management commands don't.
+POLLS_WARMUP_ON_READY: bool = env.bool(
+    var="POLLS_WARMUP_ON_READY", default=False  # type: ignore
+)
+POLLS_WARMUP_TOP: int = env.int(
+    var="POLLS_WARMUP_TOP", default=50  # type: ignore
+)
+
+
+# On-demand request profiling
+# Requests carrying a token from `profiling_token` in the X-Profile header, or
+# picked by the sample rate, are profiled and listed in the admin. Run the
+# `prune_profiles` command periodically to delete those past the retention.
+PROFILING: dict[str, str | float | int] = {
+    "SAMPLE_RATE": env.float(
+        var="PROFILING_SAMPLE_RATE", default=0.0  # type: ignore
+    ),
+    "RETENTION": env.int(
+        var="PROFILING_RETENTION", default=7 * 24 * 60 * 60  # type: ignore
+    ),
+}
+
+
+# Memory tracking
+# With MEMORY_TRACKING set, the sampled views, the management commands
+# decorated with `pollster.memory.track_command` and the commands of the polls
+# app log their peak and retained allocations to the "pollster.memory" logger,
+# with a warning and the top allocation sites when the retained memory exceeds
+# the budget.
+MEMORY_TRACKING: dict[str, bool | float | int] = {
+    "ENABLED": env.bool(var="MEMORY_TRACKING", default=False),  # type: ignore
+    "SAMPLE_RATE": env.float(
+        var="MEMORY_SAMPLE_RATE", default=0.01  # type: ignore
+    ),
+    "BUDGET": env.int(
+        var="MEMORY_BUDGET", default=8 * 1024 * 1024  # type: ignore
+    ),
+}
+
+# The polls commands run inside this context manager.
+POLLS_COMMAND_WRAPPER: str = "pollster.memory.track"
+
+
+# Task queue
+# Slow work is queued with `pollster.tasks.enqueue` and run by the
+# `task_worker` command; see pollster.tasks for the defaults.
+TASK_QUEUE: dict[str, float | int] = {
+    "LEASE": env.int(var="TASK_LEASE", default=5 * 60),  # type: ignore
+    "HEARTBEAT": env.int(var="TASK_HEARTBEAT", default=60),  # type: ignore
+    "POLL_INTERVAL": env.float(
+        var="TASK_POLL_INTERVAL", default=1.0  # type: ignore
+    ),
+}
@@ -0,0 +1,141 @@
+"""
+Pollster Signals Module
+
+Description:
+    - This module contains the signal receivers for the pollster app.
+    - Receivers are connected when the app registry is ready.
+    - Cached permissions are invalidated once the change commits, so a
+    request reading the rows before the commit can't cache the old
+    permissions under the new version token.
+
+"""
+
+from collections.abc import Iterable
+from typing import Any
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import permissions
+
+User = get_user_model()
+
+
+def _bump_on_commit(
+    kind: str, using: str | None, pks: Iterable[Any] = ("",)
+) -> None:
+    """
+    Bumps the version tokens of some users or roles once the transaction
+    commits.
+    """
+
+    pks = list(pks)
+    transaction.on_commit(
+        func=lambda: permissions.bump(kind=kind, pks=pks), using=using
+    )
+
+
+@receiver(signal=m2m_changed, sender=User.groups.through)
+@receiver(signal=m2m_changed, sender=User.user_permissions.through)
+@receiver(signal=m2m_changed, sender=Group.permissions.through)
+def invalidate_permission_relations(
+    sender: Any,
+    instance: Any,
+    action: str,
+    reverse: bool,
+    pk_set: set[Any] | None,
+    **kwargs: Any,
+) -> None:
+    """
+    Invalidate Permission Relations Receiver
+
+    Description:
+        - This receiver invalidates the cached permissions of the users and
+        roles whose group or permission relations changed.
+        - Clears are handled before they happen, while the affected rows can
+        still be read. The tokens are bumped when the change commits.
+
+    Args:
+        - `sender (Any)`: The through model.
+        - `instance (Any)`: The object whose relation changed.
+        - `action (str)`: The m2m action.
+        - `reverse (bool)`: Whether the relation changed from its reverse
+        side.
+        - `pk_set (set[Any] | None)`: The ids added or removed.
+        - `**kwargs (Any)`: The signal arguments.
+
+    Returns:
+        - `None`
+
+    """
+
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+
+    if sender is Group.permissions.through:
+        kind, source = "role", "group"
+    else:
+        kind, source = "user", User._meta.model_name
+
+    if not reverse:
+        _bump_on_commit(
+            kind=kind, using=kwargs.get("using"), pks=[instance.pk]
+        )
+        return
+
+    if action == "pre_clear":
+        target: str = instance._meta.concrete_model._meta.model_name
+        pk_set = set(
+            sender.objects.filter(**{f"{target}_id": instance.pk}).values_list(
+                f"{source}_id", flat=True
+            )
+        )
+
+    _bump_on_commit(kind=kind, using=kwargs.get("using"), pks=pk_set or ())
+
+
+@receiver(signal=post_delete, sender=Group)
+def invalidate_deleted_role(instance: Group, **kwargs: Any) -> None:
+    """
+    Invalidate Deleted Role Receiver
+
+    Description:
+        - This receiver invalidates the cached permissions of a deleted role.
+
+    Args:
+        - `instance (Group)`: The deleted role.
+        - `**kwargs (Any)`: The signal arguments.
+
+    Returns:
+        - `None`
+
+    """
+
+    _bump_on_commit(kind="role", using=kwargs.get("using"), pks=[instance.pk])
+
+
+@receiver(signal=post_save, sender=Permission)
+@receiver(signal=post_delete, sender=Permission)
+@receiver(signal=post_save, sender=ContentType)
+@receiver(signal=post_delete, sender=ContentType)
+def invalidate_permission_table(**kwargs: Any) -> None:
+    """
+    Invalidate Permission Table Receiver
+
+    Description:
+        - This receiver invalidates every cached permission set when a
+        permission or a content type changes.
+
+    Args:
+        - `**kwargs (Any)`: The signal arguments.
+
+    Returns:
+        - `None`
+
+    """
+
+    _bump_on_commit(kind=permissions.GLOBAL, using=kwargs.get("using"))
@@ -0,0 +1,538 @@
+"""
+Pollster Tasks Module
+
+Description:
+    - This module contains the task queue of the pollster project, which
+    moves slow work such as cache warm-ups, vote event relays or archiving
+    out of the request path without an external broker.
+    - Tasks are rows of the `Task` table naming a function by its dotted
+    path. Workers, started with the `task_worker` command, claim them
+    highest priority first and run them in a pool of threads or processes.
+    - On PostgreSQL, workers claim tasks with `SELECT ... FOR UPDATE SKIP
+    LOCKED`, so they never wait on each other. On SQLite, which has no row
+    locks, each task is claimed with an `UPDATE` conditional on the values
+    the worker read, and only the worker whose update changed the row owns
+    the task.
+    - A claimed task is leased for a while, and its worker extends the lease
+    while the task runs; a task whose worker died before the lease ended is
+    claimed again, or marked as failed once it used all its attempts. A
+    failed task is retried with an exponential backoff until it runs out of
+    attempts.
+
+"""
+
+import logging
+import os
+import socket
+import traceback
+from collections.abc import Callable
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from multiprocessing import get_context
+from time import perf_counter, sleep
+from typing import Any
+from uuid import uuid4
+
+import django
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q, QuerySet
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Task
+
+logger: logging.Logger = logging.getLogger(name="pollster.tasks")
+
+DEFAULTS: dict[str, Any] = {
+    # How long a worker owns a claimed task, in seconds, and how often it
+    # extends the leases of its running tasks.
+    "LEASE": 5 * 60,
+    "HEARTBEAT": 60,
+    # How long an idle worker waits before looking for tasks again.
+    "POLL_INTERVAL": 1.0,
+    # The delay before the first retry, doubled on each further one.
+    "BACKOFF": 5,
+    "MAX_BACKOFF": 60 * 60,
+}
+
+DONE: str = "done"
+RETRIED: str = "retried"
+FAILED: str = "failed"
+LOST: str = "lost"
+
+
+def get_config() -> dict[str, Any]:
+    """
+    Get Config Function
+
+    Description:
+        - This function returns the task queue configuration, with the
+        `TASK_QUEUE` setting applied over the defaults.
+
+    Args:
+        - `None`
+
+    Returns:
+        - `config (dict[str, Any])`: The task queue configuration.
+
+    """
+
+    return {**DEFAULTS, **getattr(settings, "TASK_QUEUE", {})}
+
+
+def enqueue(
+    func: Callable[..., Any] | str,
+    priority: int = 0,
+    delay: float = 0,
+    max_attempts: int = 3,
+    **kwargs: Any,
+) -> Task:
+    """
+    Enqueue Function
+
+    Description:
+        - This function queues a call of a function for the workers.
+        - The function must be importable by its dotted path and its keyword
+        arguments serializable to JSON.
+        - Inside a transaction, the task becomes visible to the workers when
+        the transaction commits, like the data it works on.
+
+    Args:
+        - `func (Callable[..., Any] | str)`: The function or its dotted path.
+        **(Required)**
+        - `priority (int)`: Higher priorities run first.  **(Optional)**
+        - `delay (float)`: The seconds to wait before running the task.
+        **(Optional)**
+        - `max_attempts (int)`: The runs allowed before the task fails.
+        **(Optional)**
+        - `**kwargs (Any)`: The keyword arguments of the call.
+        **(Optional)**
+
+    Returns:
+        - `task (Task)`: The queued task.
+
+    """
+
+    name: str = (
+        func if isinstance(func, str) else f"{func.__module__}.{func.__name__}"
+    )
+
+    return Task.objects.create(  # pylint: disable=no-member
+        name=name,
+        kwargs=kwargs,
+        priority=priority,
+        max_attempts=max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def _claimable(now: datetime) -> Q:
+    """
+    Returns the filter of the queued tasks that are due and of the running
+    tasks whose lease expired with attempts left.
+    """
+
+    return Q(status=Task.QUEUED, run_at__lte=now) | Q(
+        status=Task.RUNNING,
+        locked_until__lt=now,
+        attempts__lt=F("max_attempts"),
+    )
+
+
+def fail_abandoned(now: datetime) -> int:
+    """
+    Fail Abandoned Function
+
+    Description:
+        - This function marks as failed the running tasks whose lease
+        expired on their last attempt, as their worker died while running
+        them.
+
+    Args:
+        - `now (datetime)`: The current time.  **(Required)**
+
+    Returns:
+        - `failed (int)`: The number of failed tasks.
+
+    """
+
+    return Task.objects.filter(  # pylint: disable=no-member
+        status=Task.RUNNING,
+        locked_until__lt=now,
+        attempts__gte=F("max_attempts"),
+    ).update(
+        status=Task.FAILED,
+        locked_by="",
+        locked_until=None,
+        last_error="The lease of the last attempt expired.",
+        finished_at=now,
+    )
+
+
+def heartbeat(worker: str) -> int:
+    """
+    Heartbeat Function
+
+    Description:
+        - This function extends the leases of the tasks a worker is running,
+        so long tasks aren't claimed again while their worker is alive.
+
+    Args:
+        - `worker (str)`: The name of the worker.  **(Required)**
+
+    Returns:
+        - `extended (int)`: The number of extended leases.
+
+    """
+
+    return Task.objects.filter(  # pylint: disable=no-member
+        status=Task.RUNNING, locked_by=worker
+    ).update(
+        locked_until=timezone.now() + timedelta(seconds=get_config()["LEASE"])
+    )
+
+
+def claim(worker: str, limit: int = 1) -> list[Task]:
+    """
+    Claim Function
+
+    Description:
+        - This function leases up to `limit` due tasks to a worker, highest
+        priority first and oldest first within a priority, and counts the
+        attempt.
+        - Abandoned tasks without attempts left are marked as failed first.
+
+    Args:
+        - `worker (str)`: The name of the worker.  **(Required)**
+        - `limit (int)`: The most tasks to claim.  **(Optional)**
+
+    Returns:
+        - `tasks (list[Task])`: The claimed tasks.
+
+    """
+
+    now: datetime = timezone.now()
+    claimed: dict[str, Any] = {
+        "status": Task.RUNNING,
+        "locked_by": worker,
+        "locked_until": now + timedelta(seconds=get_config()["LEASE"]),
+        "attempts": F("attempts") + 1,
+    }
+    due: QuerySet[Task] = Task.objects.filter(  # pylint: disable=no-member
+        _claimable(now=now)
+    ).order_by("-priority", "run_at", "pk")
+    task_ids: list[int] = []
+
+    fail_abandoned(now=now)
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            task_ids = list(
+                due.select_for_update(skip_locked=True).values_list(
+                    "pk", flat=True
+                )[:limit]
+            )
+            Task.objects.filter(  # pylint: disable=no-member
+                pk__in=task_ids
+            ).update(**claimed)
+
+    else:
+        # Read a few more candidates than needed, as other workers may win
+        # some of them.
+        for pk, status, locked_until in due.values_list(
+            "pk", "status", "locked_until"
+        )[: limit * 2]:
+            if Task.objects.filter(  # pylint: disable=no-member
+                pk=pk, status=status, locked_until=locked_until
+            ).update(**claimed):
+                task_ids.append(pk)
+                if len(task_ids) == limit:
+                    break
+
+    return list(
+        Task.objects.filter(  # pylint: disable=no-member
+            pk__in=task_ids, locked_by=worker
+        ).order_by("-priority", "run_at", "pk")
+    )
+
+
+def execute(task_id: int, worker: str) -> str:
+    """
+    Execute Function
+
+    Description:
+        - This function runs a task claimed by a worker and records its
+        outcome. A failed task is queued again after a backoff, or marked as
+        failed once it used all its attempts.
+        - The outcome is only recorded while the worker still holds the
+        task, so a run that outlived its lease doesn't overwrite the run of
+        the worker that claimed it next.
+
+    Args:
+        - `task_id (int)`: The id of the task.  **(Required)**
+        - `worker (str)`: The name of the worker.  **(Required)**
+
+    Returns:
+        - `outcome (str)`: "done", "retried" or "failed", or "lost" when the
+        worker no longer held the task.
+
+    """
+
+    close_old_connections()
+
+    try:
+        task: Task | None = Task.objects.filter(  # pylint: disable=no-member
+            pk=task_id, locked_by=worker, status=Task.RUNNING
+        ).first()
+        if task is None:
+            return LOST
+
+        outcome: str = DONE
+        fields: dict[str, Any] = {
+            "status": Task.DONE,
+            "locked_by": "",
+            "locked_until": None,
+            "last_error": "",
+            "finished_at": timezone.now(),
+        }
+
+        try:
+            import_string(dotted_path=task.name)(**task.kwargs)
+
+        except Exception:  # pylint: disable=broad-exception-caught
+            config: dict[str, Any] = get_config()
+            fields["last_error"] = traceback.format_exc()
+
+            if task.attempts >= task.max_attempts:
+                outcome = FAILED
+                fields["status"] = Task.FAILED
+
+            else:
+                outcome = RETRIED
+                fields["status"] = Task.QUEUED
+                fields["finished_at"] = None
+                fields["run_at"] = timezone.now() + timedelta(
+                    seconds=min(
+                        config["BACKOFF"] * 2 ** (task.attempts - 1),
+                        config["MAX_BACKOFF"],
+                    )
+                )
+
+        if not Task.objects.filter(  # pylint: disable=no-member
+            pk=task_id, locked_by=worker, status=Task.RUNNING
+        ).update(**fields):
+            return LOST
+
+        return outcome
+
+    finally:
+        close_old_connections()
+
+
+def _outcome(future: Future[str]) -> str:
+    """
+    Returns the outcome of a run, or "lost" when the process running it
+    died; its lease will expire and another run will claim the task.
+    """
+
+    try:
+        return future.result()
+
+    except Exception:  # pylint: disable=broad-exception-caught
+        logger.exception("Task run failed")
+        return LOST
+
+
+@dataclass(slots=True)
+class WorkerStats:
+    """
+    Worker Stats Class
+
+    Description:
+        - This class holds the counts of one worker run.
+
+    Attributes:
+        - `claimed (int)`: The number of claimed tasks.
+        - `done (int)`: The number of tasks that succeeded.
+        - `retried (int)`: The number of runs that failed and were queued
+        again.
+        - `failed (int)`: The number of tasks that ran out of attempts.
+        - `lost (int)`: The number of runs that outlived their lease.
+        - `duration (float)`: The time the worker ran, in seconds.
+
+    Methods:
+        - `record(self, outcome: str) -> None`
+        - `throughput(self) -> float`
+        - `format(self) -> str`
+
+    """
+
+    claimed: int = 0
+    done: int = 0
+    retried: int = 0
+    failed: int = 0
+    lost: int = 0
+    duration: float = 0.0
+
+    def record(self, outcome: str) -> None:
+        """
+        Counts the outcome of a run.
+        """
+
+        setattr(self, outcome, getattr(self, outcome) + 1)
+
+    def throughput(self) -> float:
+        """
+        Returns the finished runs per second.
+        """
+
+        if not self.duration:
+            return 0.0
+
+        return (self.done + self.retried + self.failed) / self.duration
+
+    def format(self) -> str:
+        """
+        Returns the counts as log text.
+        """
+
+        return (
+            f"Ran {self.claimed} tasks in {self.duration:.2f}s "
+            f"({self.throughput():.1f} tasks/s): {self.done} done, "
+            f"{self.retried} retried, {self.failed} failed, "
+            f"{self.lost} lost."
+        )
+
+
+class Worker:
+    """
+    Worker Class
+
+    Description:
+        - This class claims tasks and runs them in a pool of threads or
+        processes, claiming only as many as the pool has free slots.
+        - Processes are started with "spawn", so they don't share the
+        database connections of the worker, and set up Django first.
+        - While tasks run, the worker extends their leases every
+        `HEARTBEAT` seconds.
+
+    Attributes:
+        - `name (str)`: The name of the worker, stored on its tasks.
+        - `concurrency (int)`: The size of the pool.
+        - `processes (bool)`: Whether the pool runs processes.
+
+    Methods:
+        - `run(self, burst: bool = False, max_tasks: int | None = None) ->
+        WorkerStats`
+
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        processes: bool = False,
+        name: str | None = None,
+    ) -> None:
+        self.name: str = name or (
+            f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        )
+        self.concurrency: int = max(1, concurrency)
+        self.processes: bool = processes
+
+    def _executor(self) -> Executor:
+        if self.processes:
+            return ProcessPoolExecutor(
+                max_workers=self.concurrency,
+                mp_context=get_context(method="spawn"),
+                initializer=django.setup,
+            )
+
+        return ThreadPoolExecutor(
+            max_workers=self.concurrency, thread_name_prefix="pollster-task"
+        )
+
+    def run(
+        self, burst: bool = False, max_tasks: int | None = None
+    ) -> WorkerStats:
+        """
+        Run Method
+
+        Description:
+            - This method runs tasks until it is interrupted, until no task
+            is due in burst mode, or until it claimed `max_tasks` tasks.
+            - When interrupted, it stops claiming and waits for the running
+            tasks.
+
+        Args:
+            - `burst (bool)`: Whether to stop once no task is due.
+            **(Optional)**
+            - `max_tasks (int | None)`: The most tasks to claim.
+            **(Optional)**
+
+        Returns:
+            - `stats (WorkerStats)`: The counts of the run.
+
+        """
+
+        config: dict[str, Any] = get_config()
+        poll_interval: float = config["POLL_INTERVAL"]
+        stats: WorkerStats = WorkerStats()
+        pending: set[Future[str]] = set()
+        started: float = perf_counter()
+        beaten: float = started
+        stopping: bool = False
+
+        with self._executor() as executor:
+            while True:
+                try:
+                    free: int = self.concurrency - len(pending)
+                    if max_tasks is not None:
+                        free = min(free, max_tasks - stats.claimed)
+
+                    tasks: list[Task] = (
+                        claim(worker=self.name, limit=free)
+                        if free > 0 and not stopping
+                        else []
+                    )
+                    stats.claimed += len(tasks)
+                    pending.update(
+                        executor.submit(execute, task.pk, self.name)
+                        for task in tasks
+                    )
+
+                    if not pending:
+                        if stopping or burst or free <= 0:
+                            break
+                        close_old_connections()
+                        sleep(poll_interval)
+                        continue
+
+                    finished, pending = wait(
+                        fs=pending,
+                        timeout=poll_interval,
+                        return_when=FIRST_COMPLETED,
+                    )
+                    for future in finished:
+                        stats.record(outcome=_outcome(future=future))
+
+                    if pending and (
+                        perf_counter() - beaten >= config["HEARTBEAT"]
+                    ):
+                        heartbeat(worker=self.name)
+                        beaten = perf_counter()
+
+                except KeyboardInterrupt:
+                    stopping = True
+
+        stats.duration = perf_counter() - started
+
+        return stats
@@ -0,0 +1,1077 @@
+"""
+Pollster Tests Module
+
+Description:
+    - This module contains the test cases for the pollster app.
+
+"""
+
+import gzip
+import subprocess
+import sys
+import tracemalloc
+import zlib
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from time import sleep, time
+from unittest import mock
+
+from django.contrib.auth.models import Permission, User
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+from django_polls.models import Question
+
+from .admin import Role
+from .cache import SEQ, SharedMemoryCache
+from .compression import choose_encoding
+from .memory import MemoryReport, track
+from .metrics import get_metrics, reset_metrics
+from .middleware import CompressionMiddleware
+from .models import RequestProfile, Task
+from .permissions import get_permission_choices
+from .profiling import sign_token
+from .tasks import (
+    LOST,
+    RETRIED,
+    Worker,
+    claim,
+    enqueue,
+    execute,
+    heartbeat,
+)
+
+
+class PermissionCacheTests(TestCase):
+    """
+    Permission Cache Test Cases
+
+    Description:
+        - This class contains the test cases for the permission cache.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `setUp(self) -> None`
+        - `has_perm(self) -> bool`
+        - `test_permissions_are_served_from_cache(self) -> None`
+        - `test_removing_role_permission_invalidates_cache(self) -> None`
+        - `test_clearing_role_members_invalidates_cache(self) -> None`
+        - `test_invalidation_waits_for_commit(self) -> None`
+        - `test_unseen_changes_expire_with_timeout(self) -> None`
+        - `test_permission_choices_are_cached(self) -> None`
+        - `test_role_change_form_uses_cached_choices(self) -> None`
+
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.permission: Permission = Permission.objects.get(
+            codename="change_question"
+        )
+        self.role: Role = Role.objects.create(name="Operations")
+        self.role.permissions.add(self.permission)
+        self.user: User = User.objects.create_user(username="operator")
+        self.user.groups.add(self.role)
+
+    def has_perm(self) -> bool:
+        """
+        Checks the permission on a freshly loaded user, as a new request
+        would.
+        """
+
+        return User.objects.get(pk=self.user.pk).has_perm(
+            perm="polls.change_question"
+        )
+
+    def test_permissions_are_served_from_cache(self) -> None:
+        """
+        Once cached, resolving a user's role permissions runs no query.
+        """
+
+        self.assertTrue(expr=self.has_perm())
+        user: User = User.objects.get(pk=self.user.pk)
+
+        with self.assertNumQueries(num=0):
+            self.assertTrue(expr=user.has_perm(perm="polls.change_question"))
+
+    def test_removing_role_permission_invalidates_cache(self) -> None:
+        """
+        Removing a permission from a role revokes it from its users.
+        """
+
+        self.assertTrue(expr=self.has_perm())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.remove(self.permission)
+
+        self.assertFalse(expr=self.has_perm())
+
+    def test_clearing_role_members_invalidates_cache(self) -> None:
+        """
+        Clearing the members of a role revokes its permissions from them.
+        """
+
+        self.assertTrue(expr=self.has_perm())
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.user_set.clear()
+
+        self.assertFalse(expr=self.has_perm())
+
+    def test_invalidation_waits_for_commit(self) -> None:
+        """
+        The tokens are bumped when the change commits, not before, so no
+        request can cache the old permissions under the new token.
+        """
+
+        self.assertTrue(expr=self.has_perm())
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.role.permissions.remove(self.permission)
+
+        self.assertTrue(expr=self.has_perm())
+        for callback in callbacks:
+            callback()
+        self.assertFalse(expr=self.has_perm())
+
+    @override_settings(PERMISSION_CACHE_TIMEOUT=60)
+    def test_unseen_changes_expire_with_timeout(self) -> None:
+        """
+        A change that didn't bump the tokens of this process, as made by
+        another process with its own cache, is seen once the timeout passed.
+        """
+
+        self.assertTrue(expr=self.has_perm())
+        Role.permissions.through.objects.filter(group=self.role).delete()
+
+        self.assertTrue(expr=self.has_perm())
+        with mock.patch(target="time.time", return_value=time() + 61):
+            self.assertFalse(expr=self.has_perm())
+
+    def test_permission_choices_are_cached(self) -> None:
+        """
+        The role permission picker loads the permissions only once.
+        """
+
+        choices: list[tuple[int, str]] = get_permission_choices()
+
+        with self.assertNumQueries(num=0):
+            self.assertEqual(first=get_permission_choices(), second=choices)
+
+        self.assertEqual(first=len(choices), second=Permission.objects.count())
+
+    def test_role_change_form_uses_cached_choices(self) -> None:
+        """
+        The role change form renders the permission picker from the cache.
+        """
+
+        self.client.force_login(
+            user=User.objects.create_superuser(username="admin")
+        )
+        response = self.client.get(
+            path=reverse(
+                viewname="admin:pollster_role_change", args=(self.role.pk,)
+            )
+        )
+
+        self.assertContains(response=response, text=str(self.permission))
+
+
+class FastPathTests(TestCase):
+    """
+    Fast Path Test Cases
+
+    Description:
+        - This class contains the test cases for the middleware fast path.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `test_anonymous_get_skips_session(self) -> None`
+        - `test_session_cookie_takes_full_path(self) -> None`
+        - `test_unlisted_route_takes_full_path(self) -> None`
+        - `test_benchmark_reports_savings(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def test_anonymous_get_skips_session(self) -> None:
+        """
+        Anonymous GETs of polls pages get no session and an anonymous user.
+        """
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="polls:index")
+        )
+
+        self.assertEqual(first=response.status_code, second=2_00)
+        self.assertFalse(expr=hasattr(response.wsgi_request, "session"))
+        self.assertTrue(expr=response.wsgi_request.user.is_anonymous)
+
+    def test_session_cookie_takes_full_path(self) -> None:
+        """
+        Requests carrying a session cookie go through the full stack.
+        """
+
+        self.client.force_login(user=User.objects.create_user(username="u"))
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="polls:index")
+        )
+
+        self.assertTrue(expr=response.wsgi_request.user.is_authenticated)
+
+    def test_unlisted_route_takes_full_path(self) -> None:
+        """
+        Routes that aren't listed keep their session.
+        """
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="admin:login")
+        )
+
+        self.assertTrue(expr=hasattr(response.wsgi_request, "session"))
+
+    def test_benchmark_reports_savings(self) -> None:
+        """
+        The benchmark command reports both modes for each path.
+        """
+
+        out: StringIO = StringIO()
+        call_command("benchmark_fast_path", "/polls/", requests=5, stdout=out)
+
+        self.assertIn(member="/polls/", container=out.getvalue())
+
+
+class ClearExpiredSessionsTests(TestCase):
+    """
+    Clear Expired Sessions Test Cases
+
+    Description:
+        - This class contains the test cases for the batched session cleanup.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `test_expired_sessions_are_deleted_in_batches(self) -> None`
+        - `test_cookie_sessions_have_nothing_to_clear(self) -> None`
+
+    """
+
+    def test_expired_sessions_are_deleted_in_batches(self) -> None:
+        """
+        Every expired session is deleted, over several batches, and valid
+        sessions are kept.
+        """
+
+        for index in range(7):
+            Session.objects.create(
+                session_key=f"session-{index:02}",
+                session_data="",
+                expire_date=timezone.now()
+                + timedelta(days=1 if index < 2 else -1),
+            )
+
+        out: StringIO = StringIO()
+        call_command("clear_expired_sessions", batch_size=2, stdout=out)
+
+        self.assertEqual(first=Session.objects.count(), second=2)
+        self.assertIn(member="Deleted 5", container=out.getvalue())
+
+    @override_settings(
+        SESSION_ENGINE="django.contrib.sessions.backends.signed_cookies"
+    )
+    def test_cookie_sessions_have_nothing_to_clear(self) -> None:
+        """
+        Cookie based sessions are left alone.
+        """
+
+        out: StringIO = StringIO()
+        call_command("clear_expired_sessions", stdout=out)
+
+        self.assertIn(member="nothing to clear", container=out.getvalue())
+
+
+class SharedMemoryCacheTests(SimpleTestCase):
+    """
+    Shared Memory Cache Test Cases
+
+    Description:
+        - This class contains the test cases for the shared memory cache.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `setUp(self) -> None`
+        - `open_cache(self, name: str, **options: int) -> SharedMemoryCache`
+        - `test_cache_operations(self) -> None`
+        - `test_least_recently_used_entry_is_evicted(self) -> None`
+        - `test_slot_left_odd_is_readable_once_written(self) -> None`
+        - `test_entries_are_shared_between_processes(self) -> None`
+
+    """
+
+    def setUp(self) -> None:
+        directory: TemporaryDirectory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory: Path = Path(directory.name)
+
+    def open_cache(self, name: str, **options: int) -> SharedMemoryCache:
+        """
+        Opens a cache file in the temporary directory.
+        """
+
+        return SharedMemoryCache(
+            location=str(self.directory / name),
+            params={"TIMEOUT": None, "OPTIONS": options},
+        )
+
+    def test_cache_operations(self) -> None:
+        """
+        The backend behaves like the other Django cache backends.
+        """
+
+        cache: SharedMemoryCache = self.open_cache(name="operations")
+
+        cache.set(key="question", value={"id": 1, "votes": [3, 4]})
+        self.assertEqual(
+            first=cache.get(key="question"), second={"id": 1, "votes": [3, 4]}
+        )
+        self.assertFalse(expr=cache.add(key="question", value="other"))
+        self.assertTrue(expr=cache.add(key="answer", value=41))
+        self.assertEqual(first=cache.incr(key="answer"), second=42)
+        self.assertTrue(expr=cache.delete(key="answer"))
+        self.assertFalse(expr=cache.has_key(key="answer"))
+        self.assertIsNone(obj=cache.get(key="too-large"))
+        reset_metrics()
+        with self.assertLogs(logger="pollster.cache", level="WARNING"):
+            cache.set(key="too-large", value="x" * 40_000)
+        cache.set(key="too-large", value="x" * 40_000)
+        self.assertIsNone(obj=cache.get(key="too-large"))
+        self.assertEqual(first=get_metrics()["cache.oversize"], second=2)
+
+        cache.set(key="expiring", value="soon", timeout=10)
+        self.assertEqual(first=cache.get(key="expiring"), second="soon")
+        with mock.patch(
+            target="pollster.cache.time", return_value=time() + 20
+        ):
+            self.assertIsNone(obj=cache.get(key="expiring"))
+
+        cache.clear()
+        self.assertIsNone(obj=cache.get(key="question"))
+
+    def test_least_recently_used_entry_is_evicted(self) -> None:
+        """
+        A full bucket reuses the slot of its least recently read entry.
+        """
+
+        cache: SharedMemoryCache = self.open_cache(
+            name="lru", SIZE=64 + 2 * 512, WAYS=2, SLOT_SIZE=512
+        )
+
+        with mock.patch(target="pollster.cache.time", return_value=1.0):
+            cache.set(key="first", value=1)
+        with mock.patch(target="pollster.cache.time", return_value=2.0):
+            cache.set(key="second", value=2)
+        with mock.patch(target="pollster.cache.time", return_value=3.0):
+            cache.get(key="first")
+        with mock.patch(target="pollster.cache.time", return_value=4.0):
+            cache.set(key="third", value=3)
+
+        self.assertEqual(first=cache.get(key="first"), second=1)
+        self.assertIsNone(obj=cache.get(key="second"))
+        self.assertEqual(first=cache.get(key="third"), second=3)
+
+    def test_slot_left_odd_is_readable_once_written(self) -> None:
+        """
+        A slot whose writer died mid-write, leaving its sequence odd, is
+        readable again once written.
+        """
+
+        cache: SharedMemoryCache = self.open_cache(
+            name="parity", SIZE=64 + 512, WAYS=1, SLOT_SIZE=512
+        )
+        offset: int = cache.shared.slot_offset(bucket=0, way=0)
+        SEQ.pack_into(cache.shared.mm, offset, 7)
+        cache.set(key="answer", value=42)
+
+        self.assertEqual(
+            first=SEQ.unpack_from(cache.shared.mm, offset)[0], second=8
+        )
+        self.assertEqual(first=cache.get(key="answer"), second=42)
+
+    def test_entries_are_shared_between_processes(self) -> None:
+        """
+        An entry written by one process is read and replaced by another.
+        """
+
+        cache: SharedMemoryCache = self.open_cache(name="shared")
+        cache.set(key="index", value=[1, 2, 3])
+
+        output: str = subprocess.run(
+            args=[
+                sys.executable,
+                "-c",
+                "import sys; from pollster.cache import SharedMemoryCache; "
+                "cache = SharedMemoryCache(sys.argv[1], {'TIMEOUT': None}); "
+                "print(cache.get('index')); cache.set('index', [4])",
+                str(self.directory / "shared"),
+            ],
+            capture_output=True,
+            check=True,
+            cwd=Path(__file__).resolve().parent.parent,
+            text=True,
+        ).stdout
+
+        self.assertEqual(first=output.strip(), second="[1, 2, 3]")
+        self.assertEqual(first=cache.get(key="index"), second=[4])
+
+
+class ProfilingTests(TestCase):
+    """
+    Profiling Test Cases
+
+    Description:
+        - This class contains the test cases for on-demand profiling.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `test_signed_header_profiles_request(self) -> None`
+        - `test_client_request_id_is_only_a_label(self) -> None`
+        - `test_invalid_or_foreign_token_is_ignored(self) -> None`
+        - `test_sampled_request_is_profiled(self) -> None`
+        - `test_profile_is_viewable_in_admin(self) -> None`
+        - `test_old_profiles_are_pruned(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def test_signed_header_profiles_request(self) -> None:
+        """
+        A request with a signed header is stored with its profile and SQL
+        under an id generated by the server.
+        """
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path="/polls/",
+            headers={"X-Profile": sign_token(path_prefix="/polls/")},
+        )
+
+        profile: RequestProfile = RequestProfile.objects.get(  # type: ignore
+            request_id=response.headers["X-Profile-Id"]
+        )
+        self.assertEqual(first=profile.trigger, second="header")
+        self.assertEqual(first=profile.view_name, second="polls:index")
+        self.assertEqual(first=profile.status_code, second=200)
+        self.assertIn(member="cumulative", container=profile.profile)
+        self.assertEqual(first=len(profile.sql), second=profile.query_count)
+
+    def test_client_request_id_is_only_a_label(self) -> None:
+        """
+        Requests sending the same X-Request-Id get a profile each, labelled
+        with it.
+        """
+
+        for _ in range(2):
+            self.client.get(
+                path="/polls/",
+                headers={
+                    "X-Profile": sign_token(path_prefix="/polls/"),
+                    "X-Request-Id": "slow-index",
+                },
+            )
+
+        profiles: list[RequestProfile] = list(
+            RequestProfile.objects.all()  # type: ignore
+        )
+        self.assertEqual(first=len(profiles), second=2)
+        self.assertEqual(
+            first={profile.client_request_id for profile in profiles},
+            second={"slow-index"},
+        )
+        self.assertNotIn(
+            member="slow-index",
+            container={profile.request_id for profile in profiles},
+        )
+
+    def test_invalid_or_foreign_token_is_ignored(self) -> None:
+        """
+        Forged tokens and tokens for other paths don't profile a request.
+        """
+
+        self.client.get(
+            path="/polls/", headers={"X-Profile": "/polls/:forged"}
+        )
+        self.client.get(
+            path="/polls/",
+            headers={"X-Profile": sign_token(path_prefix="/admin/")},
+        )
+
+        self.assertFalse(expr=RequestProfile.objects.exists())  # type: ignore
+
+    @override_settings(PROFILING={"SAMPLE_RATE": 1.0})
+    def test_sampled_request_is_profiled(self) -> None:
+        """
+        With a sample rate, requests are profiled without a token.
+        """
+
+        self.client.get(path="/polls/")
+
+        self.assertEqual(
+            first=RequestProfile.objects.get().trigger,  # type: ignore
+            second="sample",
+        )
+
+    def test_profile_is_viewable_in_admin(self) -> None:
+        """
+        The admin shows the SQL trace and the profile of a request.
+        """
+
+        self.client.get(
+            path="/polls/", headers={"X-Profile": sign_token(path_prefix="/")}
+        )
+        profile: RequestProfile = RequestProfile.objects.get()  # type: ignore
+        self.client.force_login(
+            user=User.objects.create_superuser(  # type: ignore
+                username="admin", password="password"
+            )
+        )
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(
+                viewname="admin:pollster_requestprofile_change",
+                args=(profile.pk,),
+            )
+        )
+
+        self.assertContains(response=response, text="cumulative")
+        self.assertContains(response=response, text="<code>SELECT")
+
+    @override_settings(PROFILING={"SAMPLE_RATE": 1.0, "RETENTION": 60})
+    def test_old_profiles_are_pruned(self) -> None:
+        """
+        The `prune_profiles` command deletes the profiles older than the
+        retention only.
+        """
+
+        for _ in range(2):
+            self.client.get(path="/polls/")
+        old: RequestProfile = RequestProfile.objects.first()  # type: ignore
+        RequestProfile.objects.filter(pk=old.pk).update(  # type: ignore
+            created_at=timezone.now() - timedelta(minutes=2)
+        )
+
+        call_command("prune_profiles", stdout=StringIO())
+
+        self.assertEqual(
+            first=RequestProfile.objects.count(), second=1  # type: ignore
+        )
+        self.assertFalse(
+            expr=RequestProfile.objects.filter(  # type: ignore
+                pk=old.pk
+            ).exists()
+        )
+
+
+@override_settings(
+    MEMORY_TRACKING={
+        "ENABLED": True,
+        "SAMPLE_RATE": 1.0,
+        "BUDGET": 1024 * 1024,
+    }
+)
+class MemoryTrackingTests(TestCase):
+    """
+    Memory Tracking Test Cases
+
+    Description:
+        - This class contains the test cases for memory tracking.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_growth_over_budget_is_flagged(self) -> None`
+        - `test_views_are_tracked(self) -> None`
+        - `test_commands_are_tracked(self) -> None`
+        - `test_polls_commands_are_tracked(self) -> None`
+        - `test_tracking_is_opt_in(self) -> None`
+        - `test_unsampled_requests_are_not_traced(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        self.addCleanup(tracemalloc.stop)
+
+    def test_growth_over_budget_is_flagged(self) -> None:
+        """
+        A block retaining more than the budget is logged as a warning that
+        names its allocation site.
+        """
+
+        report: MemoryReport
+        with self.assertLogs(
+            logger="pollster.memory", level="WARNING"
+        ) as logs:
+            with track(label="leak") as report:
+                leaked: list[bytes] = [bytes(100_000) for _ in range(20)]
+
+        self.assertEqual(first=len(leaked), second=20)
+        self.assertTrue(expr=report.over_budget)
+        self.assertGreater(a=report.retained, b=2_000_000)
+        self.assertGreaterEqual(a=report.peak, b=report.retained)
+        self.assertIn(
+            member="tests.py", container=report.top[0][0]  # type: ignore
+        )
+        self.assertIn(member="leak: peak", container=logs.output[0])
+
+    def test_views_are_tracked(self) -> None:
+        """
+        Each sampled request is reported under the name of its view, and
+        tracing stops with it.
+        """
+
+        with self.assertLogs(logger="pollster.memory", level="DEBUG") as logs:
+            self.client.get(path="/polls/")
+
+        self.assertIn(member="view polls:index", container=logs.output[0])
+        self.assertFalse(expr=tracemalloc.is_tracing())
+
+    def test_commands_are_tracked(self) -> None:
+        """
+        Each management command is reported under its name.
+        """
+
+        with self.assertLogs(logger="pollster.memory", level="DEBUG") as logs:
+            call_command("clear_expired_sessions", stdout=StringIO())
+
+        self.assertIn(
+            member="command clear_expired_sessions", container=logs.output[0]
+        )
+
+    def test_polls_commands_are_tracked(self) -> None:
+        """
+        The commands of the polls app are reported under their name,
+        through the `POLLS_COMMAND_WRAPPER` setting.
+        """
+
+        with self.assertLogs(logger="pollster.memory", level="DEBUG") as logs:
+            call_command("archive_questions", "--days=365", stdout=StringIO())
+
+        self.assertIn(
+            member="command archive_questions", container=logs.output[0]
+        )
+
+    @override_settings(MEMORY_TRACKING={"ENABLED": False})
+    def test_tracking_is_opt_in(self) -> None:
+        """
+        Nothing is traced or logged unless tracking is enabled.
+        """
+
+        with self.assertNoLogs(logger="pollster.memory", level="DEBUG"):
+            self.client.get(path="/polls/")
+
+        self.assertFalse(expr=tracemalloc.is_tracing())
+
+    @override_settings(MEMORY_TRACKING={"ENABLED": True, "SAMPLE_RATE": 0.0})
+    def test_unsampled_requests_are_not_traced(self) -> None:
+        """
+        Requests not picked by the sample rate are neither traced nor
+        logged.
+        """
+
+        with mock.patch("tracemalloc.take_snapshot") as take_snapshot:
+            with self.assertNoLogs(logger="pollster.memory", level="DEBUG"):
+                self.client.get(path="/polls/")
+
+        take_snapshot.assert_not_called()
+        self.assertFalse(expr=tracemalloc.is_tracing())
+
+
+def record_task(label: str) -> None:
+    """
+    Appends a label to the runs recorded in the cache, as a task.
+    """
+
+    cache.set(
+        key="task-runs", value=[*cache.get(key="task-runs", default=[]), label]
+    )
+
+
+def failing_task() -> None:
+    """
+    Fails, as a task.
+    """
+
+    raise ValueError("Task failed")
+
+
+def slow_task() -> None:
+    """
+    Runs for a while, as a task.
+    """
+
+    sleep(0.3)
+
+
+class TaskQueueTests(TransactionTestCase):
+    """
+    Task Queue Test Cases
+
+    Description:
+        - This class contains the test cases for the task queue.
+        - The worker runs tasks in threads, which only see committed rows.
+
+    Attributes:
+        - `None`
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_worker_runs_due_tasks_by_priority(self) -> None`
+        - `test_failed_task_is_retried_then_fails(self) -> None`
+        - `test_retries_back_off(self) -> None`
+        - `test_claims_are_exclusive_until_lease_expires(self) -> None`
+        - `test_abandoned_last_attempt_fails(self) -> None`
+        - `test_worker_extends_leases_of_running_tasks(self) -> None`
+
+    """
+
+    def setUp(self) -> None:
+        cache.clear()
+
+    def test_worker_runs_due_tasks_by_priority(self) -> None:
+        """
+        Due tasks run highest priority first, and the worker reports its
+        throughput.
+        """
+
+        enqueue(record_task, label="low")
+        enqueue(record_task, priority=5, label="high")
+        enqueue(record_task, delay=60, label="later")
+        out: StringIO = StringIO()
+
+        call_command(
+            "task_worker", "--burst", "--concurrency=1", stdout=out, stderr=out
+        )
+
+        self.assertEqual(
+            first=cache.get(key="task-runs"), second=["high", "low"]
+        )
+        self.assertIn(member="2 done", container=out.getvalue())
+        self.assertIn(member="tasks/s", container=out.getvalue())
+        self.assertEqual(
+            first=Task.objects.get(  # pylint: disable=no-member
+                kwargs__label="later"
+            ).status,
+            second=Task.QUEUED,
+        )
+
+    @override_settings(TASK_QUEUE={"BACKOFF": 0})
+    def test_failed_task_is_retried_then_fails(self) -> None:
+        """
+        A failing task is retried until it runs out of attempts.
+        """
+
+        task: Task = enqueue(failing_task, max_attempts=2)
+        out: StringIO = StringIO()
+
+        call_command("task_worker", "--burst", stdout=out, stderr=out)
+
+        task.refresh_from_db()
+        self.assertEqual(first=task.status, second=Task.FAILED)
+        self.assertEqual(first=task.attempts, second=2)
+        self.assertIn(member="ValueError", container=task.last_error)
+        self.assertIn(member="1 retried, 1 failed", container=out.getvalue())
+
+    def test_retries_back_off(self) -> None:
+        """
+        Each retry waits twice as long as the one before.
+        """
+
+        task: Task = enqueue(failing_task)
+        delays: list[float] = []
+
+        for _ in range(2):
+            Task.objects.filter(
+                pk=task.pk
+            ).update(  # pylint: disable=no-member
+                run_at=timezone.now()
+            )
+            claim(worker="worker", limit=1)
+            self.assertEqual(
+                first=execute(task_id=task.pk, worker="worker"), second=RETRIED
+            )
+            task.refresh_from_db()
+            delays.append((task.run_at - timezone.now()).total_seconds())
+
+        self.assertAlmostEqual(first=delays[0], second=5, delta=1)
+        self.assertAlmostEqual(first=delays[1], second=10, delta=1)
+
+    def test_claims_are_exclusive_until_lease_expires(self) -> None:
+        """
+        A task is claimed by one worker at a time, and again by another once
+        the lease of the first one expired.
+        """
+
+        for label in ("a", "b", "c"):
+            enqueue(record_task, label=label)
+
+        first: list[Task] = claim(worker="first", limit=2)
+        second: list[Task] = claim(worker="second", limit=5)
+
+        self.assertEqual(first=len(first), second=2)
+        self.assertEqual(first=len(second), second=1)
+        self.assertEqual(first=claim(worker="second", limit=5), second=[])
+
+        Task.objects.filter(
+            pk=first[0].pk
+        ).update(  # pylint: disable=no-member
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        reclaimed: list[Task] = claim(worker="second", limit=5)
+
+        self.assertEqual(first=reclaimed, second=[first[0]])
+        self.assertEqual(first=reclaimed[0].attempts, second=2)
+        self.assertEqual(
+            first=execute(task_id=first[0].pk, worker="first"), second=LOST
+        )
+        execute(task_id=first[0].pk, worker="second")
+        self.assertEqual(first=cache.get(key="task-runs"), second=["a"])
+
+    def test_abandoned_last_attempt_fails(self) -> None:
+        """
+        A task whose lease expired on its last attempt is marked as failed
+        instead of being claimed again.
+        """
+
+        task: Task = enqueue(record_task, max_attempts=1, label="once")
+        claim(worker="first")
+        Task.objects.filter(pk=task.pk).update(  # pylint: disable=no-member
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+
+        self.assertEqual(first=claim(worker="second"), second=[])
+        task.refresh_from_db()
+        self.assertEqual(first=task.status, second=Task.FAILED)
+        self.assertEqual(first=task.attempts, second=1)
+        self.assertIn(member="lease", container=task.last_error)
+
+    @override_settings(TASK_QUEUE={"HEARTBEAT": 0, "POLL_INTERVAL": 0.05})
+    def test_worker_extends_leases_of_running_tasks(self) -> None:
+        """
+        The worker extends the lease of a task while it runs.
+        """
+
+        enqueue(slow_task)
+
+        with mock.patch(
+            target="pollster.tasks.heartbeat", wraps=heartbeat
+        ) as beat:
+            self.assertEqual(
+                first=Worker(concurrency=1, name="worker")
+                .run(burst=True)
+                .done,
+                second=1,
+            )
+
+        self.assertEqual(first=heartbeat(worker="worker"), second=0)
+        beat.assert_called_with(worker="worker")
+
+
+class CompressionTests(TestCase):
+    """
+    Compression Test Cases
+
+    Description:
+        - This class contains the test cases for response compression.
+
+    Attributes:
+        - `databases (str)`: The databases used by the tests, every shard
+        when sharding is on.
+
+    Methods:
+        - `setUp(self) -> None`
+        - `test_polls_page_is_compressed(self) -> None`
+        - `test_small_or_binary_responses_are_not_compressed(self) -> None`
+        - `test_streaming_response_is_compressed_chunk_by_chunk(self) ->
+        None`
+        - `test_pages_with_csrf_token_are_not_compressed(self) -> None`
+        - `test_encoding_follows_accept_encoding(self) -> None`
+        - `test_metrics_are_shown_to_staff_only(self) -> None`
+
+    """
+
+    databases = "__all__"
+
+    def setUp(self) -> None:
+        cache.clear()
+        reset_metrics()
+
+    @override_settings(COMPRESSION={"MIN_LENGTH": 100})
+    def test_polls_page_is_compressed(self) -> None:
+        """
+        A large HTML page is gzipped for clients accepting it, and the saved
+        bytes are counted.
+        """
+
+        Question.objects.bulk_create(  # pylint: disable=no-member
+            objs=[
+                Question(
+                    question_text=f"Question {index}",
+                    pub_date=timezone.now() - timedelta(hours=1),
+                )
+                for index in range(5)
+            ]
+        )
+
+        plain: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="polls:index")
+        )
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="polls:index"),
+            HTTP_ACCEPT_ENCODING="gzip, deflate",
+        )
+
+        self.assertFalse(expr=plain.has_header("Content-Encoding"))
+        self.assertEqual(first=response["Content-Encoding"], second="gzip")
+        self.assertIn(member="Accept-Encoding", container=response["Vary"])
+        self.assertEqual(
+            first=gzip.decompress(response.content), second=plain.content
+        )
+        self.assertEqual(
+            first=get_metrics()["compression.bytes_saved"],
+            second=len(plain.content) - len(response.content),
+        )
+
+    def test_small_or_binary_responses_are_not_compressed(self) -> None:
+        """
+        Responses below the size threshold or outside the content type
+        allowlist are sent as they are.
+        """
+
+        request = RequestFactory().get(path="/", HTTP_ACCEPT_ENCODING="gzip")
+
+        for content, content_type in (
+            (b"{}", "application/json"),
+            (bytes(10_000), "image/png"),
+        ):
+            original: HttpResponse = HttpResponse(
+                content=content, content_type=content_type
+            )
+            response: HttpResponse = CompressionMiddleware(
+                get_response=lambda request, original=original: original
+            )(request)
+
+            self.assertFalse(expr=response.has_header("Content-Encoding"))
+            self.assertEqual(first=response.content, second=content)
+
+    def test_streaming_response_is_compressed_chunk_by_chunk(self) -> None:
+        """
+        Each chunk of a streaming response can be decompressed as soon as it
+        is received.
+        """
+
+        chunks: list[bytes] = [b'{"rows": [', b"1, " * 500, b"2]}"]
+        request = RequestFactory().get(path="/", HTTP_ACCEPT_ENCODING="gzip")
+
+        middleware: CompressionMiddleware = CompressionMiddleware(
+            get_response=lambda request: StreamingHttpResponse(
+                streaming_content=iter(chunks),
+                content_type="application/json",
+            )
+        )
+        response: StreamingHttpResponse = middleware(request)  # type: ignore
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        received: list[bytes] = [
+            decompressor.decompress(data)
+            for data in response.streaming_content  # type: ignore
+        ]
+
+        self.assertEqual(first=response["Content-Encoding"], second="gzip")
+        self.assertEqual(first=received[:3], second=chunks)
+        self.assertTrue(expr=decompressor.eof)
+        self.assertGreater(a=get_metrics()["compression.bytes_saved"], b=0)
+
+    @override_settings(COMPRESSION={"MIN_LENGTH": 0})
+    def test_pages_with_csrf_token_are_not_compressed(self) -> None:
+        """
+        Responses carrying a CSRF token are never compressed.
+        """
+
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="polls:csrf"), HTTP_ACCEPT_ENCODING="gzip"
+        )
+
+        self.assertFalse(expr=response.has_header("Content-Encoding"))
+        self.assertEqual(
+            first=get_metrics()["compression.skipped.breach"], second=1
+        )
+
+    def test_encoding_follows_accept_encoding(self) -> None:
+        """
+        The coding is picked by quality value, and refused codings are not
+        used.
+        """
+
+        self.assertEqual(
+            first=choose_encoding(accept_encoding="gzip;q=0.5"), second="gzip"
+        )
+        self.assertEqual(
+            first=choose_encoding(accept_encoding="*"),
+            second=choose_encoding(accept_encoding="br, gzip"),
+        )
+        self.assertIsNone(
+            obj=choose_encoding(accept_encoding="gzip;q=0, identity")
+        )
+        self.assertIsNone(obj=choose_encoding(accept_encoding="*;q=0"))
+        self.assertIsNone(obj=choose_encoding(accept_encoding=""))
+
+    def test_metrics_are_shown_to_staff_only(self) -> None:
+        """
+        The metrics view lists the counters to staff members.
+        """
+
+        CompressionMiddleware(
+            get_response=lambda request: HttpResponse(
+                content=b"x" * 1_000, content_type="text/plain"
+            )
+        )(RequestFactory().get(path="/", HTTP_ACCEPT_ENCODING="gzip"))
+
+        anonymous: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="metrics")
+        )
+        self.client.force_login(
+            user=User.objects.create_user(username="staff", is_staff=True)
+        )
+        response: HttpResponse = self.client.get(  # type: ignore
+            path=reverse(viewname="metrics")
+        )
+
+        self.assertEqual(first=anonymous.status_code, second=3_02)
+        self.assertContains(
+            response=response, text="compression.gzip.responses 1"
+        )
@@ -19,12 +19,15 @@ from debug_toolbar.toolbar import debug_toolbar_urls  # type: ignore
 from django.conf import settings
 from django.contrib import admin
 from django.urls import include, path
-from django.urls.resolvers import URLResolver
+from django.urls.resolvers import URLPattern, URLResolver
 
-urlpatterns: list[URLResolver] = [
+from .views import metrics
+
+urlpatterns: list[URLPattern | URLResolver] = [
     # path(route="polls/", view=include("polls.urls")),
     path(route="polls/", view=include("django_polls.urls")),
     path(route="admin/", view=admin.site.urls),
+    path(route="metrics/", view=metrics, name="metrics"),
 ]
 
 
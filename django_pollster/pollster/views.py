@@ -0,0 +1,37 @@
+"""
+Pollster Views Module
+
+Description:
+    - This module contains the views of the pollster project.
+
+"""
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpRequest, HttpResponse
+
+from .metrics import get_metrics
+
+
+@staff_member_required
+def metrics(request: HttpRequest) -> HttpResponse:
+    """
+    Metrics View
+
+    Description:
+        - This view shows the counters of the process serving the request to
+        staff members, one "name value" line per counter.
+
+    Args:
+        - `request (HttpRequest)`: The request object.  **(Required)**
+
+    Returns:
+        - `HttpResponse`: The counters, as plain text.
+
+    """
+
+    return HttpResponse(
+        content="".join(
+            f"{name} {value}\n" for name, value in get_metrics().items()
+        ),
+        content_type="text/plain; charset=utf-8",
+    )
@@ -15,3 +15,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault(key="DJANGO_SETTINGS_MODULE", value="pollster.settings")
 
 application: WSGIHandler = get_wsgi_application()
+
+# Imported once the apps are ready. Only server processes warm the caches.
+from django_polls.warmup import warm_up_on_start  # noqa: E402
+
+warm_up_on_start()